@@ -0,0 +1,99 @@
+"""Compare resident memory of slotted Work objects with the plain dataclass layout.
+
+Usage:
+    python -m benchmarks.memory [--works N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date
+
+from src.gallery import Medium, Work
+
+
+@dataclass
+class DataclassWork:
+    """The original ``Work`` layout: a dataclass with a ``__dict__`` and a tags list."""
+    title: str
+    description: str
+    medium: Medium
+    organ: str
+    repo: str
+    date_created: date | None = None
+    tags: list[str] = field(default_factory=list)
+    url: str = ""
+    featured: bool = False
+
+
+ORGANS = [f"organvm-{n}" for n in ("i-theoria", "ii-poiesis", "iii-ergon", "iv-taxis", "v-logos")]
+TAGS = [f"tag-{i}" for i in range(200)]
+
+
+def _records(n: int, seed: int = 0) -> list[dict]:
+    """Build raw records the way ``json.load`` would: fresh strings per record."""
+    rng = random.Random(seed)
+    records = [
+        {
+            "title": f"Work {i}",
+            "description": f"Description of work {i}",
+            "medium": rng.choice(list(Medium)).value,
+            "organ": rng.choice(ORGANS),
+            "repo": f"repo-{i}",
+            "tags": rng.sample(TAGS, rng.randint(0, 6)),
+            "featured": rng.random() < 0.1,
+        }
+        for i in range(n)
+    ]
+    # Round-trip so no two records share string objects, as with a parsed file.
+    return json.loads(json.dumps(records))
+
+
+def measure(factory: Callable[..., object], n: int) -> int:
+    """Return the bytes still held by ``n`` objects once their source records are freed."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = _records(n)
+    objects = [
+        factory(
+            title=r["title"],
+            description=r["description"],
+            medium=Medium(r["medium"]),
+            organ=r["organ"],
+            repo=r["repo"],
+            tags=r["tags"],
+            featured=r["featured"],
+        )
+        for r in records
+    ]
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--works", type=int, default=100_000, help="Number of works to build")
+    args = parser.parse_args()
+
+    legacy = measure(DataclassWork, args.works)
+    compact = measure(Work, args.works)
+
+    print(f"works:      {args.works}")
+    print(f"dataclass:  {legacy / args.works:8.1f} bytes/work  ({legacy / 2**20:.1f} MiB)")
+    print(f"slotted:    {compact / args.works:8.1f} bytes/work  ({compact / 2**20:.1f} MiB)")
+    print(f"saving:     {100 * (1 - compact / legacy):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Time collectors, search and renderers on synthetic catalogues of growing size.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1k,100k,1M] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--threshold 0.25]
+                               [--data-dir DIR] [--no-memory]
+
+Each stage is timed once on its own, then (unless ``--no-memory``) run again
+under tracemalloc to record its peak allocation, so tracing overhead never
+inflates the timings. Results are written as JSON; with ``--baseline`` every
+stage is compared against the stored run and the exit status is 1 if any
+stage got slower or hungrier by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.collector import collect_from_registry, collect_from_works_file
+from src.gallery import Gallery
+from src.incremental import fragments_path_for, generate_incremental, manifest_path_for
+from src.renderer import write_html, write_json, write_markdown
+
+from .synthetic import SEED, SyntheticCatalogue, dataset_paths
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = "1k,100k"
+THRESHOLD = 0.25
+SEARCH_QUERIES = 50
+
+# Timings under this many seconds are too noisy to flag as regressions.
+_MIN_COMPARABLE_SECONDS = 0.05
+
+
+@dataclass
+class StageResult:
+    """Measurements for one stage at one catalogue size."""
+    seconds: float
+    items: int
+    items_per_second: float
+    peak_bytes: int | None = None
+
+
+@dataclass
+class Stage:
+    """A benchmark step: ``setup`` builds untimed inputs, ``run`` does the timed work.
+
+    ``run`` returns how many items it processed, for throughput.
+    """
+    name: str
+    setup: Callable[[], object]
+    run: Callable[[object], int]
+
+
+def parse_size(text: str) -> int:
+    """Parse ``1000``, ``1k`` or ``1M`` into a work count."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower(), 1)
+    return int(text[:-1] if multiplier > 1 else text) * multiplier
+
+
+def _queries(n: int, seed: int) -> list[str]:
+    """Pick single-word, two-word and prefix queries from the catalogue vocabulary.
+
+    Words come from the mid-frequency band, skipping the handful of
+    stopword-like terms that occur in nearly every description.
+    """
+    catalogue = SyntheticCatalogue(seed)
+    rng, words = catalogue.rng, catalogue.words
+    queries = []
+    for i in range(n):
+        word = words[rng.randint(20, 1000)]
+        if i % 3 == 1:
+            word += " " + words[rng.randint(20, 1000)]
+        elif i % 3 == 2:
+            word = word[:3]
+        queries.append(word)
+    return queries
+
+
+def _render(writer: Callable) -> Callable[[Gallery], int]:
+    def run(gallery: Gallery) -> int:
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            writer(gallery, f)
+        return len(gallery.works)
+    return run
+
+
+def _incremental(fmt: str, source: Path | None) -> Callable[[tuple[Gallery, Path]], int]:
+    def run(inputs: tuple[Gallery, Path]) -> int:
+        gallery, output = inputs
+        generate_incremental(gallery, fmt, output, source=source)
+        return len(gallery.works)
+    return run
+
+
+def stages(works_path: Path, registry_path: Path, seed: int = SEED) -> list[Stage]:
+    """Return the benchmark stages for one generated dataset."""
+    def loaded() -> Gallery:
+        return collect_from_works_file(works_path)
+
+    def indexed() -> Gallery:
+        gallery = loaded()
+        gallery.search_index()
+        return gallery
+
+    def build_index(gallery: Gallery) -> int:
+        gallery.search_index()
+        return len(gallery.works)
+
+    def build_related(gallery: Gallery) -> int:
+        gallery.related(gallery.works[0])
+        return len(gallery.works)
+
+    def built(fmt: str, previous: bool = True, edit: bool = False):
+        """Return a setup giving a gallery and its output, after a build with ``previous``.
+
+        With ``edit``, one work then changes in memory, so only its entry
+        misses the fragment cache.
+        """
+        def setup() -> tuple[Gallery, Path]:
+            gallery = loaded()
+            output = works_path.with_name(f"{works_path.stem}-incremental.{fmt}")
+            for path in (output, manifest_path_for(output), fragments_path_for(output)):
+                path.unlink(missing_ok=True)
+            if previous:
+                generate_incremental(gallery, fmt, output, source=works_path)
+            if edit:
+                gallery.works[len(gallery.works) // 2].description += " (revised)"
+            return gallery, output
+        return setup
+
+    queries = _queries(SEARCH_QUERIES, seed)
+
+    def search(gallery: Gallery) -> int:
+        for query in queries:
+            gallery.search(query)
+        return len(queries)
+
+    return [
+        Stage("collect_works", lambda: None,
+              lambda _: len(collect_from_works_file(works_path).works)),
+        Stage("collect_registry", lambda: None,
+              lambda _: len(collect_from_registry(registry_path).works)),
+        Stage("collect_registry_stream", lambda: None,
+              lambda _: len(collect_from_registry(registry_path, stream=True).works)),
+        Stage("search_index", loaded, build_index),
+        Stage("search", indexed, search),
+        Stage("related_index", loaded, build_related),
+        Stage("render_markdown", loaded, _render(write_markdown)),
+        Stage("render_html", loaded, _render(write_html)),
+        Stage("render_json", loaded, _render(write_json)),
+        # Incremental builds; "warm" finds the source and output unchanged.
+        Stage("incremental_markdown_warm", built("markdown"),
+              _incremental("markdown", works_path)),
+        Stage("incremental_json_cold", built("json", previous=False),
+              _incremental("json", works_path)),
+        Stage("incremental_json_warm", built("json"), _incremental("json", works_path)),
+        Stage("incremental_json_edit", built("json", edit=True), _incremental("json", None)),
+    ]
+
+
+def measure(stage: Stage, memory: bool = True) -> StageResult:
+    """Run ``stage`` timed, then optionally again under tracemalloc for its peak."""
+    inputs = stage.setup()
+    gc.collect()
+    start = time.perf_counter()
+    items = stage.run(inputs)
+    seconds = time.perf_counter() - start
+    del inputs
+
+    peak = None
+    if memory:
+        inputs = stage.setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            stage.run(inputs)
+            peak = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+        del inputs
+    return StageResult(seconds, items, items / seconds if seconds else 0.0, peak)
+
+
+def run_suite(
+    sizes: list[int],
+    data_dir: Path,
+    memory: bool = True,
+    seed: int = SEED,
+    progress: Callable[[str], None] | None = None,
+) -> dict:
+    """Benchmark every stage at every size and return the JSON-ready report."""
+    results: dict[str, dict[str, dict]] = {}
+    for size in sizes:
+        works_path, registry_path = dataset_paths(data_dir, size, seed)
+        results[str(size)] = {}
+        for stage in stages(works_path, registry_path, seed):
+            result = measure(stage, memory)
+            results[str(size)][stage.name] = asdict(result)
+            if progress:
+                progress(format_result(size, stage.name, result))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def format_result(size: int, name: str, result: StageResult) -> str:
+    peak = f"{result.peak_bytes / 2**20:9.1f} MiB" if result.peak_bytes is not None else ""
+    return (f"{size:>9} {name:<26} {result.seconds:9.3f}s "
+            f"{result.items_per_second:14,.0f}/s {peak}")
+
+
+def compare(current: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    """Return one line per stage that regressed by more than ``threshold`` against ``baseline``.
+
+    Only sizes and stages present in both reports are compared; very short
+    timings are skipped as noise.
+    """
+    regressions = []
+    for size, stage_results in current["results"].items():
+        for name, result in stage_results.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            if base["seconds"] >= _MIN_COMPARABLE_SECONDS:
+                ratio = result["seconds"] / base["seconds"]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f"{size} {name}: {result['seconds']:.3f}s vs "
+                        f"{base['seconds']:.3f}s ({ratio:.2f}x)"
+                    )
+            if result.get("peak_bytes") and base.get("peak_bytes"):
+                ratio = result["peak_bytes"] / base["peak_bytes"]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f"{size} {name}: peak {result['peak_bytes'] / 2**20:.1f} MiB vs "
+                        f"{base['peak_bytes'] / 2**20:.1f} MiB ({ratio:.2f}x)"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated work counts, e.g. 1k,100k,1M (default: {DEFAULT_SIZES})")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", nargs="?", const=str(BASELINE_PATH),
+                        help=f"Compare against a stored report (default: {BASELINE_PATH})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Allowed slowdown before flagging a regression (default: {THRESHOLD})")
+    parser.add_argument("--data-dir",
+                        help="Where generated datasets are kept between runs (default: a temp dir)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass that records peak memory")
+    parser.add_argument("--seed", type=int, default=SEED, help="Dataset seed")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(args.data_dir) if args.data_dir else Path(tmp)
+        print(f"{'works':>9} {'stage':<26} {'wall':>10} {'throughput':>16} {'peak':>13}")
+        report = run_suite(sizes, data_dir, memory=not args.no_memory, seed=args.seed,
+                           progress=print)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
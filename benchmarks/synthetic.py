@@ -0,0 +1,152 @@
+"""Deterministic synthetic works.json and registry-v2.json files at any scale.
+
+Usage:
+    python -m benchmarks.synthetic --works N [--output DIR] [--seed S]
+
+Words, tags and organs follow Zipf-like distributions and description
+lengths are log-normal, so token frequencies, posting-list lengths and
+per-work sizes resemble a real catalogue. The same seed always yields
+byte-identical files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+from pathlib import Path
+
+from src.collector import ORGAN_MEDIUM_MAP
+from src.gallery import Medium
+
+
+SEED = 0
+VOCABULARY_SIZE = 5000
+TAG_VOCABULARY_SIZE = 500
+FEATURED_RATE = 0.05
+
+_SYLLABLES = [
+    c + v for c in "bcdfghklmnprstvz" for v in ("a", "e", "i", "o", "u", "ai", "ou")
+]
+RELEVANCE_WEIGHTS = {"CRITICAL": 2, "HIGH": 8, "MEDIUM": 30, "LOW": 60}
+
+
+def _zipf_weights(n: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _words(rng: random.Random, n: int) -> list[str]:
+    words: dict[str, None] = {}
+    while len(words) < n:
+        words["".join(rng.choices(_SYLLABLES, k=rng.randint(1, 4)))] = None
+    return list(words)
+
+
+class SyntheticCatalogue:
+    """Seeded source of work records shared by both file formats."""
+
+    def __init__(self, seed: int = SEED) -> None:
+        self.rng = random.Random(seed)
+        vocab_rng = random.Random(seed + 1)
+        self.words = _words(vocab_rng, VOCABULARY_SIZE)
+        self.word_weights = _zipf_weights(VOCABULARY_SIZE, 1.07)
+        self.tags = ["-".join(vocab_rng.sample(self.words[:800], 2))
+                     for _ in range(TAG_VOCABULARY_SIZE)]
+        self.tag_weights = _zipf_weights(TAG_VOCABULARY_SIZE, 1.0)
+        self.organs = list(ORGAN_MEDIUM_MAP)
+        self.organ_weights = _zipf_weights(len(self.organs), 0.8)
+        self.media = [m.value for m in Medium]
+        self.media_weights = _zipf_weights(len(self.media), 0.6)
+
+    def _text(self, k: int) -> list[str]:
+        return self.rng.choices(self.words, cum_weights=self.word_weights, k=k)
+
+    def record(self, i: int) -> dict:
+        """Return the ``i``-th synthetic work as a works.json entry."""
+        rng = self.rng
+        title_words = self._text(rng.randint(2, 4))
+        length = max(3, min(200, int(rng.lognormvariate(3.2, 0.5))))
+        n_tags = min(8, int(rng.expovariate(0.35)))
+        tags = list(dict.fromkeys(
+            rng.choices(self.tags, cum_weights=self.tag_weights, k=n_tags)
+        ))
+        return {
+            "title": " ".join(title_words).title(),
+            "description": " ".join(self._text(length)).capitalize() + ".",
+            "medium": rng.choices(self.media, cum_weights=self.media_weights)[0],
+            "organ": rng.choices(self.organs, cum_weights=self.organ_weights)[0],
+            "repo": f"{'-'.join(title_words)}-{i}",
+            "tags": tags,
+            "featured": rng.random() < FEATURED_RATE,
+        }
+
+    def repository(self, i: int) -> dict:
+        """Return the ``i``-th synthetic work as a registry repository record."""
+        record = self.record(i)
+        relevance = self.rng.choices(
+            list(RELEVANCE_WEIGHTS), weights=list(RELEVANCE_WEIGHTS.values())
+        )[0]
+        return {
+            "name": record["repo"],
+            "org": record["organ"],
+            "description": record["description"],
+            "topics": record["tags"],
+            "portfolio_relevance": relevance,
+        }
+
+
+def _write_array(path: Path, head: dict, key: str, items) -> Path:
+    """Write ``head`` plus a ``key`` array, one item per line, without holding the array."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(head, indent=2)[:-2])
+        f.write(f',\n  "{key}": [')
+        for n, item in enumerate(items):
+            f.write(",\n    " if n else "\n    ")
+            f.write(json.dumps(item))
+        f.write("\n  ]\n}\n")
+    return path
+
+
+def write_works_file(path: Path, n: int, seed: int = SEED) -> Path:
+    """Write a works.json with ``n`` synthetic works."""
+    catalogue = SyntheticCatalogue(seed)
+    head = {
+        "gallery_name": f"Synthetic Portfolio ({n} works)",
+        "description": "Deterministic synthetic catalogue for benchmarking",
+    }
+    return _write_array(path, head, "works", (catalogue.record(i) for i in range(n)))
+
+
+def write_registry(path: Path, n: int, seed: int = SEED) -> Path:
+    """Write a registry-v2.json with ``n`` synthetic repositories."""
+    catalogue = SyntheticCatalogue(seed)
+    head = {"version": "2.0", "organ_count": len(catalogue.organs)}
+    return _write_array(path, head, "repositories", (catalogue.repository(i) for i in range(n)))
+
+
+def dataset_paths(directory: Path, n: int, seed: int = SEED) -> tuple[Path, Path]:
+    """Return ``(works, registry)`` files for ``n`` works, generating any that are missing."""
+    directory.mkdir(parents=True, exist_ok=True)
+    works = directory / f"works-{n}-s{seed}.json"
+    registry = directory / f"registry-{n}-s{seed}.json"
+    if not works.exists():
+        write_works_file(works, n, seed)
+    if not registry.exists():
+        write_registry(registry, n, seed)
+    return works, registry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--works", type=int, default=1000, help="Number of works to generate")
+    parser.add_argument("--output", default=".", help="Directory to write the files to")
+    parser.add_argument("--seed", type=int, default=SEED, help="Random seed")
+    args = parser.parse_args()
+
+    for path in dataset_paths(Path(args.output), args.works, args.seed):
+        print(f"{path} ({path.stat().st_size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
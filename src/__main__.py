@@ -1,10 +1,36 @@
 """CLI entry point for showcase-portfolio.
 
 Usage:
-    python -m src generate [--output PATH]
-    python -m src summary
-    python -m src search QUERY
+    python -m src generate [--output PATH] [--format FMT ...] [--incremental] [--related N]
+                           [--precompress]
+    python -m src summary [--stream]
+    python -m src search QUERY [--substring | --fuzzy]
+    python -m src search --related SLUG [--count N]
     python -m src featured
+    python -m src query [--medium M ...] [--organ O ...] [--tag T ...] [--all-tags T ...]
+                        [--featured | --not-featured] [--text Q] [--limit N] [--json]
+    python -m src show SLUG
+    python -m src site --output DIR [--jobs N] [--page-size N] [--related N] [--precompress]
+    python -m src serve [--host HOST] [--port N] [--poll SECONDS]
+    python -m src add --title TITLE [--medium M] [--organ O] [--repo R] [--tag T ...]
+    python -m src --store DB import SOURCE [--registry] [--batch-size N] [--validate]
+    python -m src validate [SOURCE] [--registry] [--jobs N] [--max-errors N]
+    python -m src export [SOURCE ...] [--format FMT ...] [--output DIR] [--registry] [--jobs N]
+                         [--cv PATH] [--creator NAME] [--rights TEXT]
+                         [--max-works N] [--since YEAR] [--medium M]
+    python -m src diff OLD NEW [--registry] [--jobs N] [--limit N] [--json]
+    python -m src snapshot OUTPUT
+    python -m src clear-cache
+
+Global options:
+    --works PATH            works.json, or a .jsonl/.ndjson works file, to read
+                            (default: data/works.json)
+    --no-cache              Bypass the parsed-gallery cache stored next to the works file
+    --store PATH            Query a SQLite store (see 'import') instead of the works file
+    --snapshot PATH         Query a memory-mapped snapshot (see 'snapshot') instead
+    --timings, --profile    Emit a JSON report of per-phase timings, counts and peak memory
+    --timings-output PATH   Write that report to PATH instead of stderr
+    --pstats PATH           Also run under cProfile and dump the stats to PATH
 """
 
 from __future__ import annotations
@@ -12,40 +38,187 @@ from __future__ import annotations
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Subcommand handlers import what they need when they run, so starting the
+# CLI only pays for argparse. Defaults shown in --help come from the light
+# ``defaults`` module, which the feature modules read as well.
+from .defaults import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    DEFAULT_WORKS_PATH,
+    DIFF_LIMIT,
+    FACET_LIMIT,
+    MAX_ERRORS,
+    PAGE_SIZE,
+    POLL_INTERVAL,
+    QUERY_LIMIT,
+    RELATED_COUNT,
+    STORE_BATCH_SIZE,
+)
+from .profiling import phase
+
+if TYPE_CHECKING:
+    from .compress import CompressionReport
+    from .gallery import Gallery
+    from .profiling import Profiler
+    from .snapshot import SnapshotGallery
+    from .store import GalleryStore
+
+
+def _works_path(args: argparse.Namespace) -> Path:
+    return Path(args.works) if args.works else DEFAULT_WORKS_PATH
+
+
+def _source_path(args: argparse.Namespace) -> Path:
+    """Return the file ``_load_gallery`` reads: the snapshot, the store or the works file."""
+    if args.snapshot:
+        return Path(args.snapshot)
+    if args.store:
+        return Path(args.store)
+    return _works_path(args)
+
+
+def _load_gallery(args: argparse.Namespace) -> Gallery | GalleryStore | SnapshotGallery:
+    """Load the works file named on the command line, via the cache unless disabled.
+
+    With ``--store`` the SQLite store is opened instead, and with ``--snapshot``
+    the snapshot is mapped; both are queried on demand rather than loaded.
+    """
+    if args.snapshot:
+        return _open_snapshot(args)
+    if args.store:
+        return _open_store(args)
+    with phase("load"):
+        return _load_works_file(_works_path(args), use_cache=not args.no_cache)
+
+
+def _open_store(args: argparse.Namespace, create: bool = False) -> GalleryStore:
+    from .store import GalleryStore
+
+    path = Path(args.store)
+    if not create and not path.exists():
+        print(f"No store at {path}; create one with 'import'", file=sys.stderr)
+        sys.exit(2)
+    return GalleryStore(path)
 
-from .collector import collect_from_works_file
-from .renderer import render_html, render_json, render_markdown, render_summary
 
+def _open_snapshot(args: argparse.Namespace) -> SnapshotGallery:
+    from .snapshot import open_snapshot
 
-DEFAULT_WORKS_PATH = Path(__file__).parent.parent / "data" / "works.json"
+    path = Path(args.snapshot)
+    if not path.exists():
+        print(f"No snapshot at {path}; create one with 'snapshot'", file=sys.stderr)
+        sys.exit(2)
+    with phase("load"):
+        return open_snapshot(path)
+
+
+def _load_works_file(path: Path, use_cache: bool) -> Gallery:
+    """Load a works.json or JSON Lines works file; the latter re-reads only appended lines."""
+    from .cache import load_gallery
+    from .collector import collect_from_path, extend_from_ndjson, is_ndjson
+
+    extend = extend_from_ndjson if is_ndjson(path) else None
+    return load_gallery(path, collect_from_path, use_cache=use_cache, extend=extend)
 
 
 def cmd_generate(args: argparse.Namespace) -> None:
-    """Generate portfolio from works.json and output as markdown, HTML, or JSON."""
-    works_path = Path(args.works) if args.works else DEFAULT_WORKS_PATH
-    gallery = collect_from_works_file(works_path)
-
-    if args.format == "html":
-        output = render_html(gallery)
-    elif args.format == "json":
-        output = render_json(gallery)
-    else:
-        output = render_markdown(gallery)
+    """Generate portfolio from works.json and output as markdown, HTML, or JSON.
+
+    Several formats (``--format all`` or a repeated ``--format``) are rendered
+    concurrently from a single parse, each to ``--output`` with the format's
+    suffix.
+    """
+    from .pipeline import expand_formats, generate_formats, output_paths
+    from .renderer import FORMATS, related_json_entry, write_lines
+
+    formats = expand_formats(args.format)
+    if len(formats) > 1 and not args.output:
+        print("Multiple formats require --output", file=sys.stderr)
+        sys.exit(2)
+    if args.incremental and not args.output:
+        print("--incremental requires --output", file=sys.stderr)
+        sys.exit(2)
+    if args.precompress and not args.output:
+        print("--precompress requires --output", file=sys.stderr)
+        sys.exit(2)
+
+    gallery = _load_gallery(args)
+
+    if not args.output:
+        lines = FORMATS[formats[0]][0]
+        if formats[0] == "json":
+            write_lines(lines(gallery, entry_fragment=related_json_entry(gallery, args.related)),
+                        sys.stdout)
+        else:
+            write_lines(lines(gallery), sys.stdout)
+        print()
+        return
+
+    output = Path(args.output)
+    targets = output_paths(output, formats) if len(formats) > 1 else {formats[0]: output}
+    with phase("output"):
+        results = generate_formats(
+            gallery, targets, jobs=args.jobs, incremental=args.incremental, related=args.related,
+            source=_source_path(args),
+        )
+    for result in results:
+        detail = f"{result.fmt}, {result.seconds:.3f}s"
+        if result.stats is not None:
+            detail += (f", {result.stats.rendered} rendered, {result.stats.reused} reused, "
+                       f"{result.stats.removed} removed")
+        print(f"Portfolio written to {result.path} ({detail})")
+    if args.precompress:
+        from .compress import precompress
+
+        with phase("precompress"):
+            report = precompress([r.path for r in results], output.parent, jobs=args.jobs)
+        _print_compression(report, per_file=True)
 
-    if args.output:
-        Path(args.output).write_text(output, encoding="utf-8")
-        print(f"Portfolio written to {args.output}")
-    else:
-        print(output)
+
+def _print_compression(report: CompressionReport, per_file: bool = False) -> None:
+    """Print compressed sizes and ratios from a ``compress.CompressionReport``."""
+    print(f"Precompressed {report.compressed} file(s), skipped {report.skipped} unchanged "
+          f"({report.seconds:.3f}s)")
+    if per_file:
+        for f in report.files:
+            sizes = ", ".join(
+                f"{encoding} {size:,} B" + (f" ({size / f.size:.1%})" if f.size else "")
+                for encoding, size in f.sizes.items()
+            )
+            print(f"  {f.path}: {f.size:,} B -> {sizes}{' (unchanged)' if f.skipped else ''}")
+    for encoding in report.encodings:
+        original, compressed = report.totals(encoding)
+        ratio = f" ({compressed / original:.1%})" if original else ""
+        print(f"  {encoding}: {original:,} B -> {compressed:,} B{ratio}")
+    if report.removed:
+        print(f"  removed siblings of {report.removed} deleted file(s)")
+    if "brotli" not in report.encodings:
+        print("brotli is not installed; wrote .gz siblings only (pip install brotli for .br)",
+              file=sys.stderr)
 
 
 def cmd_summary(args: argparse.Namespace) -> None:
-    """Print portfolio statistics."""
-    works_path = Path(args.works) if args.works else DEFAULT_WORKS_PATH
-    gallery = collect_from_works_file(works_path)
-    summary = render_summary(gallery)
+    """Print portfolio statistics.
+
+    With ``--stream`` the counts are taken straight from the works file as it
+    is read, without building a gallery or touching the cache.
+    """
+    if args.stream and not (args.store or args.snapshot):
+        from .collector import collect_iter_from_path
+        from .gallery import GalleryStats
+
+        meta: dict = {}
+        stats = GalleryStats.from_works(collect_iter_from_path(_works_path(args), meta))
+        name = meta.get("gallery_name", "Portfolio")
+        summary = stats.as_summary()
+    else:
+        gallery = _load_gallery(args)
+        name = gallery.name
+        summary = gallery.stats.as_summary()
 
-    print(f"Portfolio: {gallery.name}")
+    print(f"Portfolio: {name}")
     print(f"Total works: {summary['total_works']}")
     print(f"Featured: {summary['featured_count']}")
     print()
@@ -59,10 +232,16 @@ def cmd_summary(args: argparse.Namespace) -> None:
 
 
 def cmd_search(args: argparse.Namespace) -> None:
-    """Search works by keyword."""
-    works_path = Path(args.works) if args.works else DEFAULT_WORKS_PATH
-    gallery = collect_from_works_file(works_path)
-    results = gallery.search(args.query)
+    """Search works by keyword, or with ``--related`` list the works most like one work."""
+    if (args.query is None) == (args.related is None):
+        print("search takes either QUERY or --related SLUG", file=sys.stderr)
+        sys.exit(2)
+    gallery = _load_gallery(args)
+    if args.related is not None:
+        _print_related(gallery, args.related, args.count)
+        return
+    mode = "substring" if args.substring else "fuzzy" if args.fuzzy else "ranked"
+    results = gallery.search(args.query, mode=mode)
 
     if not results:
         print(f"No works found matching '{args.query}'")
@@ -77,10 +256,32 @@ def cmd_search(args: argparse.Namespace) -> None:
         print()
 
 
+def _print_related(
+    gallery: Gallery | GalleryStore | SnapshotGallery, slug: str, count: int
+) -> None:
+    work = gallery.get_by_slug(slug)
+    if work is None:
+        print(f"No work with slug '{slug}'", file=sys.stderr)
+        sys.exit(1)
+    related = gallery.related(work, count)
+    if not related:
+        print(f"No works related to '{slug}'")
+        return
+
+    print(f"Works related to {work.title}:")
+    print()
+    for other in related:
+        featured_mark = " [FEATURED]" if other.featured else ""
+        print(f"  {other.title} ({other.medium.value}) — {other.organ}{featured_mark}")
+        print(f"    slug: {other.slug}")
+        if other.tags:
+            print(f"    tags: {', '.join(other.tags)}")
+        print()
+
+
 def cmd_featured(args: argparse.Namespace) -> None:
     """List only featured works."""
-    works_path = Path(args.works) if args.works else DEFAULT_WORKS_PATH
-    gallery = collect_from_works_file(works_path)
+    gallery = _load_gallery(args)
     featured = gallery.featured_works()
 
     if not featured:
@@ -96,6 +297,360 @@ def cmd_featured(args: argparse.Namespace) -> None:
         print()
 
 
+def cmd_query(args: argparse.Namespace) -> None:
+    """List works matching a combination of facet filters, with facet counts.
+
+    Values repeated within one filter are alternatives; different filters
+    must all hold.
+    """
+    from .facets import FacetQuery
+    from .gallery import Medium
+
+    try:
+        media = tuple(Medium(m) for m in args.medium or ())
+    except ValueError as exc:
+        print(f"{exc}; choose from: {', '.join(m.value for m in Medium)}", file=sys.stderr)
+        sys.exit(2)
+    query = FacetQuery(
+        media=media,
+        organs=tuple(args.organ or ()),
+        tags=tuple(args.tag or ()),
+        all_tags=tuple(args.all_tags or ()),
+        featured=args.featured,
+        text=args.text or "",
+        mode="substring" if args.substring else "fuzzy" if args.fuzzy else "ranked",
+    )
+    gallery = _load_gallery(args)
+    result = gallery.query(query)
+    shown = result.works[:args.limit] if args.limit > 0 else result.works
+
+    if args.json:
+        import json
+
+        from .renderer import work_record
+
+        print(json.dumps({
+            "total": result.total,
+            "works": [work_record(w) for w in shown],
+            "facets": result.facets,
+        }, indent=2, ensure_ascii=False))
+        return
+
+    print(f"Found {result.total} work(s); showing {len(shown)}:")
+    print()
+    for work in shown:
+        featured_mark = " [FEATURED]" if work.featured else ""
+        print(f"  {work.title} ({work.medium.value}) — {work.organ}{featured_mark}")
+    print()
+    for facet, counts in result.facets.items():
+        print(f"By {facet}:")
+        for value, count in list(counts.items())[:FACET_LIMIT]:
+            print(f"  {value}: {count}")
+        if len(counts) > FACET_LIMIT:
+            print(f"  ... {len(counts) - FACET_LIMIT} more")
+
+
+def cmd_show(args: argparse.Namespace) -> None:
+    """Print one work, looked up by slug."""
+    gallery = _load_gallery(args)
+    work = gallery.get_by_slug(args.slug)
+
+    if work is None:
+        print(f"No work with slug '{args.slug}'", file=sys.stderr)
+        sys.exit(1)
+
+    featured_mark = " [FEATURED]" if work.featured else ""
+    print(f"{work.title}{featured_mark}")
+    print(f"  slug: {work.slug}")
+    print(f"  {work.medium.value} | {work.organ} | {work.repo}")
+    if work.date_created:
+        print(f"  created: {work.date_created.isoformat()}")
+    if work.tags:
+        print(f"  tags: {', '.join(work.tags)}")
+    if work.url:
+        print(f"  url: {work.url}")
+    print()
+    print(f"  {work.description}")
+
+
+def cmd_site(args: argparse.Namespace) -> None:
+    """Write a static site with one page per work and paginated listings."""
+    from .site import build_site
+
+    gallery = _load_gallery(args)
+    stats = build_site(
+        gallery, Path(args.output), jobs=args.jobs, page_size=args.page_size, related=args.related
+    )
+    print(f"Site written to {args.output}: {stats.work_pages} work pages, "
+          f"{stats.listing_pages} listing pages in {stats.seconds:.3f}s")
+    if stats.removed_pages:
+        print(f"Removed {stats.removed_pages} stale page(s)")
+    if args.precompress:
+        from .compress import precompress_tree
+
+        with phase("precompress"):
+            report = precompress_tree(Path(args.output), jobs=args.jobs)
+        _print_compression(report)
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Serve the gallery as a JSON HTTP API, reloading when the works file changes."""
+    import asyncio
+
+    from .server import GalleryServer
+
+    if args.snapshot:
+        from .snapshot import open_snapshot
+
+        source, load = _open_snapshot(args).path, open_snapshot
+    elif args.store:
+        from .store import GalleryStore
+
+        source, load = _open_store(args).path, GalleryStore
+    else:
+        use_cache = not args.no_cache
+        source, load = _works_path(args), lambda path: _load_works_file(path, use_cache)
+    server = GalleryServer(source, load, poll_interval=args.poll)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_add(args: argparse.Namespace) -> None:
+    """Append one work to a JSON Lines works file without rewriting it, or to the store."""
+    from .collector import append_work, is_ndjson
+    from .gallery import Medium, Work
+
+    works_path = _works_path(args)
+    if args.snapshot:
+        print("Snapshots are read-only; add to the works file and rewrite the snapshot",
+              file=sys.stderr)
+        sys.exit(2)
+    if not args.store and not is_ndjson(works_path):
+        print(f"add needs a JSON Lines works file (.jsonl or .ndjson), not {works_path}",
+              file=sys.stderr)
+        sys.exit(2)
+    try:
+        Medium(args.medium)
+    except ValueError:
+        print(f"Unknown medium '{args.medium}'; choose from: "
+              f"{', '.join(m.value for m in Medium)}", file=sys.stderr)
+        sys.exit(2)
+
+    item = {
+        "title": args.title,
+        "description": args.description,
+        "medium": args.medium,
+        "organ": args.organ,
+        "repo": args.repo,
+        "tags": args.tag or [],
+        "featured": args.featured,
+    }
+    if args.store:
+        with _open_store(args) as store:
+            store.add_work(Work(**{**item, "medium": Medium(args.medium)}))
+        print(f"Added '{args.title}' to {args.store}")
+        return
+    append_work(works_path, item)
+    print(f"Added '{args.title}' to {works_path}")
+
+
+def cmd_import(args: argparse.Namespace) -> None:
+    """Bulk-load a works file or registry into the SQLite store in batched transactions."""
+    import time
+
+    from .store import import_registry, import_works_file
+
+    if not args.store:
+        print("import requires --store", file=sys.stderr)
+        sys.exit(2)
+    start = time.perf_counter()
+    with _open_store(args, create=True) as store:
+        load = import_registry if args.registry else import_works_file
+        try:
+            added = load(store, Path(args.source), batch_size=args.batch_size,
+                         validate=args.validate)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+    print(f"Imported {added} works into {args.store} in {time.perf_counter() - start:.3f}s")
+
+
+def cmd_validate(args: argparse.Namespace) -> None:
+    """Check every record of a works file or registry, reporting all failures.
+
+    Exits 1 if any record is invalid, listing up to ``--max-errors`` of them.
+    """
+    import time
+
+    from .validation import validate_path
+
+    path = Path(args.source) if args.source else _works_path(args)
+    kind = "registry" if args.registry else "works"
+    start = time.perf_counter()
+    try:
+        report = validate_path(path, kind, jobs=args.jobs)
+    except (OSError, ValueError) as exc:
+        print(f"Cannot read {path}: {exc}", file=sys.stderr)
+        sys.exit(2)
+    seconds = time.perf_counter() - start
+
+    if report.ok:
+        print(f"{path}: {report.records} {kind} record(s) valid ({seconds:.3f}s)")
+        return
+    print(f"{path}: {len(report.errors)} error(s) in {report.invalid_records} of "
+          f"{report.records} {kind} record(s) ({seconds:.3f}s)")
+    shown = report.errors if args.max_errors <= 0 else report.errors[:args.max_errors]
+    for error in shown:
+        print(f"  {error}")
+    if len(shown) < len(report.errors):
+        print(f"  ... and {len(report.errors) - len(shown)} more")
+    sys.exit(1)
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    """Export works as JSON Resume projects, Dublin Core XML/JSON or a grant list.
+
+    Each SOURCE (works file, registry with ``--registry``, or RenderCV YAML)
+    is streamed into every format by worker processes, writing
+    ``<stem><suffix>`` files under ``--output``. Without sources the loaded
+    gallery is exported, to stdout when one format is asked for and no
+    ``--output`` is given.
+    """
+    from .export import EXPORT_FORMATS, ExportOptions, export_sources, expand_export_formats
+    from .gallery import Medium
+
+    try:
+        medium = Medium(args.medium) if args.medium else None
+    except ValueError:
+        print(f"Unknown medium '{args.medium}'; choose from: "
+              f"{', '.join(m.value for m in Medium)}", file=sys.stderr)
+        sys.exit(2)
+    formats = expand_export_formats(args.format)
+    options = ExportOptions(
+        creator=args.creator, rights=args.rights, max_works=args.max_works, since=args.since,
+        medium=medium, cv=Path(args.cv) if args.cv else None,
+    )
+
+    if args.sources:
+        if not args.output:
+            print("Exporting SOURCE files requires --output DIR", file=sys.stderr)
+            sys.exit(2)
+        try:
+            results = export_sources([Path(s) for s in args.sources], formats, Path(args.output),
+                                     options, registry=args.registry, jobs=args.jobs)
+        except (OSError, ValueError) as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+        for result in results:
+            print(f"Exported {result.source} to {result.path} "
+                  f"({result.fmt}, {result.records} works, {result.seconds:.3f}s)")
+        return
+
+    from .export import write_export
+
+    gallery = _load_gallery(args)
+    if not args.output:
+        if len(formats) > 1:
+            print("Multiple formats require --output", file=sys.stderr)
+            sys.exit(2)
+        write_export(gallery.works, formats[0], sys.stdout, options)
+        print()
+        return
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    stem = _works_path(args).stem if not (args.store or args.snapshot) else "gallery"
+    for fmt in formats:
+        path = output / f"{stem}{EXPORT_FORMATS[fmt]}"
+        with open(path, "w", encoding="utf-8") as f:
+            written = write_export(gallery.works, fmt, f, options)
+        print(f"Exported {written} works to {path} ({fmt})")
+
+
+def _brief(value: object, width: int = 60) -> str:
+    import json
+
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def cmd_diff(args: argparse.Namespace) -> None:
+    """Report works added, removed and changed between two works files or registries.
+
+    Exits 0 when the inputs hold the same works, 1 when they differ and 2
+    when either cannot be read, like diff(1).
+    """
+    from .diff import diff_paths
+
+    try:
+        report = diff_paths(Path(args.old), Path(args.new), registry=args.registry, jobs=args.jobs)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Cannot diff {args.old} and {args.new}: {exc}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        import json
+
+        print(json.dumps(report.as_dict(), indent=2))
+    else:
+        print(f"{args.old} -> {args.new}: {len(report.added)} added, {len(report.removed)} "
+              f"removed, {len(report.changed)} changed, {report.unchanged} unchanged "
+              f"({report.seconds:.3f}s)")
+        entries = [("+", key, ()) for key in report.added]
+        entries += [("-", key, ()) for key in report.removed]
+        entries += [("~", change.key, change.changes) for change in report.changed]
+        shown = entries if args.limit <= 0 else entries[:args.limit]
+        for mark, key, changes in shown:
+            print(f"{mark} {key}")
+            for change in changes:
+                print(f"    {change.field}: {_brief(change.old)} -> {_brief(change.new)}")
+        if len(shown) < len(entries):
+            print(f"... and {len(entries) - len(shown)} more")
+    if not report.identical:
+        sys.exit(1)
+
+
+def cmd_snapshot(args: argparse.Namespace) -> None:
+    """Write the gallery (from the works file or --store) as a memory-mapped snapshot."""
+    import time
+
+    from .snapshot import write_snapshot
+
+    if args.snapshot:
+        print("snapshot reads the works file or --store, not --snapshot", file=sys.stderr)
+        sys.exit(2)
+    start = time.perf_counter()
+    gallery = _load_gallery(args)
+    with phase("output"):
+        write_snapshot(gallery, Path(args.output))
+    print(f"Snapshot of {len(gallery.works)} works written to {args.output} "
+          f"in {time.perf_counter() - start:.3f}s")
+
+
+def cmd_clear_cache(args: argparse.Namespace) -> None:
+    """Delete the cached gallery for the works file."""
+    from .cache import clear_cache
+
+    works_path = _works_path(args)
+    if clear_cache(works_path):
+        print(f"Cleared cache for {works_path}")
+    else:
+        print(f"No cache for {works_path}")
+
+
+def _emit_timings(args: argparse.Namespace, profiler: Profiler) -> None:
+    import json
+
+    report = json.dumps(
+        profiler.report(command=args.command, argv=sys.argv[1:]), indent=2
+    )
+    if args.timings_output:
+        Path(args.timings_output).write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report, file=sys.stderr)
+
+
 def main() -> None:
     """Parse arguments and dispatch to subcommands."""
     parser = argparse.ArgumentParser(
@@ -105,7 +660,37 @@ def main() -> None:
     parser.add_argument(
         "--works",
         default=None,
-        help=f"Path to works.json (default: {DEFAULT_WORKS_PATH})",
+        help=f"Path to works.json or a .jsonl/.ndjson works file (default: {DEFAULT_WORKS_PATH})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the works file directly instead of using the cached gallery",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="PATH",
+        help="Query works from this SQLite store instead of the works file",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="Query works from this memory-mapped snapshot instead of the works file",
+    )
+    parser.add_argument(
+        "--timings", "--profile",
+        action="store_true",
+        help="Report per-phase timings, object counts and tracemalloc peak memory as JSON",
+    )
+    parser.add_argument(
+        "--timings-output",
+        metavar="PATH",
+        help="Write the timings report to PATH instead of stderr (implies --timings)",
+    )
+    parser.add_argument(
+        "--pstats",
+        metavar="PATH",
+        help="Also run under cProfile and dump pstats data to PATH (implies --timings)",
     )
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
@@ -115,21 +700,285 @@ def main() -> None:
     gen_parser.add_argument("--output", "-o", help="Output file path (default: stdout)")
     gen_parser.add_argument(
         "--format", "-f",
-        choices=["markdown", "html", "json"],
-        default="markdown",
-        help="Output format (default: markdown)",
+        action="append",
+        choices=["markdown", "html", "json", "all"],
+        help="Output format; repeat or use 'all' for several (default: markdown)",
+    )
+    gen_parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="Worker processes for multi-format output (default: one per format)",
+    )
+    gen_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep outputs whose source is unchanged, and reuse unchanged works' JSON entries",
+    )
+    gen_parser.add_argument(
+        "--related",
+        type=int,
+        default=0,
+        metavar="N",
+        help="List the slugs of up to N related works in each JSON record (default: 0, off)",
+    )
+    gen_parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Also write .gz (and, with brotli installed, .br) siblings of each changed output",
     )
 
     # summary
-    subparsers.add_parser("summary", help="Print portfolio statistics")
+    summary_parser = subparsers.add_parser("summary", help="Print portfolio statistics")
+    summary_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Count works while streaming the file instead of loading a gallery",
+    )
 
     # search
     search_parser = subparsers.add_parser("search", help="Search works by keyword")
-    search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("query", nargs="?", help="Search query")
+    search_modes = search_parser.add_mutually_exclusive_group()
+    search_modes.add_argument(
+        "--substring",
+        action="store_true",
+        help="Match raw substrings in gallery order instead of ranked token search",
+    )
+    search_modes.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="Tolerate typos: match title and tag words within a small edit distance",
+    )
+    search_modes.add_argument(
+        "--related",
+        metavar="SLUG",
+        help="List the works most similar to this one by tags and description, instead",
+    )
+    search_parser.add_argument(
+        "--count",
+        type=int,
+        default=RELATED_COUNT,
+        help=f"Related works to list with --related (default: {RELATED_COUNT})",
+    )
 
     # featured
     subparsers.add_parser("featured", help="List featured works")
 
+    # query
+    query_parser = subparsers.add_parser(
+        "query", help="Filter works by medium, organ, tags, featured and text, with facet counts"
+    )
+    query_parser.add_argument("--medium", action="append", help="Medium; repeat for any of several")
+    query_parser.add_argument("--organ", action="append", help="Organ; repeat for any of several")
+    query_parser.add_argument("--tag", action="append", help="Tag; repeat for any of several")
+    query_parser.add_argument(
+        "--all-tags",
+        action="append",
+        metavar="TAG",
+        help="Tag every result must have; repeat for several",
+    )
+    featured_filter = query_parser.add_mutually_exclusive_group()
+    featured_filter.add_argument(
+        "--featured", dest="featured", action="store_const", const=True, default=None,
+        help="Only featured works",
+    )
+    featured_filter.add_argument(
+        "--not-featured", dest="featured", action="store_const", const=False,
+        help="Only works that are not featured",
+    )
+    query_parser.add_argument("--text", help="Search query the results must also match")
+    text_modes = query_parser.add_mutually_exclusive_group()
+    text_modes.add_argument("--substring", action="store_true", help="Match --text as a substring")
+    text_modes.add_argument("--fuzzy", action="store_true", help="Match --text with typo tolerance")
+    query_parser.add_argument(
+        "--limit",
+        type=int,
+        default=QUERY_LIMIT,
+        help=f"Works to list, 0 for all (default: {QUERY_LIMIT})",
+    )
+    query_parser.add_argument(
+        "--json", action="store_true", help="Print the result and facet counts as JSON"
+    )
+
+    # show
+    show_parser = subparsers.add_parser("show", help="Show one work by its slug")
+    show_parser.add_argument("slug", help="Work slug, as in the JSON output and site URLs")
+
+    # site
+    site_parser = subparsers.add_parser("site", help="Generate a static site, one page per work")
+    site_parser.add_argument("--output", "-o", required=True, help="Output directory")
+    site_parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    site_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PAGE_SIZE,
+        help=f"Works per listing page (default: {PAGE_SIZE})",
+    )
+    site_parser.add_argument(
+        "--related",
+        type=int,
+        default=RELATED_COUNT,
+        metavar="N",
+        help=f"Related works linked from each work page, 0 for none (default: {RELATED_COUNT})",
+    )
+    site_parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Also write .gz (and, with brotli installed, .br) siblings of each changed file",
+    )
+
+    # serve
+    serve_parser = subparsers.add_parser("serve", help="Serve the gallery as a JSON HTTP API")
+    serve_parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Address to bind (default: {DEFAULT_HOST})",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT})",
+    )
+    serve_parser.add_argument(
+        "--poll",
+        type=float,
+        default=POLL_INTERVAL,
+        help=f"Seconds between checks of the works file for changes (default: {POLL_INTERVAL})",
+    )
+
+    # add
+    add_parser = subparsers.add_parser("add", help="Append a work to a JSON Lines works file")
+    add_parser.add_argument("--title", required=True, help="Work title")
+    add_parser.add_argument("--description", default="", help="Work description")
+    add_parser.add_argument("--medium", default="software", help="Medium (default: software)")
+    add_parser.add_argument("--organ", default="", help="Owning organ")
+    add_parser.add_argument("--repo", default="", help="Source repository")
+    add_parser.add_argument("--tag", action="append", help="Tag; repeat for several")
+    add_parser.add_argument("--featured", action="store_true", help="Mark the work as featured")
+
+    # import
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk-load works into the SQLite store named by --store"
+    )
+    import_parser.add_argument("source", help="works.json, .jsonl works file or registry to load")
+    import_parser.add_argument(
+        "--registry",
+        action="store_true",
+        help="Read SOURCE as a registry-v2.json file",
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=STORE_BATCH_SIZE,
+        help=f"Works per transaction (default: {STORE_BATCH_SIZE})",
+    )
+    import_parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every record first and import nothing if any is invalid",
+    )
+
+    # validate
+    validate_parser = subparsers.add_parser(
+        "validate", help="Check every record of a works file or registry and list all errors"
+    )
+    validate_parser.add_argument(
+        "source", nargs="?", help="File to check (default: the --works file)"
+    )
+    validate_parser.add_argument(
+        "--registry", action="store_true", help="Read SOURCE as a registry-v2.json file"
+    )
+    validate_parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="Worker processes for very large inputs (default: CPU count)",
+    )
+    validate_parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=MAX_ERRORS,
+        help=f"Errors to list, 0 for all (default: {MAX_ERRORS})",
+    )
+
+    # export
+    export_parser = subparsers.add_parser(
+        "export", help="Export works as JSON Resume, Dublin Core XML/JSON or a grant list"
+    )
+    export_parser.add_argument(
+        "sources", nargs="*", metavar="SOURCE",
+        help="Works files, registries or RenderCV YAML files (default: the loaded gallery)",
+    )
+    export_parser.add_argument(
+        "--format", "-f",
+        action="append",
+        choices=["jsonresume", "dublin-core-xml", "dublin-core-json", "grant", "all"],
+        help="Export format; repeat or use 'all' for several (default: jsonresume)",
+    )
+    export_parser.add_argument(
+        "--output", "-o", help="Output directory (default: stdout for one format)"
+    )
+    export_parser.add_argument(
+        "--registry", action="store_true", help="Read SOURCE files as registry-v2.json files"
+    )
+    export_parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="Worker processes, one source and format each (default: CPU count)",
+    )
+    export_parser.add_argument(
+        "--cv", metavar="PATH", help="RenderCV YAML whose resume the works are added to"
+    )
+    export_parser.add_argument("--creator", default="", help="Dublin Core creator")
+    export_parser.add_argument("--rights", default="", help="Dublin Core rights statement")
+    export_parser.add_argument(
+        "--max-works", type=int, default=0, help="Works in a grant list, 0 for all (default: 0)"
+    )
+    export_parser.add_argument(
+        "--since", type=int, metavar="YEAR", help="Grant list: only works from YEAR onward"
+    )
+    export_parser.add_argument("--medium", help="Grant list: only works of this medium")
+
+    # diff
+    diff_parser = subparsers.add_parser(
+        "diff", help="List works added, removed and changed between two works files"
+    )
+    diff_parser.add_argument("old", help="Earlier works file or registry")
+    diff_parser.add_argument("new", help="Later works file or registry")
+    diff_parser.add_argument(
+        "--registry", action="store_true", help="Read both files as registry-v2.json files"
+    )
+    diff_parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    diff_parser.add_argument(
+        "--limit",
+        type=int,
+        default=DIFF_LIMIT,
+        help=f"Differences to list, 0 for all (default: {DIFF_LIMIT})",
+    )
+    diff_parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+
+    # snapshot
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="Write a memory-mapped columnar snapshot for fast read-only queries"
+    )
+    snapshot_parser.add_argument("output", help="Snapshot file to write")
+
+    # clear-cache
+    subparsers.add_parser("clear-cache", help="Delete the cached gallery for the works file")
+
     args = parser.parse_args()
 
     if not args.command:
@@ -141,8 +990,34 @@ def main() -> None:
         "summary": cmd_summary,
         "search": cmd_search,
         "featured": cmd_featured,
+        "query": cmd_query,
+        "show": cmd_show,
+        "site": cmd_site,
+        "serve": cmd_serve,
+        "add": cmd_add,
+        "import": cmd_import,
+        "validate": cmd_validate,
+        "export": cmd_export,
+        "diff": cmd_diff,
+        "snapshot": cmd_snapshot,
+        "clear-cache": cmd_clear_cache,
     }
-    commands[args.command](args)
+    command = commands[args.command]
+    if not (args.timings or args.timings_output or args.pstats):
+        command(args)
+        return
+
+    from .profiling import profiling
+
+    pstats_path = Path(args.pstats) if args.pstats else None
+    profiler = None
+    try:
+        with profiling(pstats_path=pstats_path) as profiler, phase(args.command):
+            command(args)
+    finally:
+        # Commands may end with sys.exit(); the report is still emitted.
+        if profiler is not None:
+            _emit_timings(args, profiler)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""Replace output files atomically, with the permissions a plain ``open`` would give."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+# ``mkstemp`` creates files 0600; outputs get the mode ``open`` would have.
+# Reading the umask means setting it, so it is read once rather than per
+# write, where a concurrent thread could create a file while it is cleared.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def mkstemp_beside(path: Path, prefix: str | None = None) -> tuple[int, str]:
+    """Create a temporary file next to ``path`` for a later ``os.replace``.
+
+    Returns the open descriptor and the file's name, like ``tempfile.mkstemp``.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}" if prefix is None else prefix
+    )
+    try:
+        os.chmod(tmp_name, FILE_MODE)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_name)
+        raise
+    return fd, tmp_name
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb", prefix: str | None = None) -> Iterator[IO]:
+    """Yield a file that replaces ``path`` when the block completes.
+
+    If the block raises, the temporary file is removed and ``path`` is left
+    untouched. Text modes write UTF-8.
+    """
+    fd, tmp_name = mkstemp_beside(path, prefix)
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
@@ -0,0 +1,343 @@
+"""On-disk cache of parsed galleries, stored next to their source file."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+from . import __version__
+from .gallery import Gallery, paused_gc
+from .profiling import count, phase
+from .search import SearchIndex
+
+
+CACHE_SUFFIX = ".gallery-cache"
+CACHE_MAGIC = b"SPGC"
+CACHE_FORMAT = 2
+
+# marshal output is only guaranteed stable within one Python minor version.
+_PYTHON = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<4sHI")
+
+
+def cache_path_for(source: Path) -> Path:
+    """Return the hidden cache file that sits alongside ``source``."""
+    return source.with_name(f".{source.name}{CACHE_SUFFIX}")
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _source_key(source: Path) -> dict:
+    stat = source.stat()
+    return {
+        "path": str(source.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "version": __version__,
+        "python": _PYTHON,
+    }
+
+
+def _read_header(cache_path: Path) -> tuple[dict, int] | None:
+    """Return the cache header and the offset of the gallery payload."""
+    try:
+        with open(cache_path, "rb") as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) != _PREAMBLE.size:
+                return None
+            magic, fmt, header_len = _PREAMBLE.unpack(preamble)
+            if magic != CACHE_MAGIC or fmt != CACHE_FORMAT:
+                return None
+            header = json.loads(f.read(header_len))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header, dict):
+        return None
+    return header, _PREAMBLE.size + header_len
+
+
+def _write_entry(cache_path: Path, header: dict, *sections: bytes) -> int:
+    """Atomically write a cache file; return the offset of its first section."""
+    header_bytes = json.dumps(header).encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(CACHE_MAGIC, CACHE_FORMAT, len(header_bytes)))
+            f.write(header_bytes)
+            for section in sections:
+                f.write(section)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return _PREAMBLE.size + len(header_bytes)
+
+
+def _read_sections(cache_path: Path, header: dict, offset: int) -> tuple[bytes, bytes]:
+    """Return the raw works and search index sections of a cache file."""
+    with open(cache_path, "rb") as f:
+        f.seek(offset)
+        works_bytes = f.read(header["works_length"])
+        return works_bytes, f.read(header.get("index_length", 0))
+
+
+def _load_index_section(cache_path: Path, offset: int, length: int) -> SearchIndex:
+    with open(cache_path, "rb") as f:
+        f.seek(offset)
+        return SearchIndex.from_state(marshal.loads(f.read(length)))
+
+
+def _read_gallery(cache_path: Path, header: dict, offset: int) -> Gallery | None:
+    """Decode the works section; the search index section is loaded on first search."""
+    try:
+        with open(cache_path, "rb") as f:
+            f.seek(offset)
+            payload = f.read(header["works_length"])
+        with paused_gc():
+            gallery = Gallery.from_state(marshal.loads(payload))
+    except Exception:
+        return None
+    _attach_index(gallery, cache_path, header, offset)
+    return gallery
+
+
+def _attach_index(gallery: Gallery, cache_path: Path, header: dict, offset: int) -> None:
+    """Load the entry's search index on first search, or add one to the entry once built."""
+    index_length = header.get("index_length")
+    if index_length:
+        index_offset = offset + header["works_length"]
+        gallery.set_search_index_loader(
+            lambda: _load_index_section(cache_path, index_offset, index_length),
+            covers=header.get("index_docs"),
+        )
+    else:
+        gallery.on_search_index_built(
+            lambda: _add_index_section(gallery, cache_path, header, offset)
+        )
+
+
+def _add_index_section(gallery: Gallery, cache_path: Path, header: dict, offset: int) -> None:
+    """Rewrite the cache entry ``gallery`` was loaded from with its newly built search index.
+
+    Skipped when the gallery has gained or lost works since, or the entry
+    has been replaced, since the index would no longer describe it.
+    """
+    state = gallery.search_index_state()
+    if state is None or len(gallery.works) != header.get("works"):
+        return
+    found = _read_header(cache_path)
+    if found is None or found[0] != header:
+        return
+    with phase("cache_write"):
+        index_bytes = marshal.dumps(state)
+        try:
+            works_bytes, _ = _read_sections(cache_path, header, found[1])
+            updated = dict(header, index_length=len(index_bytes), index_docs=len(gallery.works))
+            _write_entry(cache_path, updated, works_bytes, index_bytes)
+        except OSError:
+            pass
+
+
+def write_cache(
+    source: Path,
+    gallery: Gallery,
+    digest: str | None = None,
+    index_section: tuple[bytes, int] | None = None,
+    key: dict | None = None,
+) -> Path | None:
+    """Persist ``gallery`` as the cache entry for ``source``.
+
+    The file holds a JSON header followed by two ``marshal`` sections: the
+    works, and the search index if one has been built. When it has not,
+    ``index_section`` may supply an existing section's raw bytes with the
+    number of leading works it covers, so it is carried over undecoded.
+    ``key`` and ``digest`` describe the source bytes ``gallery`` was parsed
+    from; by default the file is stat'ed and hashed now. The write is
+    atomic; a directory that cannot be written to is silently skipped and
+    ``None`` is returned.
+    """
+    cache_path = cache_path_for(source)
+    header = dict(key) if key is not None else _source_key(source)
+    header["sha256"] = digest or file_digest(source)
+    works_bytes = marshal.dumps(gallery.to_state())
+    index_state = gallery.search_index_state()
+    if index_state is not None:
+        index_bytes, index_docs = marshal.dumps(index_state), len(gallery.works)
+    elif index_section is not None:
+        index_bytes, index_docs = index_section
+    else:
+        index_bytes, index_docs = b"", 0
+    header["works"] = len(gallery.works)
+    header["works_length"] = len(works_bytes)
+    header["index_length"] = len(index_bytes)
+    header["index_docs"] = index_docs
+    try:
+        offset = _write_entry(cache_path, header, works_bytes, index_bytes)
+    except OSError:
+        return None
+    if not index_bytes:
+        gallery.on_search_index_built(
+            lambda: _add_index_section(gallery, cache_path, header, offset)
+        )
+    return cache_path
+
+
+def _read_extended(
+    source: Path,
+    cache_path: Path,
+    header: dict,
+    offset: int,
+    extend: Callable[[Gallery, Path, int, bytes], int],
+) -> Gallery | None:
+    """Reuse a cache entry for a prefix of ``source`` and ingest only the new tail.
+
+    The prefix is hashed and the tail read in one pass, and the tail is
+    parsed from the bytes that were hashed. The cached search index section
+    is copied into the new entry without being decoded; works from the tail
+    are indexed when it is first loaded.
+    """
+    key = _source_key(source)
+    digest = hashlib.sha256()
+    last = b"\n"
+    with open(source, "rb") as f:
+        remaining = header["size"]
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+            last = chunk[-1:]
+        if header.get("sha256") != digest.hexdigest() or last != b"\n":
+            return None
+        tail = f.read()
+    digest.update(tail)
+    key["size"] = header["size"] + len(tail)
+    gallery = _read_gallery(cache_path, header, offset)
+    if gallery is None:
+        return None
+    index_docs = header.get("index_docs", len(gallery.works))
+    _, index_bytes = _read_sections(cache_path, header, offset)
+    try:
+        with phase("cache_extend"):
+            count("cache_extended_works", extend(gallery, source, header["size"], tail))
+    except ValueError:
+        return None
+    with phase("cache_write"):
+        written = write_cache(
+            source, gallery, digest.hexdigest(), (index_bytes, index_docs), key
+        )
+    if written is not None and gallery.search_index_pending:
+        # The loader must point into the rewritten file, not the replaced one.
+        found = _read_header(written)
+        if found is not None:
+            _attach_index(gallery, written, *found)
+    return gallery
+
+
+def _restamp(cache_path: Path, header: dict, offset: int, key: dict) -> tuple[dict, int]:
+    """Record ``key``'s mtime in an entry whose source was touched but not edited."""
+    updated = dict(header, mtime_ns=key["mtime_ns"])
+    try:
+        new_offset = _write_entry(cache_path, updated, *_read_sections(cache_path, header, offset))
+    except OSError:
+        return header, offset
+    return updated, new_offset
+
+
+def read_cache(
+    source: Path,
+    extend: Callable[[Gallery, Path, int, bytes], int] | None = None,
+) -> Gallery | None:
+    """Return the cached gallery for ``source``, or ``None`` if missing or stale.
+
+    An entry is fresh when path, size and mtime all match. If only the mtime
+    differs, the content hash decides, and a matching entry is re-stamped so
+    the next lookup takes the fast path.
+
+    For append-only sources, ``extend(gallery, source, offset, tail)`` may be
+    given: when the file has grown and its first ``offset`` bytes still hash
+    to the cached digest, the cached gallery is extended with ``tail``, the
+    file's bytes from that offset, and re-cached, instead of re-parsing the
+    whole file. It returns the number of works added and raises
+    ``ValueError`` if the tail cannot be resumed at ``offset``.
+    """
+    cache_path = cache_path_for(source)
+    found = _read_header(cache_path)
+    if found is None:
+        return None
+    header, offset = found
+    current = _source_key(source)
+    if any(header.get(k) != current[k] for k in ("path", "version", "python")):
+        return None
+    if header.get("size") != current["size"]:
+        if extend is not None and header.get("size", 0) < current["size"]:
+            return _read_extended(source, cache_path, header, offset, extend)
+        return None
+    if header.get("mtime_ns") != current["mtime_ns"]:
+        if header.get("sha256") != file_digest(source):
+            return None
+        header, offset = _restamp(cache_path, header, offset, current)
+    return _read_gallery(cache_path, header, offset)
+
+
+def clear_cache(source: Path) -> bool:
+    """Delete the cache entry for ``source``. Return whether one existed."""
+    try:
+        cache_path_for(source).unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def load_gallery(
+    source: Path,
+    build: Callable[..., Gallery],
+    use_cache: bool = True,
+    extend: Callable[[Gallery, Path, int, bytes], int] | None = None,
+) -> Gallery:
+    """Load a gallery through the cache, calling ``build`` on a miss.
+
+    ``build(source, data=...)`` parses the source bytes the cache has read
+    and hashed, so the entry's digest always describes what was parsed;
+    with ``use_cache=False`` it is called as ``build(source)``. ``extend``
+    enables tail-only re-ingestion of append-only sources; see
+    ``read_cache``.
+
+    Loading never builds the search index. The first search that builds it
+    adds it to the cache entry, so later processes load it instead.
+    Cache payloads are ``marshal`` data, so cache files are trusted as much
+    as the directory they live in.
+    """
+    if not use_cache:
+        return build(source)
+    with phase("cache_read"):
+        gallery = read_cache(source, extend)
+    if gallery is not None:
+        count("cache_hits")
+        return gallery
+    count("cache_misses")
+    key = _source_key(source)
+    with phase("read"):
+        data = source.read_bytes()
+    # The stat above may predate an append; the entry describes the bytes read.
+    key["size"] = len(data)
+    digest = hashlib.sha256(data).hexdigest()
+    gallery = build(source, data=data)
+    del data
+    with phase("cache_write"):
+        write_cache(source, gallery, digest, key=key)
+    return gallery
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import io
 import json
+from collections.abc import Iterator
 from pathlib import Path
 
-from .gallery import Gallery, Medium, Work
+from .gallery import Gallery, Medium, Work, paused_gc
+from .profiling import count, phase
+from .streaming import iter_array_items
 
 
 ORGAN_MEDIUM_MAP: dict[str, Medium] = {
@@ -18,57 +22,259 @@ ORGAN_MEDIUM_MAP: dict[str, Medium] = {
     "organvm-vii-kerygma": Medium.MIXED_MEDIA,
 }
 
+REGISTRY_REPO_KEYS = ("repositories", "repos")
+REGISTRY_NAME = "ORGAN System Portfolio"
+REGISTRY_DESCRIPTION = "Complete portfolio of creative and technical works across all 8 organs"
 
-def collect_from_registry(registry_path: Path) -> Gallery:
-    """Build a gallery from a registry-v2.json file."""
-    with open(registry_path) as f:
-        data = json.load(f)
+# Works files with these suffixes are JSON Lines: a header object holding the
+# gallery metadata, then one works.json entry per line.
+NDJSON_SUFFIXES = (".jsonl", ".ndjson")
 
-    gallery = Gallery(
-        name="ORGAN System Portfolio",
-        description="Complete portfolio of creative and technical works across all 8 organs",
-    )
+
+def collect_from_registry(
+    registry_path: Path, stream: bool = False, validate: bool = False
+) -> Gallery:
+    """Build a gallery from a registry-v2.json file.
+
+    With ``stream=True`` the registry is parsed incrementally, so the full
+    JSON tree is never held in memory alongside the gallery. With
+    ``validate=True`` every repository is first checked against
+    ``validation.RegistryRecord`` and ``validation.InvalidRecordsError``
+    lists all failures; streaming then costs a separate validation pass.
+    """
+    gallery = Gallery(name=REGISTRY_NAME, description=REGISTRY_DESCRIPTION)
+
+    if stream:
+        if validate:
+            from .validation import ensure_valid_path
+
+            ensure_valid_path(registry_path, "registry")
+        gallery.add_works(collect_iter_from_registry(registry_path))
+        return gallery
+
+    with phase("read"), open(registry_path) as f:
+        text = f.read()
+    with phase("decode"):
+        data = json.loads(text)
+    del text
 
     repos = data.get("repositories", data.get("repos", []))
-    for repo in repos:
-        org = repo.get("org", "")
-        medium = ORGAN_MEDIUM_MAP.get(org, Medium.SOFTWARE)
-        relevance = repo.get("portfolio_relevance", "LOW")
-
-        work = Work(
-            title=repo.get("name", ""),
-            description=repo.get("description", ""),
-            medium=medium,
-            organ=org,
-            repo=repo.get("name", ""),
-            tags=repo.get("topics", []),
-            featured=relevance in ("CRITICAL", "HIGH"),
-        )
-        gallery.add_work(work)
+    if validate:
+        _ensure_valid(repos, "registry", registry_path)
+    with phase("construct"), paused_gc():
+        works = [_work_from_repo(repo) for repo in repos]
+    _add_works(gallery, works)
 
     return gallery
 
 
-def collect_from_works_file(works_path: Path) -> Gallery:
-    """Build a gallery from a curated works.json file."""
-    with open(works_path) as f:
-        data = json.load(f)
+def collect_iter_from_registry(registry_path: Path) -> Iterator[Work]:
+    """Yield works from a registry-v2.json file one repository at a time.
+
+    Only the first of ``repositories``/``repos`` present in the file is read,
+    and memory stays bounded by a single repository record.
+    """
+    with open(registry_path, encoding="utf-8") as f:
+        for repo in iter_array_items(f, REGISTRY_REPO_KEYS):
+            yield _work_from_repo(repo)
+
+
+def collect_iter_from_works_file(works_path: Path, meta: dict | None = None) -> Iterator[Work]:
+    """Yield works from a works.json file one entry at a time.
+
+    Top-level scalars such as ``gallery_name`` are stored in ``meta`` as they
+    are read; they are complete once the iterator is exhausted.
+    """
+    with open(works_path, encoding="utf-8") as f:
+        for item in iter_array_items(f, ("works",), meta=meta):
+            yield _work_from_item(item)
+
+
+def collect_from_works_file(
+    works_path: Path, validate: bool = False, data: bytes | None = None
+) -> Gallery:
+    """Build a gallery from a curated works.json file.
+
+    With ``validate=True`` every entry is first checked against
+    ``validation.WorkRecord``, and ``validation.InvalidRecordsError`` lists
+    all failures instead of stopping at the first bad entry. ``data``, when
+    given, is the file's content already read by the caller.
+    """
+    if data is None:
+        with phase("read"), open(works_path, "rb") as f:
+            data = f.read()
+    with phase("decode"):
+        data = json.loads(data)
 
     gallery = Gallery(
         name=data.get("gallery_name", "Portfolio"),
         description=data.get("description", ""),
     )
 
-    for item in data.get("works", []):
-        work = Work(
-            title=item["title"],
-            description=item.get("description", ""),
-            medium=Medium(item.get("medium", "software")),
-            organ=item.get("organ", ""),
-            repo=item.get("repo", ""),
-            tags=item.get("tags", []),
-            featured=item.get("featured", False),
-        )
-        gallery.add_work(work)
+    items = data.get("works", [])
+    if validate:
+        _ensure_valid(items, "works", works_path)
+    with phase("construct"), paused_gc():
+        works = [_work_from_item(item) for item in items]
+    _add_works(gallery, works)
+
+    return gallery
+
+
+def is_ndjson(path: Path) -> bool:
+    """Return whether ``path`` names a JSON Lines works file."""
+    return path.suffix.lower() in NDJSON_SUFFIXES
+
+
+def collect_iter_from_ndjson(
+    path: Path, meta: dict | None = None, offset: int = 0, data: bytes | None = None
+) -> Iterator[Work]:
+    """Yield works from a JSON Lines works file one line at a time.
 
+    From the start of the file, the header line is stored in ``meta``. A
+    non-zero ``offset`` resumes at that byte, which must be the start of a
+    line; the header is then not read again. Blank lines are skipped.
+
+    ``data``, when given, is the file's content from ``offset`` on, already
+    read by the caller, who has checked that ``offset`` starts a line.
+    """
+    with open(path, "rb") if data is None else io.BytesIO(data) as f:
+        if offset and data is None:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                raise ValueError(f"{path}: offset {offset} is not at the start of a line")
+        elif not offset:
+            header = _decode_line(f.readline(), path, 0)
+            if not isinstance(header, dict):
+                raise ValueError(f"{path}: header line must be a JSON object")
+            if meta is not None:
+                meta.update(header)
+            offset = f.tell()
+        for line in f:
+            if line.strip():
+                yield _work_from_item(_decode_line(line, path, offset))
+            offset += len(line)
+
+
+def collect_from_ndjson(path: Path, validate: bool = False, data: bytes | None = None) -> Gallery:
+    """Build a gallery from a JSON Lines works file, optionally validating it first.
+
+    ``data``, when given, is the file's content already read by the caller.
+    """
+    meta: dict = {}
+    if validate:
+        from .validation import ensure_valid_path
+
+        ensure_valid_path(path, "works")
+    with phase("construct"), paused_gc():
+        works = list(collect_iter_from_ndjson(path, meta, data=data))
+    gallery = Gallery(
+        name=meta.get("gallery_name", "Portfolio"),
+        description=meta.get("description", ""),
+    )
+    _add_works(gallery, works)
     return gallery
+
+
+def extend_from_ndjson(
+    gallery: Gallery, path: Path, offset: int, data: bytes | None = None
+) -> int:
+    """Add the works on lines from byte ``offset`` onward; return how many were added.
+
+    Used to pick up lines appended since ``gallery`` was built from the first
+    ``offset`` bytes of the file, without re-reading them. ``data`` is as for
+    ``collect_iter_from_ndjson``.
+    """
+    with phase("construct"), paused_gc():
+        works = list(collect_iter_from_ndjson(path, offset=offset, data=data))
+    _add_works(gallery, works)
+    return len(works)
+
+
+def append_work(path: Path, item: dict, header: dict | None = None) -> None:
+    """Append one works.json entry to a JSON Lines works file.
+
+    The entry is validated by building its ``Work`` first. Existing lines are
+    never rewritten; a missing file is created with ``header`` (or an empty
+    gallery header) as its first line.
+    """
+    _work_from_item(item)
+    line = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+    with open(path, "ab+") as f:
+        if f.tell() == 0:
+            f.write(json.dumps(header or {"gallery_name": "Portfolio", "description": ""},
+                               ensure_ascii=False).encode("utf-8") + b"\n")
+        else:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(line)
+
+
+def collect_from_path(path: Path, validate: bool = False, data: bytes | None = None) -> Gallery:
+    """Build a gallery from a works file in either format, chosen by suffix.
+
+    ``data``, when given, is the file's content already read by the caller.
+    """
+    if is_ndjson(path):
+        return collect_from_ndjson(path, validate, data)
+    return collect_from_works_file(path, validate, data)
+
+
+def collect_iter_from_path(path: Path, meta: dict | None = None) -> Iterator[Work]:
+    """Stream works from a works file in either format, chosen by suffix."""
+    if is_ndjson(path):
+        return collect_iter_from_ndjson(path, meta)
+    return collect_iter_from_works_file(path, meta)
+
+
+def _decode_line(line: bytes, path: Path, offset: int) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        raise ValueError(f"{path}: invalid JSON line at byte {offset}: {exc}") from None
+
+
+def _ensure_valid(records: object, kind: str, path: Path) -> None:
+    # pydantic is only imported when validation is asked for.
+    from .validation import ensure_valid
+
+    if not isinstance(records, list):
+        raise ValueError(f"{path}: expected an array of {kind} records")
+    ensure_valid(records, kind, str(path))
+
+
+def _add_works(gallery: Gallery, works: list[Work]) -> None:
+    with phase("index"):
+        gallery.add_works(works)
+    count("works", len(works))
+
+
+def _work_from_repo(repo: dict) -> Work:
+    """Build a Work from one registry repository record."""
+    org = repo.get("org", "")
+    medium = ORGAN_MEDIUM_MAP.get(org, Medium.SOFTWARE)
+    relevance = repo.get("portfolio_relevance", "LOW")
+
+    return Work(
+        title=repo.get("name", ""),
+        description=repo.get("description", ""),
+        medium=medium,
+        organ=org,
+        repo=repo.get("name", ""),
+        tags=repo.get("topics", []),
+        featured=relevance in ("CRITICAL", "HIGH"),
+    )
+
+
+def _work_from_item(item: dict) -> Work:
+    """Build a Work from one curated works.json entry."""
+    return Work(
+        title=item["title"],
+        description=item.get("description", ""),
+        medium=Medium(item.get("medium", "software")),
+        organ=item.get("organ", ""),
+        repo=item.get("repo", ""),
+        tags=item.get("tags", []),
+        featured=item.get("featured", False),
+    )
@@ -0,0 +1,245 @@
+"""Precompressed siblings of generated files for static hosting.
+
+Each output file gets ``.gz`` (and, when the optional ``brotli`` package is
+installed, ``.br``) siblings written at the highest compression levels, so
+the host can serve them as-is instead of compressing on every request.
+Files are compressed in worker processes. A manifest in the output root
+records each file's content hash, and files whose hash and siblings are
+unchanged since the last run are skipped.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .atomic import atomic_write
+from .pipeline import pool_context
+from .profiling import count, phase
+
+
+ENCODINGS: dict[str, str] = {
+    "gzip": ".gz",
+    "brotli": ".br",
+}
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+MANIFEST_NAME = ".precompress.json"
+MANIFEST_VERSION = 1
+
+# Files handed to a worker at a time; site output is many small pages.
+CHUNK_SIZE = 64
+
+
+@dataclass
+class CompressedFile:
+    """One source file and the sizes of its compressed siblings."""
+    path: Path
+    size: int
+    sizes: dict[str, int]
+    digest: str
+    skipped: bool = False
+
+
+@dataclass
+class CompressionReport:
+    """Every file considered by ``precompress``, and the encodings written."""
+    encodings: tuple[str, ...]
+    files: list[CompressedFile] = field(default_factory=list)
+    removed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def compressed(self) -> int:
+        return sum(not f.skipped for f in self.files)
+
+    @property
+    def skipped(self) -> int:
+        return sum(f.skipped for f in self.files)
+
+    def totals(self, encoding: str) -> tuple[int, int]:
+        """Return ``(original bytes, compressed bytes)`` across all files for ``encoding``."""
+        return (
+            sum(f.size for f in self.files),
+            sum(f.sizes[encoding] for f in self.files),
+        )
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the encodings this interpreter can produce: gzip, and brotli if installed."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ("gzip",)
+    return ("gzip", "brotli")
+
+
+def sibling_path(path: Path, encoding: str) -> Path:
+    """Return the precompressed sibling of ``path`` for ``encoding``."""
+    return path.with_name(path.name + ENCODINGS[encoding])
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """Compress ``data`` at the highest level; gzip output carries no timestamp."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "brotli":
+        import brotli
+
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unknown encoding {encoding!r}; expected one of {tuple(ENCODINGS)}")
+
+
+def compress_file(
+    path: Path, encodings: tuple[str, ...], previous: str | None = None
+) -> CompressedFile:
+    """Write the ``encodings`` siblings of ``path`` unless its content is unchanged.
+
+    ``previous`` is the content hash recorded by the last run. When it
+    matches and every sibling exists, nothing is written and the siblings'
+    sizes are read from disk.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    siblings = {encoding: sibling_path(path, encoding) for encoding in encodings}
+    if digest == previous and all(sibling.exists() for sibling in siblings.values()):
+        sizes = {encoding: sibling.stat().st_size for encoding, sibling in siblings.items()}
+        return CompressedFile(path, len(data), sizes, digest, skipped=True)
+    sizes = {}
+    for encoding, sibling in siblings.items():
+        compressed = compress_bytes(data, encoding)
+        with atomic_write(sibling) as f:
+            f.write(compressed)
+        sizes[encoding] = len(compressed)
+    return CompressedFile(path, len(data), sizes, digest)
+
+
+def _compress_many(
+    tasks: list[tuple[Path, str | None]], encodings: tuple[str, ...]
+) -> list[CompressedFile]:
+    return [compress_file(path, encodings, previous) for path, previous in tasks]
+
+
+def manifest_path(root: Path) -> Path:
+    return root / MANIFEST_NAME
+
+
+def _manifest_key(encodings: tuple[str, ...]) -> dict:
+    return {
+        "manifest": MANIFEST_VERSION,
+        "encodings": list(encodings),
+        "gzip": GZIP_LEVEL,
+        "brotli": BROTLI_QUALITY,
+    }
+
+
+def load_manifest(root: Path, encodings: tuple[str, ...]) -> dict[str, str]:
+    """Return ``relative path -> content hash`` from the last run with the same settings.
+
+    A missing, unreadable or incompatible manifest yields an empty mapping,
+    so every file is compressed again.
+    """
+    try:
+        with open(manifest_path(root), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("key") != _manifest_key(encodings):
+        return {}
+    return data.get("files", {})
+
+
+def _save_manifest(root: Path, encodings: tuple[str, ...], files: dict[str, str]) -> None:
+    payload = {"key": _manifest_key(encodings), "files": files}
+    with atomic_write(manifest_path(root), "w") as f:
+        json.dump(payload, f, sort_keys=True)
+
+
+def _relative(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def precompress(
+    paths: Iterable[Path],
+    root: Path,
+    encodings: tuple[str, ...] | None = None,
+    jobs: int | None = None,
+) -> CompressionReport:
+    """Write compressed siblings for every file in ``paths``, which lie under ``root``.
+
+    ``encodings`` defaults to ``available_encodings()``. Files are split into
+    ``CHUNK_SIZE`` batches compressed by up to ``jobs`` worker processes
+    (default: CPU count). The manifest under ``root`` keeps entries for
+    files outside ``paths``, so several outputs can share one directory.
+    """
+    start = time.perf_counter()
+    encodings = encodings or available_encodings()
+    for encoding in encodings:
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}; expected one of {tuple(ENCODINGS)}")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    manifest = load_manifest(root, encodings)
+    tasks = [(path, manifest.get(_relative(path, root))) for path in paths]
+    chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+
+    if len(chunks) < jobs:
+        # Few files: one per task, so large outputs compress side by side.
+        chunks = [[task] for task in tasks]
+
+    report = CompressionReport(encodings)
+    with phase("compress"):
+        if jobs <= 1 or len(chunks) <= 1:
+            results = [_compress_many(chunk, encodings) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(chunks)), mp_context=pool_context()
+            ) as pool:
+                results = list(pool.map(_compress_many, chunks, [encodings] * len(chunks)))
+    for result in results:
+        report.files.extend(result)
+    for compressed in report.files:
+        manifest[_relative(compressed.path, root)] = compressed.digest
+    _save_manifest(root, encodings, manifest)
+    count("files", len(report.files))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _is_artifact(path: Path) -> bool:
+    """Whether ``path`` is a sibling, manifest or temporary file rather than output."""
+    return path.name.startswith(".") or path.suffix in ENCODINGS.values()
+
+
+def precompress_tree(
+    root: Path, encodings: tuple[str, ...] | None = None, jobs: int | None = None
+) -> CompressionReport:
+    """Precompress every output file under ``root``, such as a site built by ``build_site``.
+
+    Siblings of files that no longer exist are deleted and dropped from the
+    manifest.
+    """
+    encodings = encodings or available_encodings()
+    paths = sorted(p for p in root.rglob("*") if p.is_file() and not _is_artifact(p))
+    report = precompress(paths, root, encodings, jobs)
+    manifest = load_manifest(root, encodings)
+    current = {_relative(path, root) for path in paths}
+    stale = [name for name in manifest if name not in current]
+    for name in stale:
+        for encoding in ENCODINGS:
+            sibling_path(root / name, encoding).unlink(missing_ok=True)
+        del manifest[name]
+    if stale:
+        _save_manifest(root, encodings, manifest)
+    report.removed = len(stale)
+    return report
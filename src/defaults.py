@@ -0,0 +1,27 @@
+"""Defaults shared by the CLI and the modules it drives.
+
+The CLI shows these in ``--help`` without importing the feature modules, so
+this module must stay free of imports beyond the standard library basics.
+"""
+
+from pathlib import Path
+
+DEFAULT_WORKS_PATH = Path(__file__).parent.parent / "data" / "works.json"
+
+# Site listing pages, and related works per work page or query.
+PAGE_SIZE = 50
+RELATED_COUNT = 5
+
+# Rows printed by the query, validate and diff commands.
+QUERY_LIMIT = 20
+FACET_LIMIT = 10
+MAX_ERRORS = 20
+DIFF_LIMIT = 50
+
+# The query server.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+POLL_INTERVAL = 1.0
+
+# Works per SQLite store transaction.
+STORE_BATCH_SIZE = 5000
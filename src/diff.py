@@ -0,0 +1,261 @@
+"""Streaming diff of two works files or registries.
+
+Works are matched by key: their repository name, or the slug of their title
+when they have none. The diff is a partitioned hash join, so neither input
+is ever loaded whole:
+
+1. Each input is streamed through the collector. Every work is reduced to
+   its canonical form, the JSON list of ``DIFF_FIELDS``, and a BLAKE2b
+   digest of that form. The line is appended to one of ``PARTITIONS``
+   temporary files chosen by a hash of the key. The two inputs are
+   partitioned in separate worker processes.
+2. Matching partitions of the two inputs are joined in worker processes.
+   The old partition is held in memory by key, and the new partition is
+   streamed past it. Only works whose digests differ are
+   decoded and compared field by field.
+
+Memory is bounded by one partition of the old input rather than either file, and the
+report holds only the works that differ.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from json.encoder import encode_basestring_ascii as _quote
+from pathlib import Path
+
+from .collector import collect_iter_from_path, collect_iter_from_registry
+from .gallery import Work, slugify
+from .pipeline import pool_context
+from .profiling import count, phase
+
+
+# Fields compared between versions of a work, in canonical-form order.
+DIFF_FIELDS = (
+    "title", "description", "medium", "organ", "repo", "tags", "featured",
+    "date_created", "url",
+)
+
+PARTITIONS = 32
+
+_decoder = json.JSONDecoder()
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """One field of a work that differs between the two inputs."""
+    field: str
+    old: object
+    new: object
+
+
+@dataclass(frozen=True)
+class WorkChange:
+    """A work present in both inputs whose canonical form differs."""
+    key: str
+    changes: tuple[FieldChange, ...]
+
+
+@dataclass
+class DiffReport:
+    """Works added, removed and changed between ``old`` and ``new``, each sorted by key."""
+    old: str
+    new: str
+    old_count: int = 0
+    new_count: int = 0
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[WorkChange] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def unchanged(self) -> int:
+        return self.old_count - len(self.removed) - len(self.changed)
+
+    @property
+    def identical(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def as_dict(self) -> dict:
+        return {
+            "old": self.old,
+            "new": self.new,
+            "old_count": self.old_count,
+            "new_count": self.new_count,
+            "unchanged": self.unchanged,
+            "added": self.added,
+            "removed": self.removed,
+            "changed": {
+                change.key: {c.field: {"old": c.old, "new": c.new} for c in change.changes}
+                for change in self.changed
+            },
+        }
+
+
+def work_key(work: Work) -> str:
+    """Return the key that matches ``work`` across versions: its repo, else its title slug."""
+    return work.repo or slugify(work.title)
+
+
+def canonical_form(work: Work) -> str:
+    """Return ``work``'s ``DIFF_FIELDS`` as a compact, ASCII-only JSON list.
+
+    The list is assembled from C-escaped strings rather than by
+    ``json.dumps``, which builds a new encoder per call and would dominate
+    partitioning time.
+    """
+    date_created = work.date_created
+    return (
+        f"[{_quote(work.title)},{_quote(work.description)},{_quote(work.medium.value)},"
+        f"{_quote(work.organ)},{_quote(work.repo)},[{','.join(map(_quote, work._tags))}],"
+        f"{'true' if work.featured else 'false'},"
+        f"{_quote(date_created.isoformat()) if date_created else 'null'},{_quote(work.url)}]"
+    )
+
+
+def work_digest(canonical: str) -> str:
+    """Return the hex BLAKE2b digest of a canonical form."""
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _iter_works(path: Path, registry: bool) -> Iterator[Work]:
+    return collect_iter_from_registry(path) if registry else collect_iter_from_path(path)
+
+
+def _partition_path(directory: Path, side: str, n: int) -> Path:
+    return directory / f"{side}-{n:03d}"
+
+
+def partition_input(
+    path: Path, side: str, directory: Path, registry: bool = False, partitions: int = PARTITIONS
+) -> int:
+    """Stream ``path`` into ``partitions`` files of ``digest\tkey\tcanonical`` lines.
+
+    Returns the number of works read. Keys are written as JSON strings, so
+    no field before the canonical form can contain a tab or newline.
+    """
+    files = [
+        open(_partition_path(directory, side, n), "w", encoding="utf-8")
+        for n in range(partitions)
+    ]
+    writes = [f.write for f in files]
+    n_works = 0
+    try:
+        for work in _iter_works(path, registry):
+            key = _quote(work_key(work))
+            canonical = canonical_form(work)
+            writes[zlib.crc32(key.encode()) % partitions](
+                f"{work_digest(canonical)}\t{key}\t{canonical}\n"
+            )
+            n_works += 1
+    finally:
+        for f in files:
+            f.close()
+    return n_works
+
+
+def _read_partition(path: Path) -> Iterator[tuple[str, str, str]]:
+    """Yield ``(encoded key, digest, canonical)``, numbering repeated keys in file order.
+
+    The second work with key ``k`` becomes ``k#2``, and so on, so duplicates
+    pair up by position between the two inputs.
+    """
+    seen: dict[str, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            digest, key, canonical = line.rstrip("\n").split("\t", 2)
+            n = seen[key] = seen.get(key, 0) + 1
+            yield (key if n == 1 else f"{key}#{n}"), digest, canonical
+
+
+def _decode_key(encoded: str) -> str:
+    """Return the key a partition line encodes, with any ``#n`` duplicate suffix."""
+    key, end = _decoder.raw_decode(encoded)
+    return key + encoded[end:]
+
+
+def field_changes(old_canonical: str, new_canonical: str) -> tuple[FieldChange, ...]:
+    """Return the fields whose values differ between two canonical forms."""
+    return tuple(
+        FieldChange(name, old, new)
+        for name, old, new in zip(DIFF_FIELDS, json.loads(old_canonical),
+                                  json.loads(new_canonical))
+        if old != new
+    )
+
+
+def join_partition(
+    directory: Path, n: int
+) -> tuple[list[str], list[str], list[WorkChange]]:
+    """Join partition ``n`` of both inputs; return its added, removed and changed works."""
+    old: dict[str, tuple[str, str]] = {
+        key: (digest, canonical)
+        for key, digest, canonical in _read_partition(_partition_path(directory, "old", n))
+    }
+    added: list[str] = []
+    changed: list[WorkChange] = []
+    for key, digest, canonical in _read_partition(_partition_path(directory, "new", n)):
+        previous = old.pop(key, None)
+        if previous is None:
+            added.append(_decode_key(key))
+        elif previous[0] != digest:
+            changed.append(WorkChange(_decode_key(key), field_changes(previous[1], canonical)))
+    return added, [_decode_key(key) for key in old], changed
+
+
+def diff_paths(
+    old: Path,
+    new: Path,
+    registry: bool = False,
+    jobs: int | None = None,
+    partitions: int = PARTITIONS,
+) -> DiffReport:
+    """Diff two works files (either format) or, with ``registry``, two registries.
+
+    Both inputs are partitioned concurrently and partitions are joined by up
+    to ``jobs`` worker processes (default: CPU count); ``jobs=1`` does all
+    the work in this process.
+    """
+    start = time.perf_counter()
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    report = DiffReport(str(old), str(new))
+    with tempfile.TemporaryDirectory(prefix="diff-") as tmp:
+        directory = Path(tmp)
+        sides = (("old", old), ("new", new))
+        if jobs <= 1:
+            with phase("partition"):
+                counts = [partition_input(path, side, directory, registry, partitions)
+                          for side, path in sides]
+            with phase("join"):
+                joined = [join_partition(directory, n) for n in range(partitions)]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=pool_context()) as pool:
+                with phase("partition"):
+                    futures = [
+                        pool.submit(partition_input, path, side, directory, registry, partitions)
+                        for side, path in sides
+                    ]
+                    counts = [future.result() for future in futures]
+                with phase("join"):
+                    joined = list(pool.map(join_partition, [directory] * partitions,
+                                           range(partitions)))
+    report.old_count, report.new_count = counts
+    for added, removed, changed in joined:
+        report.added.extend(added)
+        report.removed.extend(removed)
+        report.changed.extend(changed)
+    report.added.sort()
+    report.removed.sort()
+    report.changed.sort(key=lambda change: change.key)
+    count("works", report.old_count + report.new_count)
+    report.seconds = time.perf_counter() - start
+    return report
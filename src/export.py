@@ -0,0 +1,453 @@
+"""Export works as JSON Resume projects, Dublin Core records and grant lists.
+
+Each export format is a line generator over an iterable of works, in the
+style of ``renderer``: works are read, converted and written one at a time,
+so exporting a full registry never holds every record in memory. Grant
+lists are sorted by year, so they keep the ``max_works`` entries they will
+print, or every selected work when unbounded.
+
+``export_sources`` runs one task per source file and format in worker
+processes. Each task streams its source through the collector and writes to
+a temporary file that replaces the output only when complete.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import IO
+from xml.sax.saxutils import escape
+
+from .atomic import atomic_write
+from .collector import collect_iter_from_path, collect_iter_from_registry
+from .gallery import Medium, Work
+from .pipeline import pool_context
+from .profiling import count, phase
+from .renderer import indented_json, write_lines
+
+
+EXPORT_FORMATS: dict[str, str] = {
+    "jsonresume": ".resume.json",
+    "dublin-core-xml": ".dc.xml",
+    "dublin-core-json": ".dc.json",
+    "grant": ".grant.md",
+}
+
+CV_SUFFIXES = (".yaml", ".yml")
+
+JSON_RESUME_SCHEMA = (
+    "https://raw.githubusercontent.com/jsonresume/resume-schema/v1.0.0/schema.json"
+)
+
+DUBLIN_CORE_NAMESPACE = "http://purl.org/dc/elements/1.1/"
+
+# DCMI Type Vocabulary term for each medium.
+DCMI_TYPES: dict[Medium, str] = {
+    Medium.GENERATIVE_ART: "Image",
+    Medium.PERFORMANCE: "Event",
+    Medium.INTERACTIVE: "InteractiveResource",
+    Medium.LITERARY: "Text",
+    Medium.MUSICAL: "Sound",
+    Medium.MIXED_MEDIA: "InteractiveResource",
+    Medium.SOFTWARE: "Software",
+}
+
+GRANT_SEPARATOR = "---"
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    """Settings shared by every export task.
+
+    ``creator``, ``rights`` and ``language`` fill the Dublin Core fields of
+    the same names; ``max_works``, ``since`` and ``medium`` select the works
+    of a grant list (``max_works`` of 0 keeps all of them). ``cv`` names a
+    RenderCV YAML file whose resume the gallery's projects are appended to.
+    """
+    creator: str = ""
+    rights: str = ""
+    language: str = "en"
+    max_works: int = 0
+    since: int | None = None
+    medium: Medium | None = None
+    cv: Path | None = None
+
+
+@dataclass
+class ExportResult:
+    """Outcome of exporting one source in one format."""
+    source: Path
+    fmt: str
+    path: Path
+    records: int
+    seconds: float
+
+
+def is_cv(path: Path) -> bool:
+    """Return whether ``path`` names a RenderCV YAML file rather than a works file."""
+    return path.suffix.lower() in CV_SUFFIXES
+
+
+def load_cv(path: Path) -> dict:
+    """Read a RenderCV YAML file and convert it with ``cv_to_jsonresume``."""
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("cv"), dict):
+        raise ValueError(f"{path}: expected a RenderCV document with a top-level 'cv' mapping")
+    return cv_to_jsonresume(data)
+
+
+def cv_to_jsonresume(data: dict) -> dict:
+    """Convert a parsed RenderCV document to a JSON Resume document.
+
+    This is the prototype converter from
+    ``docs/source-materials/prototypes/yaml_to_jsonresume.py``, without its
+    author-specific ``meta`` links or hard-coded country: ``countryCode`` is
+    only set from an optional ``country_code`` entry of ``cv``.
+    """
+    cv = data["cv"]
+    sections = cv.get("sections", {})
+
+    basics = {
+        "name": cv["name"],
+        "label": cv.get("headline", ""),
+        "email": cv["email"][0] if cv.get("email") else "",
+        "url": cv["website"][0] if cv.get("website") else "",
+        "summary": sections.get("summary", [""])[0],
+        "location": {"city": cv.get("location", "")},
+        "profiles": [
+            {
+                "network": "GitHub",
+                "username": sn["username"],
+                "url": f"https://github.com/{sn['username']}",
+            }
+            for sn in cv.get("social_networks", [])
+            if sn["network"] == "GitHub"
+        ],
+    }
+    if cv.get("country_code"):
+        basics["location"]["countryCode"] = cv["country_code"]
+
+    skills = [
+        {"name": s["label"], "keywords": [k.strip() for k in s["details"].split(",")]}
+        for s in sections.get("skills", [])
+    ]
+
+    work = []
+    for exp in sections.get("experience", []):
+        entry = {
+            "name": exp["company"],
+            "position": exp["position"],
+            "startDate": str(exp["start_date"]),
+            "highlights": exp.get("highlights", []),
+        }
+        if exp.get("end_date"):
+            entry["endDate"] = str(exp["end_date"])
+        if exp.get("location"):
+            entry["location"] = exp["location"]
+        work.append(entry)
+
+    education = [
+        {
+            "institution": edu["institution"],
+            "area": edu["area"],
+            "studyType": edu["degree"],
+            "startDate": str(edu["start_date"]),
+            "endDate": str(edu["end_date"]),
+        }
+        for edu in sections.get("education", [])
+    ]
+
+    certificates = []
+    for cert in sections.get("certifications", []):
+        label_parts = cert["label"].split(" — ")
+        certificates.append({
+            "name": label_parts[0].strip(),
+            "issuer": label_parts[1].strip() if len(label_parts) > 1 else "",
+            "date": cert.get("details", ""),
+        })
+
+    projects = [
+        {
+            "name": proj["name"],
+            "description": "; ".join(proj.get("highlights", [])),
+            "startDate": str(proj.get("date", "")).split(" — ")[0].strip(),
+        }
+        for proj in sections.get("selected projects", [])
+    ]
+
+    return {
+        "$schema": JSON_RESUME_SCHEMA,
+        "basics": basics,
+        "work": work,
+        "education": education,
+        "skills": skills,
+        "certificates": certificates,
+        "projects": projects,
+        "meta": {"version": "v1.0.0"},
+    }
+
+
+def project_record(work: Work) -> dict:
+    """Return the JSON Resume ``projects`` entry for one work."""
+    record = {"name": work.title, "description": work.description}
+    if work.date_created:
+        record["startDate"] = work.date_created.isoformat()
+    if work.url:
+        record["url"] = work.url
+    record["keywords"] = work.tags
+    if work.organ:
+        record["entity"] = work.organ
+    record["type"] = work.medium.value
+    return record
+
+
+def dublin_core_record(work: Work, options: ExportOptions) -> dict:
+    """Return the Dublin Core record for one work; ``dc:subject`` lists its tags."""
+    record = {}
+    if options.creator:
+        record["dc:creator"] = options.creator
+    record["dc:title"] = work.title
+    if work.date_created:
+        record["dc:date"] = work.date_created.isoformat()
+    record["dc:format"] = work.medium.value
+    record["dc:description"] = work.description
+    record["dc:subject"] = work.tags
+    if options.rights:
+        record["dc:rights"] = options.rights
+    if options.language:
+        record["dc:language"] = options.language
+    record["dc:type"] = DCMI_TYPES[work.medium]
+    identifier = work.url or work.repo
+    if identifier:
+        record["dc:identifier"] = identifier
+    return record
+
+
+def _array_lines(key: str, entries: Iterable[str], indent: str, last: bool) -> Iterator[str]:
+    """Yield a JSON array of pre-rendered ``entries`` as ``json.dumps(indent=2)`` would.
+
+    ``key`` is the array's ``"name": `` prefix inside an object, or empty at
+    the top level; ``last`` drops the trailing comma.
+    """
+    tail = "" if last else ","
+    pending: str | None = None
+    for entry in entries:
+        if pending is None:
+            yield f"{indent}{key}["
+        else:
+            yield pending + ","
+        pending = entry
+    if pending is None:
+        yield f"{indent}{key}[]{tail}"
+        return
+    yield pending
+    yield f"{indent}]{tail}"
+
+
+def jsonresume_lines(
+    works: Iterable[Work], options: ExportOptions, base: dict | None = None
+) -> Iterator[str]:
+    """Yield a JSON Resume document whose ``projects`` are followed by one per work.
+
+    ``base`` is a resume such as ``load_cv`` returns; without one the
+    document has only a schema link, ``basics.name`` from the creator, and
+    projects. Output is byte-identical to ``json.dumps(..., indent=2)``.
+    """
+    if base is None:
+        base = {"$schema": JSON_RESUME_SCHEMA}
+        if options.creator:
+            base["basics"] = {"name": options.creator}
+    fields = dict(base)
+    fields.setdefault("projects", [])
+    keys = list(fields)
+    yield "{"
+    for n, key in enumerate(keys, 1):
+        last = n == len(keys)
+        if key != "projects":
+            yield f"  {json.dumps(key)}: {indented_json(fields[key], '  ')}{'' if last else ','}"
+            continue
+        existing = ("    " + indented_json(project, "    ") for project in fields[key])
+        added = ("    " + indented_json(project_record(work), "    ") for work in works)
+        yield from _array_lines('"projects": ', chain(existing, added), "  ", last)
+    yield "}"
+
+
+def dublin_core_json_lines(works: Iterable[Work], options: ExportOptions) -> Iterator[str]:
+    """Yield a JSON array of Dublin Core records, one per work."""
+    entries = ("  " + indented_json(dublin_core_record(work, options), "  ") for work in works)
+    return _array_lines("", entries, "", last=True)
+
+
+def dublin_core_xml_lines(works: Iterable[Work], options: ExportOptions) -> Iterator[str]:
+    """Yield an XML document of ``<record>`` elements holding Dublin Core elements."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield f'<metadata xmlns:dc="{DUBLIN_CORE_NAMESPACE}">'
+    for work in works:
+        yield "  <record>"
+        for name, value in dublin_core_record(work, options).items():
+            for item in value if isinstance(value, list) else [value]:
+                yield f"    <{name}>{escape(item)}</{name}>"
+        yield "  </record>"
+    yield "</metadata>"
+
+
+def _grant_key(work: Work) -> int:
+    # Newest first; undated works (key 0) after every dated one.
+    return -work.date_created.year if work.date_created else 0
+
+
+def grant_entry(work: Work) -> str:
+    """Return one work as a grant-application project list entry."""
+    year = work.date_created.year if work.date_created else "n.d."
+    lines = [f"**{work.title}** ({year})", f"{work.medium.value} | variable"]
+    if work.description:
+        lines.append(work.description)
+    if work.url or work.repo:
+        lines.append(f"Source: {work.url or work.repo}")
+    return "\n".join(lines)
+
+
+def grant_lines(works: Iterable[Work], options: ExportOptions) -> Iterator[str]:
+    """Yield a grant project list: newest works first, separated by ``---`` lines.
+
+    Works are filtered by ``options.medium`` and ``options.since`` (which
+    drops undated works), then the first ``options.max_works`` by year are
+    kept; works of the same year stay in source order.
+    """
+    if options.medium is not None:
+        works = (work for work in works if work.medium == options.medium)
+    if options.since is not None:
+        since = options.since
+        works = (w for w in works if w.date_created and w.date_created.year >= since)
+    if options.max_works > 0:
+        # nsmallest is stable and holds only max_works works at a time.
+        selected = heapq.nsmallest(options.max_works, works, key=_grant_key)
+    else:
+        selected = sorted(works, key=_grant_key)
+    for n, work in enumerate(selected):
+        if n:
+            yield GRANT_SEPARATOR
+        yield grant_entry(work)
+
+
+def export_lines(
+    works: Iterable[Work], fmt: str, options: ExportOptions, base: dict | None = None
+) -> Iterator[str]:
+    """Return the line generator for ``fmt``; ``base`` applies to ``jsonresume`` only."""
+    if fmt == "jsonresume":
+        return jsonresume_lines(works, options, base)
+    if fmt == "dublin-core-json":
+        return dublin_core_json_lines(works, options)
+    if fmt == "dublin-core-xml":
+        return dublin_core_xml_lines(works, options)
+    if fmt == "grant":
+        return grant_lines(works, options)
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {tuple(EXPORT_FORMATS)}")
+
+
+def write_export(
+    works: Iterable[Work], fmt: str, stream: IO, options: ExportOptions | None = None
+) -> int:
+    """Stream ``works`` to ``stream`` in ``fmt`` and return how many were read."""
+    options = options or ExportOptions()
+    base = load_cv(options.cv) if options.cv and fmt == "jsonresume" else None
+    read = 0
+
+    def counted() -> Iterator[Work]:
+        nonlocal read
+        for work in works:
+            read += 1
+            yield work
+
+    write_lines(export_lines(counted(), fmt, options, base), stream)
+    count("works", read)
+    return read
+
+
+def expand_export_formats(formats: list[str] | None) -> list[str]:
+    """Resolve ``--format`` values, expanding ``all`` and dropping duplicates."""
+    resolved: list[str] = []
+    for fmt in formats or ["jsonresume"]:
+        for name in EXPORT_FORMATS if fmt == "all" else [fmt]:
+            if name not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown export format {name!r}")
+            if name not in resolved:
+                resolved.append(name)
+    return resolved
+
+
+def export_targets(
+    sources: list[Path], formats: list[str], output_dir: Path
+) -> list[tuple[Path, str, Path]]:
+    """Plan ``(source, format, output path)`` tasks, named after each source's stem.
+
+    CV files export as JSON Resume only; other formats are skipped for them.
+    Raises ``ValueError`` if two tasks would write the same file or a CV
+    source has no format to export.
+    """
+    targets = []
+    seen: dict[Path, Path] = {}
+    for source in sources:
+        fmts = ["jsonresume"] if is_cv(source) and "jsonresume" in formats else formats
+        if is_cv(source) and fmts != ["jsonresume"]:
+            raise ValueError(f"{source}: CV files can only be exported as jsonresume")
+        for fmt in fmts:
+            path = output_dir / f"{source.stem}{EXPORT_FORMATS[fmt]}"
+            if path in seen:
+                raise ValueError(f"{seen[path]} and {source} would both write {path}")
+            seen[path] = source
+            targets.append((source, fmt, path))
+    return targets
+
+
+def export_source(
+    source: Path, fmt: str, path: Path, options: ExportOptions, registry: bool = False
+) -> ExportResult:
+    """Export one works file, registry or CV to ``path``, replacing it only when complete."""
+    start = time.perf_counter()
+    with atomic_write(path, "w") as f:
+        if is_cv(source):
+            write_lines(jsonresume_lines((), options, load_cv(source)), f)
+            records = 0
+        else:
+            works = (collect_iter_from_registry(source) if registry
+                     else collect_iter_from_path(source))
+            records = write_export(works, fmt, f, options)
+    return ExportResult(source, fmt, path, records, time.perf_counter() - start)
+
+
+def export_sources(
+    sources: list[Path],
+    formats: list[str],
+    output_dir: Path,
+    options: ExportOptions | None = None,
+    registry: bool = False,
+    jobs: int | None = None,
+) -> list[ExportResult]:
+    """Export every source in every format into ``output_dir``, in parallel when ``jobs`` allows.
+
+    Tasks run in worker processes, one ``(source, format)`` pair each, and
+    every worker streams its own source; results keep the planned order.
+    """
+    options = options or ExportOptions()
+    targets = export_targets(sources, formats, output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if jobs is None:
+        jobs = min(len(targets), os.cpu_count() or 1)
+    with phase("export"):
+        if jobs <= 1 or len(targets) <= 1:
+            return [export_source(*target, options, registry) for target in targets]
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=pool_context()) as pool:
+            futures = [pool.submit(export_source, *target, options, registry)
+                       for target in targets]
+            return [future.result() for future in futures]
@@ -0,0 +1,186 @@
+"""Faceted queries over medium, organ, tags, featured and text, on int bitsets.
+
+``FacetIndex`` keeps one bitmap per facet value, as a Python ``int`` whose
+bit ``i`` is set when document ``i`` has that value. A ``FacetQuery`` ORs the
+bitmaps of the values it lists within a facet and ANDs the facets together,
+so each condition costs a few big-integer word operations whatever the
+gallery size. Facet counts for the result come from ``int.bit_count`` of the
+result ANDed with every bitmap, in the same pass.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .gallery import Medium, Work
+
+
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def bitset(ids: Iterable[int]) -> int:
+    """Return the bitset with a bit set for each of ``ids``."""
+    if isinstance(ids, range) and ids.step == 1:
+        return ((1 << len(ids)) - 1) << ids.start if ids else 0
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def members(bits: int) -> list[int]:
+    """Return the ids set in ``bits``, ascending."""
+    ids: list[int] = []
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(data):
+        if byte:
+            base = i * 8
+            ids.extend(base + bit for bit in _BYTE_BITS[byte])
+    return ids
+
+
+@dataclass(frozen=True)
+class FacetQuery:
+    """A conjunction of facet conditions; values listed within a condition are alternatives.
+
+    ``tags`` matches works with any of the tags, ``all_tags`` those with every
+    one. ``text`` restricts to works matching a search in ``mode`` and then
+    orders the result by that search; otherwise results keep gallery order.
+    """
+    media: tuple[Medium, ...] = ()
+    organs: tuple[str, ...] = ()
+    tags: tuple[str, ...] = ()
+    all_tags: tuple[str, ...] = ()
+    featured: bool | None = None
+    text: str = ""
+    mode: str = "ranked"
+
+
+@dataclass
+class FacetResult:
+    """Works matching a ``FacetQuery`` and, per facet, how many of them take each value."""
+    works: list[Work]
+    facets: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.works)
+
+
+def sorted_counts(counts: dict[str, int]) -> dict[str, int]:
+    """Return ``counts`` ordered by descending count, then key."""
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+class FacetIndex:
+    """Per-value bitmaps over document ids for the medium, organ, tag and featured facets.
+
+    Documents are identified by the integer ids the owning gallery assigns.
+    """
+
+    def __init__(self) -> None:
+        self._bitmaps: dict[str, dict[str, int]] = {"medium": {}, "organ": {}, "tag": {}}
+        self._featured = 0
+        self._all = 0
+
+    @classmethod
+    def from_groups(
+        cls,
+        ids: Iterable[int],
+        groups: dict[str, dict[str, Iterable[int]]],
+        featured: Iterable[int],
+    ) -> FacetIndex:
+        """Build an index from the id lists of each facet value, one bitset per value."""
+        index = cls()
+        index._all = bitset(ids)
+        index._featured = bitset(featured)
+        for facet, values in groups.items():
+            index._bitmaps[facet] = {value: bitset(doc_ids) for value, doc_ids in values.items()}
+        return index
+
+    @classmethod
+    def from_works(cls, docs: Iterable[tuple[int, Work]]) -> FacetIndex:
+        ids: list[int] = []
+        featured: list[int] = []
+        media: dict[str, list[int]] = {}
+        organs: dict[str, list[int]] = {}
+        tags: dict[str, list[int]] = {}
+        for doc_id, work in docs:
+            ids.append(doc_id)
+            if work.featured:
+                featured.append(doc_id)
+            media.setdefault(work.medium.value, []).append(doc_id)
+            organs.setdefault(work.organ, []).append(doc_id)
+            for tag in dict.fromkeys(work._tags):
+                tags.setdefault(tag, []).append(doc_id)
+        return cls.from_groups(ids, {"medium": media, "organ": organs, "tag": tags}, featured)
+
+    def _keys(self, work: Work) -> tuple[tuple[str, str], ...]:
+        return (
+            ("medium", work.medium.value),
+            ("organ", work.organ),
+            *(("tag", tag) for tag in dict.fromkeys(work._tags)),
+        )
+
+    def add(self, doc_id: int, work: Work) -> None:
+        bit = 1 << doc_id
+        self._all |= bit
+        if work.featured:
+            self._featured |= bit
+        for facet, value in self._keys(work):
+            bitmaps = self._bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def remove(self, doc_id: int, work: Work) -> None:
+        mask = ~(1 << doc_id)
+        self._all &= mask
+        self._featured &= mask
+        for facet, value in self._keys(work):
+            bitmaps = self._bitmaps[facet]
+            bits = bitmaps.get(value, 0) & mask
+            if bits:
+                bitmaps[value] = bits
+            else:
+                bitmaps.pop(value, None)
+
+    def _any(self, facet: str, values: Iterable[str]) -> int:
+        bitmaps = self._bitmaps[facet]
+        bits = 0
+        for value in values:
+            bits |= bitmaps.get(value, 0)
+        return bits
+
+    def select(self, query: FacetQuery) -> int:
+        """Return the bitset of documents matching the facet conditions of ``query`` (not its text)."""
+        bits = self._all
+        if query.media:
+            bits &= self._any("medium", (m.value for m in query.media))
+        if query.organs:
+            bits &= self._any("organ", query.organs)
+        if query.tags:
+            bits &= self._any("tag", query.tags)
+        for tag in query.all_tags:
+            bits &= self._bitmaps["tag"].get(tag, 0)
+        if query.featured is not None:
+            bits &= self._featured if query.featured else ~self._featured
+        return bits
+
+    def counts(self, bits: int) -> dict[str, dict[str, int]]:
+        """Return, for each facet, how many documents in ``bits`` take each value."""
+        facets = {}
+        for facet, bitmaps in self._bitmaps.items():
+            counts = {}
+            for value, bitmap in bitmaps.items():
+                n = (bits & bitmap).bit_count()
+                if n:
+                    counts[value] = n
+            facets[facet] = sorted_counts(counts)
+        featured = (bits & self._featured).bit_count()
+        facets["featured"] = {"true": featured, "false": bits.bit_count() - featured}
+        return facets
@@ -0,0 +1,216 @@
+"""Typo-tolerant search over work titles and tags.
+
+``FuzzyIndex`` keeps the vocabulary of title and tag tokens, a character
+trigram index over that vocabulary, and a posting list per term. A query
+token is matched against the vocabulary rather than against works: terms
+are pruned to those whose length is within the edit budget and that share
+enough trigrams with the token (each edit destroys at most three of them),
+and the survivors are verified with a bounded Levenshtein distance. For
+short tokens the edits can destroy every trigram, so the bound proves
+nothing; those are checked against every term of a compatible length
+instead. The cost therefore grows with the number of distinct words, not
+with the size of the gallery.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .search import tokenize
+
+if TYPE_CHECKING:
+    from .gallery import Work
+
+
+# Weight of a match in the title and in the tags, as in ``search.FIELD_BOOSTS``.
+FIELD_BOOSTS = (3.0, 2.0)
+
+
+def max_edits(token: str) -> int:
+    """Return the edit budget for a query token: 0 up to 2 chars, 1 up to 5, else 2."""
+    if len(token) <= 2:
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+
+def trigrams(term: str) -> set[str]:
+    """Return the trigrams of ``term`` padded with one space on each side."""
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Return the Levenshtein distance between ``a`` and ``b``, or ``limit + 1`` if it exceeds ``limit``.
+
+    Only the diagonal band of width ``2 * limit + 1`` is computed, and the
+    scan stops as soon as a whole row exceeds ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+
+class FuzzyIndex:
+    """Trigram-pruned, edit-distance-verified term index over titles and tags.
+
+    Each term's postings are split by the best field it occurs in, as
+    insertion-ordered dicts used as sets, so scoring a term is one C-level
+    ``dict.update`` per field. Documents are identified by the integer ids
+    the owning gallery assigns.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, tuple[dict[int, None], dict[int, None]]] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._by_length: dict[int, set[str]] = {}
+        # Tags repeat across the gallery; tokenize each distinct one once.
+        self._tag_tokens: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def _terms(self, work: Work) -> tuple[list[str], list[str]]:
+        cache = self._tag_tokens
+        tag_terms: list[str] = []
+        for tag in work._tags:
+            tokens = cache.get(tag)
+            if tokens is None:
+                tokens = cache[tag] = tokenize(tag)
+            tag_terms.extend(tokens)
+        return tokenize(work.title), tag_terms
+
+    def add(self, doc_id: int, work: Work) -> None:
+        """Index the title and tag tokens of ``work`` under ``doc_id``."""
+        postings = self._postings
+        for field_id, terms in enumerate(self._terms(work)):
+            for term in terms:
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    term_postings = postings[term] = ({}, {})
+                    self._by_length.setdefault(len(term), set()).add(term)
+                    for gram in trigrams(term):
+                        self._trigrams.setdefault(gram, set()).add(term)
+                elif field_id and doc_id in term_postings[0]:
+                    continue  # already scored as a title match
+                term_postings[field_id][doc_id] = None
+
+    def remove(self, doc_id: int, work: Work) -> None:
+        """Drop the postings ``work`` contributed under ``doc_id``."""
+        title_terms, tag_terms = self._terms(work)
+        for term in dict.fromkeys(title_terms + tag_terms):
+            term_postings = self._postings.get(term)
+            if term_postings is None:
+                continue
+            for docs in term_postings:
+                docs.pop(doc_id, None)
+            if not (term_postings[0] or term_postings[1]):
+                del self._postings[term]
+                same_length = self._by_length[len(term)]
+                same_length.discard(term)
+                if not same_length:
+                    del self._by_length[len(term)]
+                for gram in trigrams(term):
+                    grams = self._trigrams.get(gram)
+                    if grams is not None:
+                        grams.discard(term)
+                        if not grams:
+                            del self._trigrams[gram]
+
+    def matches(self, token: str) -> dict[str, int]:
+        """Return vocabulary terms within ``max_edits(token)`` of ``token``, with their distances."""
+        limit = max_edits(token)
+        if limit == 0:
+            return {token: 0} if token in self._postings else {}
+        grams = trigrams(token)
+        length = len(token)
+        # q-gram lemma: each edit changes at most three of the token's trigrams, so a match
+        # keeps at least this many. At zero or below the lemma excludes nothing.
+        needed = len(grams) - 3 * limit
+        if needed > 0:
+            overlap: dict[str, int] = {}
+            for gram in grams:
+                for term in self._trigrams.get(gram, ()):
+                    overlap[term] = overlap.get(term, 0) + 1
+            candidates = [term for term, shared in overlap.items() if shared >= needed]
+        else:
+            by_length = self._by_length
+            candidates = [
+                term
+                for n in range(length - limit, length + limit + 1)
+                for term in by_length.get(n, ())
+            ]
+        found = {}
+        for term in candidates:
+            if abs(len(term) - length) > limit:
+                continue
+            distance = edit_distance(token, term, limit)
+            if distance <= limit:
+                found[term] = distance
+        return found
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """Return ``(doc_id, score)`` pairs for documents approximately matching every query term.
+
+        A term matched at distance ``d`` scores ``boost * (1 - d / (len + 1))``
+        for its best field; each query token takes its best-scoring term per
+        document. Results are ordered by descending score, then document id.
+        """
+        per_token = []
+        for token in dict.fromkeys(tokenize(query)):
+            weighted = []
+            for term, distance in self.matches(token).items():
+                similarity = 1.0 - distance / (max(len(term), len(token)) + 1)
+                for boost, docs in zip(FIELD_BOOSTS, self._postings[term]):
+                    if docs:
+                        weighted.append((boost * similarity, docs))
+            if not weighted:
+                return []
+            # Applied in ascending order so each document ends up with its best score.
+            weighted.sort(key=lambda item: item[0])
+            per_token.append((sum(len(docs) for _, docs in weighted), weighted))
+
+        # Rarest token first, so later tokens only score the surviving documents.
+        per_token.sort(key=lambda item: item[0])
+        scores: dict[int, float] | None = None
+        for size, weighted in per_token:
+            token_scores: dict[int, float] = {}
+            if scores is None or size <= len(scores):
+                for score, docs in weighted:
+                    token_scores.update(dict.fromkeys(docs, score))
+            else:
+                for score, docs in weighted:
+                    for doc_id in scores:
+                        if doc_id in docs:
+                            token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(scores)
+        ranked.sort(key=scores.__getitem__, reverse=True)  # stable: ties stay in id order
+        return [(doc_id, scores[doc_id]) for doc_id in ranked]
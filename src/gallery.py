@@ -2,9 +2,21 @@
 
 from __future__ import annotations
 
+import gc
+import threading
+from collections.abc import Callable, Container, Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import date
 from enum import Enum
+from sys import intern
+
+from .defaults import RELATED_COUNT
+from .facets import FacetIndex, FacetQuery, FacetResult, bitset, members
+from .fuzzy import FuzzyIndex
+from .profiling import phase
+from .related import RelatedIndex
+from .search import SearchIndex
 
 
 class Medium(str, Enum):
@@ -18,48 +30,612 @@ class Medium(str, Enum):
     SOFTWARE = "software"
 
 
-@dataclass
+SEARCH_MODES = ("ranked", "substring", "fuzzy")
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_resume = False
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """Suspend cyclic garbage collection while bulk-allocating acyclic objects.
+
+    Building hundreds of thousands of works and postings otherwise triggers
+    repeated full collections that dominate load time. Pauses may nest and
+    overlap across threads: collection resumes when the last one ends, and
+    only if it was enabled when the first began.
+    """
+    global _gc_pauses, _gc_resume
+    with _gc_lock:
+        if not _gc_pauses:
+            _gc_resume = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_resume:
+                gc.enable()
+
+
+def slugify(title: str) -> str:
+    """Return the base URL slug for ``title``."""
+    return title.lower().replace(" ", "-").replace("'", "")
+
+
+def unique_slug(base: str, taken: Container[str], hints: dict[str, int] | None = None) -> str:
+    """Return ``base``, or the first of ``base-2``, ``base-3``, ... not in ``taken``.
+
+    ``hints`` maps a base to a suffix below which every candidate is known to
+    be taken; it is updated here, so titles repeated thousands of times do not
+    rescan from ``-2`` each time. Callers must drop a base's hint when one of
+    its suffixed slugs is freed (see ``slug_base``).
+    """
+    if base not in taken:
+        return base
+    n = 2 if hints is None else hints.get(base, 2)
+    while f"{base}-{n}" in taken:
+        n += 1
+    if hints is not None:
+        hints[base] = n + 1
+    return f"{base}-{n}"
+
+
+def slug_base(slug: str) -> str | None:
+    """Return the base ``slug`` would be a numbered suffix of, or ``None``."""
+    base, sep, suffix = slug.rpartition("-")
+    return base if sep and suffix.isdigit() else None
+
+
 class Work:
-    """A single creative work in the portfolio."""
-    title: str
-    description: str
-    medium: Medium
-    organ: str
-    repo: str
-    date_created: date | None = None
-    tags: list[str] = field(default_factory=list)
-    url: str = ""
-    featured: bool = False
+    """A single creative work in the portfolio.
+
+    Works are slotted to avoid a per-instance ``__dict__``. Organ, repo and
+    tag strings are interned so the handful of distinct values are shared
+    across a gallery, and tags are stored as a tuple; ``tags`` still reads
+    and assigns as a list.
+
+    The slug is computed once, on first access. A gallery overwrites it with
+    a collision-free slug when the work is added, so two works titled "Echo"
+    and "echo" are reachable as ``echo`` and ``echo-2``.
+    """
+    __slots__ = (
+        "title", "description", "medium", "organ", "repo",
+        "date_created", "_tags", "url", "featured", "_slug",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        description: str,
+        medium: Medium,
+        organ: str,
+        repo: str,
+        date_created: date | None = None,
+        tags: Iterable[str] = (),
+        url: str = "",
+        featured: bool = False,
+    ) -> None:
+        self.title = title
+        self.description = description
+        self.medium = medium
+        self.organ = intern(organ)
+        self.repo = intern(repo)
+        self.date_created = date_created
+        self._tags = tuple(map(intern, tags))
+        self.url = url
+        self.featured = featured
+        self._slug: str | None = None
+
+    @property
+    def tags(self) -> list[str]:
+        return list(self._tags)
+
+    @tags.setter
+    def tags(self, tags: Iterable[str]) -> None:
+        self._tags = tuple(map(intern, tags))
 
     @property
     def slug(self) -> str:
-        return self.title.lower().replace(" ", "-").replace("'", "")
+        slug = self._slug
+        if slug is None:
+            slug = self._slug = slugify(self.title)
+        return slug
+
+    def _astuple(self) -> tuple:
+        return (
+            self.title, self.description, self.medium, self.organ, self.repo,
+            self.date_created, self._tags, self.url, self.featured,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"Work(title={self.title!r}, description={self.description!r}, "
+            f"medium={self.medium!r}, organ={self.organ!r}, repo={self.repo!r}, "
+            f"date_created={self.date_created!r}, tags={self.tags!r}, "
+            f"url={self.url!r}, featured={self.featured!r})"
+        )
+
+
+def _bump(counts: dict[str, int], key: str, delta: int) -> None:
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+@dataclass
+class GalleryStats:
+    """Running aggregate counts over a set of works.
+
+    Keys appear in the order they were first seen, and a key whose count
+    drops to zero is removed.
+    """
+    total: int = 0
+    featured: int = 0
+    by_medium: dict[str, int] = field(default_factory=dict)
+    by_organ: dict[str, int] = field(default_factory=dict)
+    by_tag: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_works(cls, works: Iterable[Work]) -> GalleryStats:
+        """Count ``works`` in one pass without keeping them, e.g. from a streaming collector."""
+        stats = cls()
+        for work in works:
+            stats.add(work)
+        return stats
+
+    def add(self, work: Work) -> None:
+        self._update(work, 1)
+
+    def remove(self, work: Work) -> None:
+        self._update(work, -1)
+
+    def _update(self, work: Work, delta: int) -> None:
+        self.total += delta
+        if work.featured:
+            self.featured += delta
+        _bump(self.by_medium, work.medium.value, delta)
+        _bump(self.by_organ, work.organ, delta)
+        for tag in work._tags:
+            _bump(self.by_tag, tag, delta)
+
+    def as_summary(self) -> dict:
+        """Return the counts in the shape produced by ``render_summary``."""
+        return {
+            "total_works": self.total,
+            "featured_count": self.featured,
+            "by_medium": dict(self.by_medium),
+            "by_organ": dict(self.by_organ),
+            "by_tag": dict(self.by_tag),
+        }
+
+
+class _Works:
+    """``Gallery.works``: a dataclass field read and assigned through the gallery.
+
+    Reading compacts the list after removals; assigning rebuilds every index.
+    """
+
+    def __get__(self, gallery: Gallery | None, owner: type | None = None) -> list[Work]:
+        if gallery is None:
+            # The field's default, as dataclasses reads it from the class.
+            return ()  # type: ignore[return-value]
+        if gallery._works_stale:
+            # ``_docs`` holds the remaining works in insertion order.
+            gallery._works[:] = gallery._docs.values()
+            gallery._works_stale = False
+        return gallery._works
+
+    def __set__(self, gallery: Gallery, works: Iterable[Work]) -> None:
+        gallery._reindex(works)
 
 
 @dataclass
 class Gallery:
-    """A curated collection of works."""
+    """A curated collection of works.
+
+    Works are keyed internally by a document id assigned on insertion, and
+    per-medium, per-organ, featured and slug indexes are maintained by
+    ``add_work`` and ``remove_work`` so lookups cost O(result) rather than
+    O(gallery). Slugs are assigned in insertion order, the first work with a
+    given base slug keeping it and later ones taking ``-2``, ``-3``, ...
+    Works should be added and removed through these methods, not by mutating
+    ``works`` directly; assigning ``works`` replaces them and rebuilds every
+    index.
+
+    ``remove_work`` finds the work's document id through its slug and only
+    drops it from ``_docs`` and the indexes; ``works`` is compacted in place
+    the next time it is read, so a run of removals costs one pass over the
+    list rather than one per removal.
+    """
     name: str
     description: str
-    works: list[Work] = field(default_factory=list)
+    _works: list[Work] = field(default_factory=list, init=False, repr=False, compare=False)
+    _works_stale: bool = field(default=False, init=False, repr=False, compare=False)
+    _docs: dict[int, Work] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _next_doc: int = field(default=0, init=False, repr=False, compare=False)
+    _medium_index: dict[Medium, dict[int, Work]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _organ_index: dict[str, dict[int, Work]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _featured_index: dict[int, Work] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _slug_index: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _slug_hints: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _stats: GalleryStats = field(
+        default_factory=GalleryStats, init=False, repr=False, compare=False
+    )
+    _search_index: SearchIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _search_index_loader: Callable[[], SearchIndex] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _search_index_covers: int = field(default=0, init=False, repr=False, compare=False)
+    _search_index_built: Callable[[], None] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _fuzzy_index: FuzzyIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _facet_index: FacetIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _related_index: RelatedIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Held while a lazy index is built, so concurrent readers build it once.
+    _index_lock: threading.RLock = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+    # Declared last so that ``__init__`` assigns it once the fields above exist.
+    works: list[Work] = _Works()
+
+    def __getstate__(self) -> dict:
+        # A pending index loader may close over local state; rebuild lazily instead.
+        state = self.__dict__.copy()
+        state["_search_index_loader"] = None
+        state["_search_index_built"] = None
+        del state["_index_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._index_lock = threading.RLock()
 
     def add_work(self, work: Work) -> None:
         self.works.append(work)
+        self._index(work)
+
+    def add_works(self, works: Iterable[Work]) -> None:
+        """Add many works, building every index in a single pass."""
+        append = self.works.append
+        index = self._index
+        with paused_gc():
+            for work in works:
+                append(work)
+                index(work)
+
+    def _reindex(self, works: Iterable[Work]) -> None:
+        """Replace every work with ``works``, dropping all indexes and building them again."""
+        works = list(works)
+        self._works, self._works_stale = [], False
+        self._docs, self._next_doc = {}, 0
+        self._medium_index, self._organ_index, self._featured_index = {}, {}, {}
+        self._slug_index, self._slug_hints = {}, {}
+        self._stats = GalleryStats()
+        self._search_index = self._search_index_loader = self._search_index_built = None
+        self._search_index_covers = 0
+        self._fuzzy_index = self._facet_index = self._related_index = None
+        self.add_works(works)
+
+    def remove_work(self, work: Work) -> None:
+        """Remove ``work`` (matched by identity) and drop it from every index."""
+        doc_id = self._slug_index.get(work._slug)
+        if self._docs.get(doc_id) is not work:
+            # The work's slug was reassigned by another gallery it was added to.
+            doc_id = next((d for d, w in self._docs.items() if w is work), None)
+            if doc_id is None:
+                raise ValueError(f"Work not in gallery: {work.title!r}")
+        self._load_pending_index()
+        del self._docs[doc_id]
+        self._unindex(doc_id, work)
+        self._works_stale = True
+
+    def _load_pending_index(self) -> None:
+        # Postings of a deferred index can only be dropped once it is loaded.
+        if self._search_index_loader is not None:
+            self.search_index()
+
+    def _index(self, work: Work) -> int:
+        doc_id = self._next_doc
+        self._next_doc += 1
+        self._docs[doc_id] = work
+        self._medium_index.setdefault(work.medium, {})[doc_id] = work
+        self._organ_index.setdefault(work.organ, {})[doc_id] = work
+        if work.featured:
+            self._featured_index[doc_id] = work
+        slugs = self._slug_index
+        slug = slugify(work.title)
+        if slug in slugs:
+            slug = unique_slug(slug, slugs, self._slug_hints)
+        work._slug = slug
+        slugs[slug] = doc_id
+        self._stats.add(work)
+        if self._search_index is not None:
+            self._search_index.add(doc_id, work)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(doc_id, work)
+        if self._facet_index is not None:
+            self._facet_index.add(doc_id, work)
+        if self._related_index is not None:
+            self._related_index.add(doc_id, work)
+        return doc_id
+
+    def _unindex(self, doc_id: int, work: Work) -> None:
+        for index, key in ((self._medium_index, work.medium), (self._organ_index, work.organ)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(doc_id, None)
+                if not bucket:
+                    del index[key]
+        self._featured_index.pop(doc_id, None)
+        if self._slug_index.get(work._slug) == doc_id:
+            del self._slug_index[work._slug]
+            self._slug_hints.pop(slug_base(work._slug), None)
+        self._stats.remove(work)
+        if self._search_index is not None:
+            self._search_index.remove(doc_id, work)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(doc_id, work)
+        if self._facet_index is not None:
+            self._facet_index.remove(doc_id, work)
+        if self._related_index is not None:
+            self._related_index.remove(doc_id, work)
+
+    @property
+    def stats(self) -> GalleryStats:
+        """Aggregate counts, maintained as works are added and removed."""
+        return self._stats
+
+    def search_index(self) -> SearchIndex:
+        """Return the full-text index, loading or building it on first use."""
+        if self._search_index is None:
+            with self._index_lock:
+                if self._search_index is None:
+                    self._build_search_index()
+        return self._search_index
+
+    def _build_search_index(self) -> None:
+        if self._search_index_loader is not None:
+            loader, self._search_index_loader = self._search_index_loader, None
+            with phase("search_index_load"), paused_gc():
+                index = loader()
+                for doc_id in range(self._search_index_covers, self._next_doc):
+                    if doc_id in self._docs:
+                        index.add(doc_id, self._docs[doc_id])
+            self._search_index = index
+        if self._search_index is None:
+            index = SearchIndex()
+            with phase("search_index_build"), paused_gc():
+                for doc_id, work in self._docs.items():
+                    index.add(doc_id, work)
+            self._search_index = index
+            if self._search_index_built is not None:
+                hook, self._search_index_built = self._search_index_built, None
+                hook()
+
+    def fuzzy_index(self) -> FuzzyIndex:
+        """Return the typo-tolerant title and tag index, building it on first use."""
+        if self._fuzzy_index is None:
+            with self._index_lock:
+                if self._fuzzy_index is None:
+                    index = FuzzyIndex()
+                    with phase("fuzzy_index_build"), paused_gc():
+                        for doc_id, work in self._docs.items():
+                            index.add(doc_id, work)
+                    self._fuzzy_index = index
+        return self._fuzzy_index
+
+    def set_search_index_loader(
+        self, loader: Callable[[], SearchIndex], covers: int | None = None
+    ) -> None:
+        """Defer search index construction to ``loader``, called on first search.
+
+        The loaded index is taken to hold documents ``0 .. covers - 1`` (by
+        default, every work present now); works added after that point are
+        indexed when it loads.
+        """
+        self._search_index = None
+        self._search_index_loader = loader
+        self._search_index_covers = self._next_doc if covers is None else covers
+
+    def on_search_index_built(self, hook: Callable[[], None] | None) -> None:
+        """Call ``hook`` once, after the search index is next built from the works.
+
+        Lets a cache persist an index that was only built because a search
+        needed it. ``None`` clears a pending hook.
+        """
+        self._search_index_built = hook
+
+    @property
+    def search_index_pending(self) -> bool:
+        """Whether a deferred index loader has yet to run."""
+        return self._search_index_loader is not None
+
+    def search_index_state(self) -> tuple | None:
+        """Return the built search index as builtins, or ``None``.
+
+        The state is only usable while document ids are contiguous, which
+        holds unless works have been removed.
+        """
+        if self._search_index is None or self._next_doc != len(self.works):
+            return None
+        return self._search_index.to_state()
+
+    def to_state(self) -> tuple:
+        """Return the gallery's works as plain builtins, suitable for ``marshal``."""
+        works = tuple(
+            (
+                w.title,
+                w.description,
+                w.medium.value,
+                w.organ,
+                w.repo,
+                w.date_created.isoformat() if w.date_created else None,
+                w._tags,
+                w.url,
+                w.featured,
+            )
+            for w in self.works
+        )
+        return self.name, self.description, works
+
+    @classmethod
+    def from_state(cls, state: tuple) -> Gallery:
+        name, description, works = state
+        gallery = cls(name=name, description=description)
+        media = {m.value: m for m in Medium}
+        with paused_gc():
+            gallery.add_works(
+                Work(
+                    title=title,
+                    description=desc,
+                    medium=media[medium],
+                    organ=organ,
+                    repo=repo,
+                    date_created=date.fromisoformat(created) if created else None,
+                    tags=tags,
+                    url=url,
+                    featured=featured,
+                )
+                for title, desc, medium, organ, repo, created, tags, url, featured in works
+            )
+        return gallery
 
     def featured_works(self) -> list[Work]:
-        return [w for w in self.works if w.featured]
+        return list(self._featured_index.values())
 
     def by_medium(self, medium: Medium) -> list[Work]:
-        return [w for w in self.works if w.medium == medium]
+        return list(self._medium_index.get(medium, {}).values())
 
     def by_organ(self, organ: str) -> list[Work]:
-        return [w for w in self.works if w.organ == organ]
+        return list(self._organ_index.get(organ, {}).values())
+
+    def get_by_slug(self, slug: str) -> Work | None:
+        """Return the work whose slug is ``slug``, or ``None``."""
+        doc_id = self._slug_index.get(slug)
+        return None if doc_id is None else self._docs[doc_id]
+
+    def search(self, query: str, mode: str = "ranked") -> list[Work]:
+        """Find works matching ``query``.
+
+        ``ranked`` mode (the default) uses the inverted index: every query term
+        must prefix-match a token in the title, tags or description, and
+        results are ordered by relevance. ``fuzzy`` mode matches every query
+        term against title and tag words within a small edit distance, so
+        typos still find their work, and ranks closer matches first.
+        ``substring`` mode keeps the original case-insensitive substring scan
+        in gallery order. Queries without any word characters fall back to
+        substring matching.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        # Broad typo matches can return most of the gallery; skip GC passes over it.
+        with paused_gc():
+            return [self._docs[doc_id] for doc_id in self._search_ids(query, mode)]
+
+    def _search_ids(self, query: str, mode: str) -> list[int]:
+        if mode == "fuzzy" and any(c.isalnum() for c in query):
+            return [doc_id for doc_id, _ in self.fuzzy_index().search(query)]
+        if mode == "ranked" and any(c.isalnum() for c in query):
+            return [doc_id for doc_id, _ in self.search_index().search(query)]
 
-    def search(self, query: str) -> list[Work]:
         q = query.lower()
         return [
-            w for w in self.works
+            doc_id for doc_id, w in self._docs.items()
             if q in w.title.lower()
             or q in w.description.lower()
             or any(q in tag.lower() for tag in w.tags)
         ]
+
+    def facet_index(self) -> FacetIndex:
+        """Return the per-value facet bitmaps, building them on first use."""
+        if self._facet_index is None:
+            with self._index_lock:
+                if self._facet_index is None:
+                    with phase("facet_index_build"), paused_gc():
+                        self._facet_index = FacetIndex.from_works(self._docs.items())
+        return self._facet_index
+
+    def query(self, query: FacetQuery, counts: bool = True) -> FacetResult:
+        """Return the works matching every condition of ``query``, with facet counts.
+
+        Facet conditions are evaluated as bitset intersections. With
+        ``query.text`` the result is further restricted to, and ordered by,
+        ``search(query.text, query.mode)``; otherwise it keeps gallery order.
+        ``counts=False`` skips the facet counts, leaving ``facets`` empty.
+        """
+        if query.mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode {query.mode!r}; expected one of {SEARCH_MODES}"
+            )
+        index = self.facet_index()
+        with phase("facet_select"):
+            bits = index.select(query)
+            if query.text:
+                ranked = self._search_ids(query.text, query.mode)
+                bits &= bitset(ranked)
+                keep = set(members(bits))
+                ids = [doc_id for doc_id in ranked if doc_id in keep]
+            else:
+                ids = members(bits)
+        facets = {}
+        if counts:
+            with phase("facet_counts"):
+                facets = index.counts(bits)
+        return FacetResult([self._docs[doc_id] for doc_id in ids], facets)
+
+    def related_index(self) -> RelatedIndex:
+        """Return the MinHash/LSH related-works index, building it on first use."""
+        if self._related_index is None:
+            with self._index_lock:
+                if self._related_index is None:
+                    index = RelatedIndex()
+                    with phase("related_index_build"), paused_gc():
+                        for doc_id, work in self._docs.items():
+                            index.add(doc_id, work)
+                    self._related_index = index
+        return self._related_index
+
+    def related(self, work: Work, count: int = RELATED_COUNT) -> list[Work]:
+        """Return up to ``count`` works most similar to ``work`` by tags and description.
+
+        ``work`` is found by its slug. Similarity is estimated from MinHash
+        signatures and candidates come from LSH buckets, so each call touches
+        a bounded number of works; ties keep gallery order.
+        """
+        doc_id = self._slug_index.get(work.slug)
+        if doc_id is None or self._docs[doc_id] is not work:
+            raise ValueError(f"Work not in gallery: {work.title!r}")
+        return [self._docs[other] for other, _ in self.related_index().related(doc_id, count)]
@@ -0,0 +1,134 @@
+"""Render several output formats from one parsed gallery in parallel."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .gallery import Gallery
+from .incremental import BuildStats, generate_incremental
+from .renderer import FORMATS, related_json_entry, write_lines
+
+
+FORMAT_SUFFIXES: dict[str, str] = {
+    "markdown": ".md",
+    "html": ".html",
+    "json": ".json",
+}
+
+_worker_gallery: Gallery | None = None
+
+
+@dataclass
+class FormatResult:
+    """Outcome of rendering one format."""
+    fmt: str
+    path: Path
+    seconds: float
+    stats: BuildStats | None = None
+
+
+def expand_formats(formats: list[str] | None) -> list[str]:
+    """Resolve ``--format`` values, expanding ``all`` and dropping duplicates."""
+    resolved: list[str] = []
+    for fmt in formats or ["markdown"]:
+        for name in FORMAT_SUFFIXES if fmt == "all" else [fmt]:
+            if name not in resolved:
+                resolved.append(name)
+    return resolved
+
+
+def output_paths(base: Path, formats: list[str]) -> dict[str, Path]:
+    """Map each format to ``base`` with that format's suffix."""
+    return {fmt: base.with_suffix(FORMAT_SUFFIXES[fmt]) for fmt in formats}
+
+
+def _set_worker_gallery(gallery: Gallery) -> None:
+    global _worker_gallery
+    _worker_gallery = gallery
+
+
+def render_format(
+    gallery: Gallery,
+    fmt: str,
+    path: Path,
+    incremental: bool = False,
+    related: int = 0,
+    source: Path | None = None,
+) -> FormatResult:
+    """Render one format of ``gallery`` to ``path`` and time it.
+
+    ``related`` adds that many related works to each JSON record; other
+    formats ignore it. ``source``, the file ``gallery`` was loaded from,
+    lets an incremental build keep an output whose inputs are unchanged.
+    """
+    start = time.perf_counter()
+    stats = None
+    if incremental:
+        stats = generate_incremental(gallery, fmt, path, related, source)
+    else:
+        lines = FORMATS[fmt][0]
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "json":
+                write_lines(lines(gallery, entry_fragment=related_json_entry(gallery, related)), f)
+            else:
+                write_lines(lines(gallery), f)
+    return FormatResult(fmt, path, time.perf_counter() - start, stats)
+
+
+def _render_in_worker(
+    fmt: str, path: Path, incremental: bool, related: int, source: Path | None
+) -> FormatResult:
+    assert _worker_gallery is not None
+    return render_format(_worker_gallery, fmt, path, incremental, related, source)
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """Return the context for worker pools: fork where available.
+
+    Forked workers inherit the parsed gallery passed to the pool initializer
+    without pickling it.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def generate_formats(
+    gallery: Gallery,
+    targets: dict[str, Path],
+    jobs: int | None = None,
+    incremental: bool = False,
+    related: int = 0,
+    source: Path | None = None,
+) -> list[FormatResult]:
+    """Render every ``format -> path`` target, concurrently when ``jobs`` allows.
+
+    Workers are processes, since rendering is CPU-bound Python. Each receives
+    the already-parsed gallery once, through the pool initializer, so the
+    works file is only read in the parent. Results keep the order of
+    ``targets``.
+    """
+    if jobs is None:
+        jobs = min(len(targets), os.cpu_count() or 1)
+    if jobs <= 1 or len(targets) <= 1:
+        return [
+            render_format(gallery, fmt, path, incremental, related, source)
+            for fmt, path in targets.items()
+        ]
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=pool_context(),
+        initializer=_set_worker_gallery,
+        initargs=(gallery,),
+    ) as pool:
+        futures = [
+            pool.submit(_render_in_worker, fmt, path, incremental, related, source)
+            for fmt, path in targets.items()
+        ]
+        return [future.result() for future in futures]
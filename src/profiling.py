@@ -0,0 +1,147 @@
+"""Per-phase timing, counters and peak-memory hooks for CLI runs.
+
+Library code marks its phases with ``phase(name)`` and its object counts
+with ``count(name, n)``. Both are no-ops unless a ``profiling()`` block is
+active: ``phase`` then returns a shared null context and ``count`` returns
+immediately, so the hooks can stay in place on hot paths. Nested phases are
+recorded under slash-joined names such as ``generate/load/decode``.
+
+``tracemalloc`` and ``cProfile`` are imported only once profiling starts, so
+importing this module costs the CLI next to nothing.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+
+_NULL = contextlib.nullcontext()
+
+_profiler: Profiler | None = None
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start", "floor")
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        profiler = self.profiler
+        stack = profiler._stack
+        self.name = f"{stack[-1].name}/{self.name}" if stack else self.name
+        self.floor = 0
+        if profiler.memory:
+            import tracemalloc
+
+            # Fold the peak so far into the parent before measuring this phase alone.
+            peak = tracemalloc.get_traced_memory()[1]
+            if stack:
+                stack[-1].floor = max(stack[-1].floor, peak)
+            else:
+                profiler._floor = max(profiler._floor, peak)
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        seconds = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler._stack.pop()
+        entry = profiler.phases.get(self.name)
+        if entry is None:
+            entry = profiler.phases[self.name] = {"seconds": 0.0, "calls": 0}
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        if profiler.memory:
+            import tracemalloc
+
+            peak = max(self.floor, tracemalloc.get_traced_memory()[1])
+            entry["peak_bytes"] = max(entry.get("peak_bytes", 0), peak)
+            if profiler._stack:
+                parent = profiler._stack[-1]
+                parent.floor = max(parent.floor, peak)
+            else:
+                profiler._floor = max(profiler._floor, peak)
+
+
+class Profiler:
+    """Collected phase durations, counters and memory peaks for one run."""
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory = memory
+        self.phases: dict[str, dict] = {}
+        self.counts: dict[str, int] = {}
+        self.seconds = 0.0
+        self.peak_bytes: int | None = None
+        self._stack: list[_Phase] = []
+        self._floor = 0
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def report(self, **extra: object) -> dict:
+        """Return the run as a JSON-serialisable dict; ``extra`` keys come first."""
+        return {
+            **extra,
+            "total_seconds": self.seconds,
+            "peak_bytes": self.peak_bytes,
+            "phases": self.phases,
+            "counts": self.counts,
+        }
+
+
+def phase(name: str) -> contextlib.AbstractContextManager:
+    """Time the enclosed block as phase ``name`` when profiling is active."""
+    if _profiler is None:
+        return _NULL
+    return _profiler.phase(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add ``n`` to counter ``name`` when profiling is active."""
+    if _profiler is None:
+        return
+    _profiler.counts[name] = _profiler.counts.get(name, 0) + n
+
+
+@contextlib.contextmanager
+def profiling(memory: bool = True, pstats_path: Path | None = None) -> Iterator[Profiler]:
+    """Activate the hooks for the enclosed block and yield the collecting ``Profiler``.
+
+    With ``memory`` the run is traced by tracemalloc, which slows allocation-heavy
+    phases noticeably; with ``pstats_path`` it also runs under cProfile and the
+    stats are dumped there for ``python -m pstats``.
+    """
+    import cProfile
+    import tracemalloc
+
+    global _profiler
+    profiler = Profiler(memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif memory:
+        tracemalloc.reset_peak()
+    cprofile = cProfile.Profile() if pstats_path is not None else None
+    _profiler = profiler
+    start = time.perf_counter()
+    if cprofile is not None:
+        cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if cprofile is not None:
+            cprofile.disable()
+        profiler.seconds = time.perf_counter() - start
+        _profiler = None
+        if memory:
+            profiler.peak_bytes = max(profiler._floor, tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                tracemalloc.stop()
+        if cprofile is not None:
+            cprofile.dump_stats(str(pstats_path))
@@ -1,127 +1,294 @@
-"""Render galleries to various output formats."""
+"""Render galleries to various output formats.
+
+Each format is produced by a line generator. ``render_*`` joins the lines
+into a string; ``write_*`` streams them to a file object in buffered chunks so
+memory stays flat however many works the gallery holds.
+"""
 
 from __future__ import annotations
 
+import io
 import json as json_module
-from .gallery import Gallery
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO
 
+from .gallery import Gallery, Work
+from .profiling import count, phase
 
-def render_markdown(gallery: Gallery) -> str:
-    """Render a gallery as Markdown."""
-    lines = [f"# {gallery.name}", "", gallery.description, ""]
+
+CHUNK_SIZE = 1 << 16
+
+# Bump when per-work fragment output changes, so cached fragments are discarded.
+FRAGMENT_VERSION = 1
+
+FeaturedFragment = Callable[[Work], list[str]]
+EntryFragment = Callable[[Work], str]
+
+HTML_STYLE = [
+    "    body { font-family: Georgia, serif; max-width: 800px; margin: 2rem auto; padding: 0 1rem; }",
+    "    .work { margin-bottom: 2rem; border-bottom: 1px solid #ddd; padding-bottom: 1rem; }",
+    "    .medium { color: #666; font-style: italic; }",
+    "    .tags { color: #888; font-size: 0.9em; }",
+    "    .featured { border-left: 4px solid #c9a227; padding-left: 1rem; }",
+]
+
+
+def write_lines(lines: Iterable[str], stream: IO, chunk_size: int = CHUNK_SIZE) -> None:
+    """Write newline-joined ``lines`` to a text or binary stream in chunks.
+
+    The output matches ``"\\n".join(lines)``: no trailing newline is added.
+    Binary streams receive UTF-8. Under profiling, the whole call is the
+    ``render`` phase and the stream writes within it are ``render/write``.
+    """
+    binary = not isinstance(stream, io.TextIOBase)
+    buffer: list[str] = []
+    size = 0
+    first = True
+    n_lines = 0
+    with phase("render"):
+        for line in lines:
+            if first:
+                first = False
+            else:
+                buffer.append("\n")
+            buffer.append(line)
+            size += len(line) + 1
+            n_lines += 1
+            if size >= chunk_size:
+                chunk = "".join(buffer)
+                with phase("write"):
+                    stream.write(chunk.encode("utf-8") if binary else chunk)
+                buffer.clear()
+                size = 0
+        if buffer:
+            chunk = "".join(buffer)
+            with phase("write"):
+                stream.write(chunk.encode("utf-8") if binary else chunk)
+    count("lines", n_lines)
+
+
+def markdown_featured(work: Work) -> list[str]:
+    """Return the Featured Works block for one work."""
+    lines = [
+        f"### {work.title}",
+        f"*{work.medium.value}* | {work.organ}",
+        "",
+        work.description,
+    ]
+    if work.tags:
+        lines.append(f"\nTags: {', '.join(work.tags)}")
+    lines.append("")
+    return lines
+
+
+def markdown_entry(work: Work) -> str:
+    """Return the All Works list entry for one work."""
+    return f"- **{work.title}** ({work.medium.value}) — {work.organ}"
+
+
+def _markdown_lines(
+    gallery: Gallery,
+    featured_fragment: FeaturedFragment = markdown_featured,
+    entry_fragment: EntryFragment = markdown_entry,
+) -> Iterator[str]:
+    yield from (f"# {gallery.name}", "", gallery.description, "")
 
     featured = gallery.featured_works()
     if featured:
-        lines.append("## Featured Works")
-        lines.append("")
+        yield "## Featured Works"
+        yield ""
         for work in featured:
-            lines.append(f"### {work.title}")
-            lines.append(f"*{work.medium.value}* | {work.organ}")
-            lines.append("")
-            lines.append(work.description)
-            if work.tags:
-                lines.append(f"\nTags: {', '.join(work.tags)}")
-            lines.append("")
-
-    lines.append("## All Works")
-    lines.append("")
-    lines.append(f"Total: {len(gallery.works)} works")
-    lines.append("")
+            yield from featured_fragment(work)
+
+    yield "## All Works"
+    yield ""
+    yield f"Total: {len(gallery.works)} works"
+    yield ""
 
     for work in gallery.works:
-        lines.append(f"- **{work.title}** ({work.medium.value}) — {work.organ}")
+        yield entry_fragment(work)
+
+
+def render_markdown(gallery: Gallery) -> str:
+    """Render a gallery as Markdown."""
+    return "\n".join(_markdown_lines(gallery))
+
 
-    return "\n".join(lines)
+def write_markdown(gallery: Gallery, stream: IO, chunk_size: int = CHUNK_SIZE) -> None:
+    """Stream a gallery as Markdown to ``stream``."""
+    write_lines(_markdown_lines(gallery), stream, chunk_size)
 
 
 def render_summary(gallery: Gallery) -> dict:
-    """Generate a summary dict of the gallery."""
-    medium_counts: dict[str, int] = {}
-    organ_counts: dict[str, int] = {}
+    """Generate a summary dict of the gallery from its running counters."""
+    return gallery.stats.as_summary()
 
-    for work in gallery.works:
-        medium_counts[work.medium.value] = medium_counts.get(work.medium.value, 0) + 1
-        organ_counts[work.organ] = organ_counts.get(work.organ, 0) + 1
 
-    return {
-        "total_works": len(gallery.works),
-        "featured_count": len(gallery.featured_works()),
-        "by_medium": medium_counts,
-        "by_organ": organ_counts,
-    }
+def html_featured(work: Work) -> list[str]:
+    """Return the featured-work card for one work."""
+    lines = [
+        "  <div class=\"work featured\">",
+        f"    <h3>{work.title}</h3>",
+        f"    <p class=\"medium\">{work.medium.value} | {work.organ}</p>",
+        f"    <p>{work.description}</p>",
+    ]
+    if work.tags:
+        lines.append(f"    <p class=\"tags\">Tags: {', '.join(work.tags)}</p>")
+    lines.append("  </div>")
+    return lines
 
 
-def render_html(gallery: Gallery) -> str:
-    """Render a gallery as a simple HTML portfolio page."""
-    parts: list[str] = []
-    parts.append("<!DOCTYPE html>")
-    parts.append("<html lang=\"en\">")
-    parts.append("<head>")
-    parts.append(f"  <meta charset=\"utf-8\">")
-    parts.append(f"  <title>{gallery.name}</title>")
-    parts.append("  <style>")
-    parts.append("    body { font-family: Georgia, serif; max-width: 800px; margin: 2rem auto; padding: 0 1rem; }")
-    parts.append("    .work { margin-bottom: 2rem; border-bottom: 1px solid #ddd; padding-bottom: 1rem; }")
-    parts.append("    .medium { color: #666; font-style: italic; }")
-    parts.append("    .tags { color: #888; font-size: 0.9em; }")
-    parts.append("    .featured { border-left: 4px solid #c9a227; padding-left: 1rem; }")
-    parts.append("  </style>")
-    parts.append("</head>")
-    parts.append("<body>")
-    parts.append(f"  <h1>{gallery.name}</h1>")
-    parts.append(f"  <p>{gallery.description}</p>")
+def html_entry(work: Work) -> str:
+    """Return the All Works list item for one work."""
+    return f"    <li><strong>{work.title}</strong> ({work.medium.value}) &mdash; {work.organ}</li>"
+
+
+def _html_lines(
+    gallery: Gallery,
+    featured_fragment: FeaturedFragment = html_featured,
+    entry_fragment: EntryFragment = html_entry,
+) -> Iterator[str]:
+    yield "<!DOCTYPE html>"
+    yield "<html lang=\"en\">"
+    yield "<head>"
+    yield "  <meta charset=\"utf-8\">"
+    yield f"  <title>{gallery.name}</title>"
+    yield "  <style>"
+    yield from HTML_STYLE
+    yield "  </style>"
+    yield "</head>"
+    yield "<body>"
+    yield f"  <h1>{gallery.name}</h1>"
+    yield f"  <p>{gallery.description}</p>"
 
     featured = gallery.featured_works()
     if featured:
-        parts.append("  <h2>Featured Works</h2>")
+        yield "  <h2>Featured Works</h2>"
         for work in featured:
-            parts.append(f"  <div class=\"work featured\">")
-            parts.append(f"    <h3>{work.title}</h3>")
-            parts.append(f"    <p class=\"medium\">{work.medium.value} | {work.organ}</p>")
-            parts.append(f"    <p>{work.description}</p>")
-            if work.tags:
-                parts.append(f"    <p class=\"tags\">Tags: {', '.join(work.tags)}</p>")
-            parts.append(f"  </div>")
-
-    parts.append("  <h2>All Works</h2>")
-    parts.append(f"  <p>Total: {len(gallery.works)} works</p>")
-    parts.append("  <ul>")
+            yield from featured_fragment(work)
+
+    yield "  <h2>All Works</h2>"
+    yield f"  <p>Total: {len(gallery.works)} works</p>"
+    yield "  <ul>"
     for work in gallery.works:
-        parts.append(f"    <li><strong>{work.title}</strong> ({work.medium.value}) &mdash; {work.organ}</li>")
-    parts.append("  </ul>")
-    parts.append("</body>")
-    parts.append("</html>")
-
-    return "\n".join(parts)
-
-
-def render_json(gallery: Gallery) -> str:
-    """Export gallery as JSON for API consumption."""
-    data = {
-        "gallery": {
-            "name": gallery.name,
-            "description": gallery.description,
-            "total_works": len(gallery.works),
-            "featured_count": len(gallery.featured_works()),
-        },
-        "works": [],
+        yield entry_fragment(work)
+    yield "  </ul>"
+    yield "</body>"
+    yield "</html>"
+
+
+def render_html(gallery: Gallery) -> str:
+    """Render a gallery as a simple HTML portfolio page."""
+    return "\n".join(_html_lines(gallery))
+
+
+def write_html(gallery: Gallery, stream: IO, chunk_size: int = CHUNK_SIZE) -> None:
+    """Stream a gallery as an HTML portfolio page to ``stream``."""
+    write_lines(_html_lines(gallery), stream, chunk_size)
+
+
+def work_record(work: Work, related: list[str] | None = None) -> dict:
+    """Return the JSON export record for one work.
+
+    ``related``, when given, lists the slugs of similar works.
+    """
+    work_dict = {
+        "title": work.title,
+        "description": work.description,
+        "medium": work.medium.value,
+        "organ": work.organ,
+        "repo": work.repo,
+        "tags": work.tags,
+        "featured": work.featured,
+        "slug": work.slug,
     }
+    if work.date_created:
+        work_dict["date_created"] = work.date_created.isoformat()
+    if work.url:
+        work_dict["url"] = work.url
+    if related is not None:
+        work_dict["related"] = related
+    return work_dict
+
+
+def indented_json(value: object, indent: str) -> str:
+    """Dump ``value`` with ``indent=2``, nested one level deeper by ``indent``.
+
+    Used to write pieces of a larger ``indent=2`` document one at a time.
+    """
+    return json_module.dumps(value, indent=2).replace("\n", "\n" + indent)
+
+
+def json_entry(work: Work, related: list[str] | None = None) -> str:
+    """Return one work's record as it appears inside the ``works`` array."""
+    return "    " + indented_json(work_record(work, related), "    ")
+
 
+def related_slugs(gallery: Gallery, work: Work, count: int) -> list[str]:
+    """Return the slugs of up to ``count`` works related to ``work``."""
+    return [other.slug for other in gallery.related(work, count)]
+
+
+def related_json_entry(gallery: Gallery, count: int) -> EntryFragment:
+    """Return a JSON entry fragment listing up to ``count`` related works (none for 0)."""
+    if count <= 0:
+        return json_entry
+    return lambda work: json_entry(work, related_slugs(gallery, work, count))
+
+
+def _no_featured(work: Work) -> list[str]:
+    return []
+
+
+def _json_lines(
+    gallery: Gallery,
+    featured_fragment: FeaturedFragment = _no_featured,
+    entry_fragment: EntryFragment = json_entry,
+) -> Iterator[str]:
+    """Yield the JSON export piecewise, byte-identical to ``json.dumps(..., indent=2)``."""
+    header = {
+        "name": gallery.name,
+        "description": gallery.description,
+        "total_works": len(gallery.works),
+        "featured_count": len(gallery.featured_works()),
+    }
+    yield "{"
+    yield f'  "gallery": {indented_json(header, "  ")},'
+    if not gallery.works:
+        yield '  "works": []'
+        yield "}"
+        return
+    yield '  "works": ['
+    pending: str | None = None
     for work in gallery.works:
-        work_dict = {
-            "title": work.title,
-            "description": work.description,
-            "medium": work.medium.value,
-            "organ": work.organ,
-            "repo": work.repo,
-            "tags": work.tags,
-            "featured": work.featured,
-            "slug": work.slug,
-        }
-        if work.date_created:
-            work_dict["date_created"] = work.date_created.isoformat()
-        if work.url:
-            work_dict["url"] = work.url
-        data["works"].append(work_dict)
-
-    return json_module.dumps(data, indent=2)
+        if pending is not None:
+            yield pending + ","
+        pending = entry_fragment(work)
+    yield pending
+    yield "  ]"
+    yield "}"
+
+
+def render_json(gallery: Gallery, related: int = 0) -> str:
+    """Export gallery as JSON for API consumption.
+
+    With ``related``, each record also lists the slugs of up to that many
+    similar works (see ``Gallery.related``).
+    """
+    return "\n".join(_json_lines(gallery, entry_fragment=related_json_entry(gallery, related)))
+
+
+def write_json(
+    gallery: Gallery, stream: IO, chunk_size: int = CHUNK_SIZE, related: int = 0
+) -> None:
+    """Stream the JSON export to ``stream`` without building the full document."""
+    entry_fragment = related_json_entry(gallery, related)
+    write_lines(_json_lines(gallery, entry_fragment=entry_fragment), stream, chunk_size)
+
+
+# format name -> (line generator, featured fragment, entry fragment)
+FORMATS: dict[str, tuple[Callable[..., Iterator[str]], FeaturedFragment, EntryFragment]] = {
+    "markdown": (_markdown_lines, markdown_featured, markdown_entry),
+    "html": (_html_lines, html_featured, html_entry),
+    "json": (_json_lines, _no_featured, json_entry),
+}
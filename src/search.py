@@ -0,0 +1,171 @@
+"""Inverted-index full-text search over gallery works."""
+
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .gallery import Work
+
+
+FIELDS = ("title", "tags", "description")
+FIELD_BOOSTS = (3.0, 2.0, 1.0)
+
+# BM25 saturation and length-normalisation parameters.
+K1 = 1.2
+B = 0.75
+
+# Weight applied to index terms reached by prefix expansion rather than exact match.
+PREFIX_WEIGHT = 0.5
+
+# Positions are stored as ``position * FIELD_STRIDE + field_id``.
+FIELD_STRIDE = 4
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _work_fields(work: Work) -> tuple[list[str], list[str], list[str]]:
+    return (
+        tokenize(work.title),
+        tokenize(" ".join(work.tags)),
+        tokenize(work.description),
+    )
+
+
+def decode_position(encoded: int) -> tuple[str, int]:
+    """Split a stored posting entry into ``(field name, token position)``."""
+    return FIELDS[encoded % FIELD_STRIDE], encoded // FIELD_STRIDE
+
+
+class SearchIndex:
+    """Tokenized inverted index with per-field positions and BM25F ranking.
+
+    Postings map each term to the documents containing it, and for every
+    document to a tuple of encoded ``(field, position)`` entries (see
+    ``decode_position``). Documents are identified by the integer ids the
+    owning gallery assigns.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[int, tuple[int, ...]]] = {}
+        self._doc_lengths: dict[int, tuple[int, int, int]] = {}
+        self._total_lengths = [0, 0, 0]
+        self._sorted_terms: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: int, work: Work) -> None:
+        """Index ``work`` under ``doc_id``."""
+        fields = _work_fields(work)
+        entries: dict[str, list[int]] = {}
+        for field_id, tokens in enumerate(fields):
+            self._total_lengths[field_id] += len(tokens)
+            for position, token in enumerate(tokens):
+                encoded = position * FIELD_STRIDE + field_id
+                positions = entries.get(token)
+                if positions is None:
+                    entries[token] = [encoded]
+                else:
+                    positions.append(encoded)
+        postings = self._postings
+        for token, positions in entries.items():
+            term_postings = postings.get(token)
+            if term_postings is None:
+                term_postings = postings[token] = {}
+                self._sorted_terms = None
+            term_postings[doc_id] = tuple(positions)
+        self._doc_lengths[doc_id] = (len(fields[0]), len(fields[1]), len(fields[2]))
+
+    def remove(self, doc_id: int, work: Work) -> None:
+        """Drop the postings ``work`` contributed under ``doc_id``."""
+        lengths = self._doc_lengths.pop(doc_id, None)
+        if lengths is None:
+            return
+        for field_id, length in enumerate(lengths):
+            self._total_lengths[field_id] -= length
+        for token in set().union(*_work_fields(work)):
+            term_postings = self._postings.get(token)
+            if term_postings is None:
+                continue
+            term_postings.pop(doc_id, None)
+            if not term_postings:
+                del self._postings[token]
+                self._sorted_terms = None
+
+    def expand(self, token: str) -> list[str]:
+        """Return every index term starting with ``token``."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect_left(terms, token)
+        end = start
+        while end < len(terms) and terms[end].startswith(token):
+            end += 1
+        return terms[start:end]
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """Return ``(doc_id, score)`` pairs for documents matching every query term.
+
+        Each query token matches index terms it is a prefix of; exact matches
+        score higher than prefix expansions. Results are ordered by descending
+        score, then by document id.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_lengths:
+            return []
+
+        n_docs = len(self._doc_lengths)
+        # Per-field factor turning a raw field length into B * length / average length.
+        norms = [B * n_docs / total if total else 0.0 for total in self._total_lengths]
+        doc_lengths = self._doc_lengths
+        scores: dict[int, float] | None = None
+        for token in tokens:
+            token_scores: dict[int, float] = {}
+            for term in self.expand(token):
+                weight = 1.0 if term == token else PREFIX_WEIGHT
+                postings = self._postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, positions in postings.items():
+                    if scores is not None and doc_id not in scores:
+                        continue
+                    lengths = doc_lengths.get(doc_id)
+                    if lengths is None:
+                        continue
+                    tf = 0.0
+                    for encoded in positions:
+                        field_id = encoded % FIELD_STRIDE
+                        tf += FIELD_BOOSTS[field_id] / (
+                            1 - B + norms[field_id] * lengths[field_id]
+                        )
+                    token_scores[doc_id] = (
+                        token_scores.get(doc_id, 0.0)
+                        + weight * idf * tf * (K1 + 1) / (tf + K1)
+                    )
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_state(self) -> tuple:
+        """Return the index as plain builtins, suitable for ``marshal``."""
+        return self._postings, self._doc_lengths, tuple(self._total_lengths)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> SearchIndex:
+        index = cls()
+        index._postings, index._doc_lengths, totals = state
+        index._total_lengths = list(totals)
+        return index
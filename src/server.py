@@ -0,0 +1,311 @@
+"""Long-running HTTP query API over an in-memory gallery."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from collections.abc import Callable
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .defaults import DEFAULT_HOST, DEFAULT_PORT, POLL_INTERVAL
+from .facets import FacetQuery
+from .gallery import SEARCH_MODES, Gallery, Medium, Work
+from .renderer import work_record
+
+
+RESPONSE_CACHE_SIZE = 1024
+DEFAULT_LIMIT = 100
+
+_HEADER_LIMIT = 64 * 1024
+_KEEPALIVE_TIMEOUT = 15.0
+
+
+class HttpError(Exception):
+    """An error response with a status code and a JSON message."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _flag(params: dict[str, list[str]], name: str) -> bool | None:
+    if name not in params:
+        return None
+    return params[name][-1].lower() in ("1", "true", "yes")
+
+
+def _int_param(params: dict[str, list[str]], name: str, default: int) -> int:
+    try:
+        value = int(params.get(name, [default])[-1])
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer") from None
+    if value < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"'{name}' must not be negative")
+    return value
+
+
+def _page(works: list[Work], params: dict[str, list[str]]) -> dict:
+    offset = _int_param(params, "offset", 0)
+    limit = _int_param(params, "limit", DEFAULT_LIMIT)
+    return {
+        "total": len(works),
+        "offset": offset,
+        "works": [work_record(w) for w in works[offset:offset + limit]],
+    }
+
+
+class GalleryServer:
+    """Serve JSON queries from a gallery that is reloaded when its source changes.
+
+    ``load`` may return a ``Gallery``, ``GalleryStore`` or ``SnapshotGallery``.
+    Reloads run in a worker thread, which also builds the search and facet
+    indexes, and replace the gallery in a single assignment, so each request
+    sees either the old or the new gallery. Responses that are not cached
+    are built in a worker thread too, keeping the event loop free for other
+    connections. Responses carry an ETag derived from their body and are
+    cached per gallery generation.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        load: Callable[[Path], Gallery],
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+        self.source = source
+        self._load = load
+        self._poll_interval = poll_interval
+        self.gallery = self._prepare(source)
+        self.generation = 0
+        self._source_key = self._stat_key()
+        self._responses: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+
+    def _stat_key(self) -> tuple[int, int] | None:
+        try:
+            stat = self.source.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _prepare(self, source: Path) -> Gallery:
+        """Load the gallery and build the indexes requests rely on.
+
+        Only an in-memory ``Gallery`` has indexes to build up front; a store
+        or snapshot answers from its own, built under its lock on first use.
+        """
+        gallery = self._load(source)
+        if isinstance(gallery, Gallery):
+            gallery.search_index()
+            gallery.facet_index()
+        return gallery
+
+    def _swap(self, gallery: Gallery) -> None:
+        self.gallery = gallery
+        self.generation += 1
+        self._responses.clear()
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the gallery if the source file changed. Return whether it did."""
+        key = self._stat_key()
+        if key is None or key == self._source_key:
+            return False
+        try:
+            gallery = await asyncio.get_running_loop().run_in_executor(
+                None, self._prepare, self.source
+            )
+        except Exception as exc:
+            print(f"Reload of {self.source} failed, keeping previous gallery: {exc}",
+                  file=sys.stderr)
+            self._source_key = key
+            return False
+        self._source_key = key
+        self._swap(gallery)
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            await self.reload_if_changed()
+
+    # -- routing ---------------------------------------------------------
+
+    def route(
+        self, path: str, params: dict[str, list[str]], gallery: Gallery | None = None
+    ) -> object:
+        """Return the JSON-serialisable payload for a GET request against ``gallery``.
+
+        ``gallery`` defaults to the current one.
+        """
+        if gallery is None:
+            gallery = self.gallery
+        if path == "/summary":
+            return {"name": gallery.name, **gallery.stats.as_summary()}
+        if path == "/featured":
+            return _page(gallery.featured_works(), params)
+        if path == "/search":
+            query = params.get("q", [""])[-1]
+            if not query:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "missing 'q' parameter")
+            mode = params.get("mode", ["ranked"])[-1]
+            if mode not in SEARCH_MODES:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f"unknown search mode '{mode}'")
+            return {"query": query, **_page(gallery.search(query, mode=mode), params)}
+        if path == "/works":
+            return _page(self._filter(gallery, params), params)
+        if path.startswith("/works/"):
+            work = gallery.get_by_slug(unquote(path[len("/works/"):]))
+            if work is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, "no such work")
+            return work_record(work)
+        raise HttpError(HTTPStatus.NOT_FOUND, f"unknown endpoint '{path}'")
+
+    def _filter(self, gallery: Gallery, params: dict[str, list[str]]) -> list[Work]:
+        media: tuple[Medium, ...] = ()
+        if "medium" in params:
+            try:
+                media = (Medium(params["medium"][-1]),)
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "unknown medium") from None
+        query = FacetQuery(
+            media=media,
+            organs=tuple(params["organ"][-1:]) if "organ" in params else (),
+            tags=tuple(params["tag"][-1:]) if "tag" in params else (),
+            featured=_flag(params, "featured"),
+        )
+        return gallery.query(query, counts=False).works
+
+    def _render(self, gallery: Gallery, target: str) -> tuple[bytes, str]:
+        parts = urlsplit(target)
+        payload = self.route(parts.path.rstrip("/") or "/", parse_qs(parts.query), gallery)
+        body = json.dumps(payload).encode("utf-8")
+        return body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    async def respond(self, target: str) -> tuple[bytes, str]:
+        """Return ``(body, etag)`` for a request target, using the response cache."""
+        cached = self._responses.get(target)
+        if cached is not None:
+            self._responses.move_to_end(target)
+            return cached
+        generation = self.generation
+        response = await asyncio.get_running_loop().run_in_executor(
+            None, self._render, self.gallery, target
+        )
+        if generation == self.generation:
+            self._responses[target] = response
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+    # -- HTTP ------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), _KEEPALIVE_TIMEOUT
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError,
+                        asyncio.LimitOverrunError, ConnectionError):
+                    return
+                keep_alive = await self._handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _handle_request(
+        self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            self._write(writer, HTTPStatus.BAD_REQUEST, b"", None, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = (connection != "close") if version == "HTTP/1.1" else (connection == "keep-alive")
+        if keep_alive and not await self._discard_body(reader, headers):
+            keep_alive = False
+
+        if method not in ("GET", "HEAD"):
+            body = json.dumps({"error": "method not allowed"}).encode("utf-8")
+            self._write(writer, HTTPStatus.METHOD_NOT_ALLOWED, body, None, keep_alive)
+            return keep_alive
+        try:
+            body, etag = await self.respond(target)
+        except HttpError as exc:
+            body = json.dumps({"error": str(exc)}).encode("utf-8")
+            self._write(writer, exc.status, body, None, keep_alive, head_only=method == "HEAD")
+            return keep_alive
+
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            self._write(writer, HTTPStatus.NOT_MODIFIED, b"", etag, keep_alive)
+        else:
+            self._write(writer, HTTPStatus.OK, body, etag, keep_alive, head_only=method == "HEAD")
+        return keep_alive
+
+    @staticmethod
+    async def _discard_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bool:
+        """Read past a request body so the next request starts where expected.
+
+        Returns ``False`` when that cannot be done safely (a chunked body, or
+        a malformed or oversized length), and the connection must then be
+        closed after the response.
+        """
+        if "transfer-encoding" in headers:
+            return False
+        length = headers.get("content-length", "0")
+        if not length.isdigit() or int(length) > _HEADER_LIMIT:
+            return False
+        try:
+            await asyncio.wait_for(reader.readexactly(int(length)), _KEEPALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return False
+        return True
+
+    @staticmethod
+    def _write(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        body: bytes,
+        etag: str | None,
+        keep_alive: bool,
+        head_only: bool = False,
+    ) -> None:
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body) if status != HTTPStatus.NOT_MODIFIED else 0}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag:
+            headers.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+        if body and not head_only and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(body)
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+        """Bind the listening socket and start watching the source file."""
+        server = await asyncio.start_server(self.handle, host, port, limit=_HEADER_LIMIT)
+        self._watcher = asyncio.create_task(self._watch())
+        return server
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving {self.source} on http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
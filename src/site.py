@@ -0,0 +1,287 @@
+"""Static-site generation: one page per work plus paginated listings."""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from .defaults import PAGE_SIZE, RELATED_COUNT
+from .gallery import Gallery, Medium, Work, unique_slug
+from .pipeline import pool_context
+from .renderer import HTML_STYLE
+
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+_UNSAFE = re.compile(r"[^a-z0-9._-]+")
+
+# Directories whose pages are all written by ``build_site``.
+_PAGE_DIRS = ("works", "medium", "organ")
+
+# Per-process state, set once by ``_init_worker``.
+_gallery: Gallery | None = None
+_page_size = PAGE_SIZE
+_related = RELATED_COUNT
+_templates: dict = {}
+# Distinct path segments for this build's work slugs and (kind, key) listings.
+_work_segments: dict[str, str] = {}
+_listing_segments: dict[tuple[str, str], str] = {}
+
+
+@dataclass
+class SiteStats:
+    """Pages written by a site build."""
+    work_pages: int = 0
+    listing_pages: int = 0
+    removed_pages: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages(self) -> int:
+        return self.work_pages + self.listing_pages + 1
+
+
+def path_segment(value: str) -> str:
+    """Return ``value`` as a single safe, lowercase URL path segment."""
+    segment = _UNSAFE.sub("-", value.lower()).strip("-.")
+    return segment or "unassigned"
+
+
+def unique_segments(values: Iterable[str]) -> dict[str, str]:
+    """Map each distinct value to its own ``path_segment``.
+
+    Sanitising is lossy ("C++" and "C#" both become "c"), so values whose
+    segments repeat are numbered in order the way slugs are: "c", "c-2", ...
+    """
+    taken: set[str] = set()
+    hints: dict[str, int] = {}
+    segments: dict[str, str] = {}
+    for value in values:
+        if value not in segments:
+            segment = segments[value] = unique_slug(path_segment(value), taken, hints)
+            taken.add(segment)
+    return segments
+
+
+def is_http_url(url: str) -> bool:
+    """Whether ``url`` is an absolute http(s) URL, safe to render as a link."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return parts.scheme.lower() in ("http", "https") and bool(parts.netloc)
+
+
+def work_href(work: Work) -> str:
+    """Return the site-relative path of a work's page."""
+    segment = _work_segments.get(work.slug) or path_segment(work.slug)
+    return f"works/{segment}.html"
+
+
+def listing_href(kind: str, key: str, page: int) -> str:
+    """Return the site-relative path of one page of a medium or organ listing."""
+    name = "index.html" if page == 1 else f"page-{page}.html"
+    segment = _listing_segments.get((kind, key)) or path_segment(key)
+    return f"{kind}/{segment}/{name}"
+
+
+def _environment() -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["j2"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+    env.globals.update(
+        style=HTML_STYLE, work_href=work_href, listing_href=listing_href, is_http_url=is_http_url
+    )
+    return env
+
+
+def _init_worker(
+    gallery: Gallery,
+    page_size: int,
+    related: int,
+    work_segments: dict[str, str],
+    listing_segments: dict[tuple[str, str], str],
+) -> None:
+    """Bind the gallery and compile every template once for this process."""
+    global _gallery, _page_size, _related, _work_segments, _listing_segments
+    _gallery = gallery
+    _page_size = page_size
+    _related = related
+    _work_segments = work_segments
+    _listing_segments = listing_segments
+    env = _environment()
+    _templates.update(
+        (name, env.get_template(f"{name}.html.j2")) for name in ("index", "work", "listing")
+    )
+
+
+def _write(output_dir: Path, href: str, html: str) -> None:
+    (output_dir / href).write_text(html, encoding="utf-8")
+
+
+def _listing_works(kind: str, key: str) -> list[Work]:
+    assert _gallery is not None
+    return _gallery.by_medium(Medium(key)) if kind == "medium" else _gallery.by_organ(key)
+
+
+def _render_shard(output_dir: Path, work_range: tuple[int, int], listings: list[tuple[str, str]]) -> SiteStats:
+    """Render a contiguous slice of work pages and a set of whole listings."""
+    assert _gallery is not None
+    stats = SiteStats()
+    work_template = _templates["work"]
+    listing_template = _templates["listing"]
+    context = {"gallery": _gallery, "root": "../"}
+    for work in _gallery.works[work_range[0]:work_range[1]]:
+        related = _gallery.related(work, _related) if _related else []
+        html = work_template.render(context, work=work, related=related)
+        _write(output_dir, work_href(work), html)
+        stats.work_pages += 1
+
+    context["root"] = "../../"
+    for kind, key in listings:
+        works = _listing_works(kind, key)
+        pages = max(1, math.ceil(len(works) / _page_size))
+        label = f"{kind.capitalize()}: {key or 'unassigned'}"
+        for page in range(1, pages + 1):
+            start = (page - 1) * _page_size
+            html = listing_template.render(
+                context,
+                kind=kind,
+                key=key,
+                label=label,
+                works=works[start:start + _page_size],
+                total=len(works),
+                page=page,
+                pages=pages,
+            )
+            _write(output_dir, listing_href(kind, key, page), html)
+            stats.listing_pages += 1
+    return stats
+
+
+def _render_index(output_dir: Path) -> None:
+    assert _gallery is not None
+    stats = _gallery.stats
+    media = [(m.value, stats.by_medium[m.value]) for m in Medium if m.value in stats.by_medium]
+    html = _templates["index"].render(
+        gallery=_gallery,
+        root="",
+        total=len(_gallery.works),
+        featured=_gallery.featured_works(),
+        media=media,
+        organs=sorted(stats.by_organ.items()),
+    )
+    _write(output_dir, "index.html", html)
+
+
+def _page_set(gallery: Gallery, listings: list[tuple[str, str]], page_size: int) -> set[str]:
+    """Return the site-relative path of every page this build writes."""
+    pages = {"index.html"}
+    pages.update(work_href(work) for work in gallery.works)
+    for kind, key in listings:
+        count = len(gallery.by_medium(Medium(key)) if kind == "medium" else gallery.by_organ(key))
+        n_pages = max(1, math.ceil(count / page_size))
+        pages.update(listing_href(kind, key, page) for page in range(1, n_pages + 1))
+    return pages
+
+
+def _remove_stale_pages(output_dir: Path, pages: set[str]) -> int:
+    """Delete pages an earlier build left under ``output_dir``; return how many.
+
+    Only ``.html`` files in the directories ``build_site`` owns are touched,
+    and listing directories left empty are removed.
+    """
+    removed = 0
+    for name in _PAGE_DIRS:
+        root = output_dir / name
+        if not root.is_dir():
+            continue
+        for path in root.rglob("*.html"):
+            if path.relative_to(output_dir).as_posix() not in pages:
+                path.unlink()
+                removed += 1
+        for directory in sorted((p for p in root.rglob("*") if p.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+    return removed
+
+
+def build_site(
+    gallery: Gallery,
+    output_dir: Path,
+    jobs: int | None = None,
+    page_size: int = PAGE_SIZE,
+    related: int = RELATED_COUNT,
+) -> SiteStats:
+    """Write a static site for ``gallery`` under ``output_dir``.
+
+    Work pages are split into contiguous shards and listings are dealt out
+    round-robin, one shard per worker process. Each worker compiles the
+    templates once and receives the gallery through the pool initializer.
+    Each work page links up to ``related`` similar works; 0 leaves them out.
+    Pages left by an earlier build that this one does not write are deleted.
+    """
+    start = time.perf_counter()
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    listings = [("medium", m.value) for m in Medium if gallery.by_medium(m)]
+    organs = list(gallery.stats.by_organ)
+    listings += [("organ", organ) for organ in organs]
+
+    work_segments = unique_segments(work.slug for work in gallery.works)
+    listing_segments = {("medium", m.value): m.value for m in Medium}
+    listing_segments.update(
+        (("organ", organ), segment) for organ, segment in unique_segments(organs).items()
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "works").mkdir(exist_ok=True)
+    for kind, key in listings:
+        (output_dir / kind / listing_segments[kind, key]).mkdir(parents=True, exist_ok=True)
+
+    n_works = len(gallery.works)
+    shards = max(1, min(jobs, n_works or 1))
+    step = math.ceil(n_works / shards) if n_works else 0
+    tasks = [
+        (output_dir, (i * step, min(n_works, (i + 1) * step)), listings[i::shards])
+        for i in range(shards)
+    ]
+
+    if related and n_works:
+        # Build the related-works index once here; forked workers inherit it.
+        gallery.related(gallery.works[0], related)
+    initargs = (gallery, page_size, related, work_segments, listing_segments)
+    _init_worker(*initargs)
+    if shards == 1:
+        results = [_render_shard(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=shards,
+            mp_context=pool_context(),
+            initializer=_init_worker,
+            initargs=initargs,
+        ) as pool:
+            results = list(pool.map(_render_shard, *zip(*tasks)))
+    _render_index(output_dir)
+
+    stats = SiteStats(
+        work_pages=sum(r.work_pages for r in results),
+        listing_pages=sum(r.listing_pages for r in results),
+        removed_pages=_remove_stale_pages(output_dir, _page_set(gallery, listings, page_size)),
+    )
+    stats.seconds = time.perf_counter() - start
+    return stats
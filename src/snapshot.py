@@ -0,0 +1,448 @@
+"""Memory-mapped columnar gallery snapshots.
+
+A snapshot stores a gallery column by column: string tables (an offsets
+array plus one UTF-8 blob) for slugs, titles, descriptions, repos, URLs and
+dates; dictionary-coded organs, media and tags; a featured flag per row;
+precomputed row lists for the featured, per-medium, per-organ and per-tag
+queries; and the rows ordered by slug, for binary-search lookups. Aggregate
+counts are kept in the header.
+
+``open_snapshot`` maps the file and reads nothing else up front: ``summary``
+comes straight from the header, and ``featured_works``, ``by_medium``,
+``by_organ``, ``get_by_slug`` and ``works[i]`` build ``Work`` objects only
+for the rows they return.
+
+Layout: a ``<4sHxxQ`` preamble (magic, format, header length), a JSON
+header padded to 8 bytes, then 8-byte-aligned sections in native byte order.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import sys
+import threading
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from itertools import accumulate
+from pathlib import Path
+from struct import Struct
+
+from .atomic import atomic_write
+from .defaults import RELATED_COUNT
+from .facets import FacetIndex, FacetQuery, FacetResult, members
+from .gallery import SEARCH_MODES, Gallery, GalleryStats, Medium, Work, paused_gc
+from .profiling import count, phase
+
+
+SNAPSHOT_MAGIC = b"SPGS"
+SNAPSHOT_FORMAT = 2
+
+_PREAMBLE = Struct("<4sHxxQ")
+
+_STRING_COLUMNS = ("slug", "title", "description", "repo", "url", "date_created")
+
+
+def _string_table(values: list[str]) -> tuple[list[bytes], bytes]:
+    """Encode one string column; return its UTF-8 values and its offsets array."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("Q", [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    return encoded, offsets.tobytes()
+
+
+class _Codes:
+    """Assigns dense integer codes to values in first-seen order."""
+
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+
+def _grouped(entries: Iterable[tuple[int, int]], n_groups: int) -> tuple[array, array]:
+    """Return ``(offsets, rows)`` listing each group's row ids contiguously, in row order.
+
+    ``entries`` yields ``(row, code)`` pairs in row order.
+    """
+    buckets: list[list[int]] = [[] for _ in range(n_groups)]
+    for row, code in entries:
+        buckets[code].append(row)
+    offsets, rows = array("Q", [0]), array("I")
+    for bucket in buckets:
+        rows.extend(bucket)
+        offsets.append(len(rows))
+    return offsets, rows
+
+
+def write_snapshot(gallery: Gallery, path: Path) -> Path:
+    """Write ``gallery`` (or any object with its read API) as a snapshot at ``path``.
+
+    The write is atomic.
+    """
+    strings: dict[str, list[str]] = {name: [] for name in _STRING_COLUMNS}
+    add_slug, add_title, add_description, add_repo, add_url, add_date = (
+        strings[name].append for name in _STRING_COLUMNS
+    )
+    media = list(Medium)
+    medium_code = {m: i for i, m in enumerate(media)}
+    organ_code, tag_code = _Codes(), _Codes()
+    medium_col, organ_col, featured_col = array("B"), array("I"), array("B")
+    tag_offsets, tag_ids = array("Q", [0]), array("I")
+
+    with phase("snapshot_columns"):
+        for work in gallery.works:
+            add_slug(work.slug)
+            add_title(work.title)
+            add_description(work.description)
+            add_repo(work.repo)
+            add_url(work.url)
+            add_date(work.date_created.isoformat() if work.date_created else "")
+            medium_col.append(medium_code[work.medium])
+            organ_col.append(organ_code(work.organ))
+            featured_col.append(work.featured)
+            tag_ids.extend(tag_code(tag) for tag in work.tags)
+            tag_offsets.append(len(tag_ids))
+
+    organs, tags = list(organ_code.codes), list(tag_code.codes)
+    sections: dict[str, bytes] = {}
+    encoded_slugs: list[bytes] = []
+    for name, values in (*strings.items(), ("organs", organs), ("tags", tags)):
+        encoded, sections[f"{name}.offsets"] = _string_table(values)
+        sections[f"{name}.data"] = b"".join(encoded)
+        if name == "slug":
+            encoded_slugs = encoded
+    del strings
+    sections["medium"] = medium_col.tobytes()
+    sections["organ"] = organ_col.tobytes()
+    sections["featured"] = featured_col.tobytes()
+    sections["tag_offsets"] = tag_offsets.tobytes()
+    sections["tag_ids"] = tag_ids.tobytes()
+    sections["slug_order"] = array(
+        "I", sorted(range(len(encoded_slugs)), key=encoded_slugs.__getitem__)
+    ).tobytes()
+    sections["featured_rows"] = array(
+        "I", (row for row, flag in enumerate(featured_col) if flag)
+    ).tobytes()
+    tag_entries = (
+        (row, tag_id)
+        for row in range(len(medium_col))
+        for tag_id in dict.fromkeys(tag_ids[tag_offsets[row]:tag_offsets[row + 1]])
+    )
+    for name, entries, n_groups in (("medium", enumerate(medium_col), len(media)),
+                                    ("organ", enumerate(organ_col), len(organs)),
+                                    ("tag", tag_entries, len(tags))):
+        offsets, rows = _grouped(entries, n_groups)
+        sections[f"{name}_rows.offsets"] = offsets.tobytes()
+        sections[f"{name}_rows"] = rows.tobytes()
+
+    stats = gallery.stats
+    directory: dict[str, list[int]] = {}
+    position = 0
+    for name, data in sections.items():
+        directory[name] = [position, len(data)]
+        position += len(data) + (-len(data) % 8)
+    header = json.dumps({
+        "name": gallery.name,
+        "description": gallery.description,
+        "count": len(medium_col),
+        "byteorder": sys.byteorder,
+        "media": [m.value for m in media],
+        "stats": {
+            "total": stats.total,
+            "featured": stats.featured,
+            "by_medium": stats.by_medium,
+            "by_organ": stats.by_organ,
+            "by_tag": stats.by_tag,
+        },
+        "sections": directory,
+    }).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % 8)
+
+    with atomic_write(path) as f, phase("snapshot_write"):
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header)))
+        f.write(header)
+        for data in sections.values():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    count("snapshot_works", len(medium_col))
+    return path
+
+
+class _Strings:
+    """Read side of a string table: ``strings[i]`` decodes one value."""
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class SnapshotWorks(Sequence):
+    """Lazy view of a snapshot's works; each access builds fresh ``Work`` objects."""
+
+    def __init__(self, snapshot: SnapshotGallery) -> None:
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.count
+
+    def __getitem__(self, index):
+        n = self._snapshot.count
+        if isinstance(index, slice):
+            return [self._snapshot.work(row) for row in range(*index.indices(n))]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("work index out of range")
+        return self._snapshot.work(index)
+
+    def __iter__(self) -> Iterator[Work]:
+        work = self._snapshot.work
+        return (work(row) for row in range(self._snapshot.count))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, SnapshotWorks)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class SnapshotGallery:
+    """A read-only gallery backed by a memory-mapped snapshot file.
+
+    Offers the read API of ``Gallery``. Ranked search needs the full-text
+    index, so the first search materialises every work into an in-memory
+    ``Gallery`` and delegates to it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._map)
+        magic, fmt, header_len = (
+            _PREAMBLE.unpack_from(buf) if len(buf) >= _PREAMBLE.size else (b"", 0, 0)
+        )
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT:
+            buf.release()
+            self._map.close()
+            raise ValueError(f"{self.path} is not a gallery snapshot (format {SNAPSHOT_FORMAT})")
+        header = json.loads(bytes(buf[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path} was written on a {header['byteorder']}-endian machine")
+        base = _PREAMBLE.size + header_len
+        sections = {
+            name: buf[base + offset:base + offset + length]
+            for name, (offset, length) in header["sections"].items()
+        }
+
+        def strings(name: str) -> _Strings:
+            return _Strings(sections[f"{name}.offsets"].cast("Q"), sections[f"{name}.data"])
+
+        self.name: str = header["name"]
+        self.description: str = header["description"]
+        self.count: int = header["count"]
+        self._header_stats = header["stats"]
+        self._stats: GalleryStats | None = None
+        self._media = [Medium(value) for value in header["media"]]
+        self._columns = {name: strings(name) for name in _STRING_COLUMNS}
+        self._organs = [strings("organs")[i] for i in range(len(strings("organs")))]
+        self._tags = [strings("tags")[i] for i in range(len(strings("tags")))]
+        self._medium = sections["medium"]
+        self._organ = sections["organ"].cast("I")
+        self._featured = sections["featured"]
+        self._tag_offsets = sections["tag_offsets"].cast("Q")
+        self._tag_ids = sections["tag_ids"].cast("I")
+        self._featured_rows = sections["featured_rows"].cast("I")
+        self._slug_order = sections["slug_order"].cast("I")
+        self._groups = {
+            name: (sections[f"{name}_rows.offsets"].cast("Q"), sections[f"{name}_rows"].cast("I"))
+            for name in ("medium", "organ", "tag")
+        }
+        self._gallery: Gallery | None = None
+        self._facet_index: FacetIndex | None = None
+        # Held while the facet index or materialised gallery is built.
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+    def __enter__(self) -> SnapshotGallery:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping; works already built stay valid."""
+        self._columns = {}
+        self._medium = self._organ = self._featured = None
+        self._tag_offsets = self._tag_ids = self._featured_rows = self._slug_order = None
+        self._groups = {}
+        try:
+            self._map.close()
+        except BufferError:
+            # A caller still holds a view into the mapping; it is freed with that view.
+            pass
+
+    def work(self, row: int) -> Work:
+        """Build the ``Work`` stored at ``row``."""
+        columns = self._columns
+        created = columns["date_created"][row]
+        tag_ids = self._tag_ids[self._tag_offsets[row]:self._tag_offsets[row + 1]]
+        tags = self._tags
+        work = Work(
+            title=columns["title"][row],
+            description=columns["description"][row],
+            medium=self._media[self._medium[row]],
+            organ=self._organs[self._organ[row]],
+            repo=columns["repo"][row],
+            date_created=date.fromisoformat(created) if created else None,
+            tags=[tags[i] for i in tag_ids],
+            url=columns["url"][row],
+            featured=bool(self._featured[row]),
+        )
+        work._slug = columns["slug"][row]
+        return work
+
+    def _rows(self, rows: Iterable[int]) -> list[Work]:
+        work = self.work
+        return [work(row) for row in rows]
+
+    @property
+    def works(self) -> SnapshotWorks:
+        return SnapshotWorks(self)
+
+    @property
+    def stats(self) -> GalleryStats:
+        """Aggregate counts, read from the header without touching any rows."""
+        if self._stats is None:
+            stats = self._header_stats
+            self._stats = GalleryStats(
+                total=stats["total"],
+                featured=stats["featured"],
+                by_medium=dict(stats["by_medium"]),
+                by_organ=dict(stats["by_organ"]),
+                by_tag=dict(stats["by_tag"]),
+            )
+        return self._stats
+
+    def featured_works(self) -> list[Work]:
+        return self._rows(self._featured_rows)
+
+    def _group(self, name: str, code: int | None) -> list[Work]:
+        if code is None:
+            return []
+        offsets, rows = self._groups[name]
+        return self._rows(rows[offsets[code]:offsets[code + 1]])
+
+    def by_medium(self, medium: Medium) -> list[Work]:
+        code = self._media.index(medium) if medium in self._media else None
+        return self._group("medium", code)
+
+    def by_organ(self, organ: str) -> list[Work]:
+        code = self._organs.index(organ) if organ in self._organs else None
+        return self._group("organ", code)
+
+    def get_by_slug(self, slug: str) -> Work | None:
+        """Return the work whose slug is ``slug``, or ``None``, by binary search."""
+        key = slug.encode("utf-8")
+        slugs, order = self._columns["slug"], self._slug_order
+        offsets, data = slugs.offsets, slugs.data
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = order[mid]
+            if bytes(data[offsets[row]:offsets[row + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and slugs[order[lo]] == slug:
+            return self.work(order[lo])
+        return None
+
+    def facet_index(self) -> FacetIndex:
+        """Return facet bitmaps built from the stored row lists, without building any works."""
+        if self._facet_index is None:
+            with self._lock:
+                if self._facet_index is None:
+                    self._facet_index = self._build_facet_index()
+        return self._facet_index
+
+    def _build_facet_index(self) -> FacetIndex:
+        groups = {}
+        with phase("facet_index_build"):
+            for name, values in (("medium", [m.value for m in self._media]),
+                                 ("organ", self._organs), ("tag", self._tags)):
+                offsets, rows = self._groups[name]
+                groups[name] = {
+                    value: rows[offsets[code]:offsets[code + 1]]
+                    for code, value in enumerate(values)
+                    if offsets[code + 1] > offsets[code]
+                }
+            return FacetIndex.from_groups(range(self.count), groups, self._featured_rows)
+
+    def query(self, query: FacetQuery, counts: bool = True) -> FacetResult:
+        """Answer a facet query as ``Gallery.query`` does.
+
+        Facet-only queries run on bitmaps of the stored row lists and build
+        only the returned works; a text condition needs the full-text index,
+        so it runs on the materialised gallery.
+        """
+        if query.mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode {query.mode!r}; expected one of {SEARCH_MODES}"
+            )
+        if query.text:
+            return self.to_gallery().query(query, counts)
+        index = self.facet_index()
+        with phase("facet_select"):
+            bits = index.select(query)
+        facets = {}
+        if counts:
+            with phase("facet_counts"):
+                facets = index.counts(bits)
+        return FacetResult(self._rows(members(bits)), facets)
+
+    def to_gallery(self) -> Gallery:
+        """Materialise every work into an in-memory ``Gallery`` (cached)."""
+        if self._gallery is None:
+            with self._lock:
+                if self._gallery is None:
+                    with phase("snapshot_materialize"), paused_gc():
+                        self._gallery = Gallery(self.name, self.description, list(self.works))
+        return self._gallery
+
+    def search(self, query: str, mode: str = "ranked") -> list[Work]:
+        """Search as ``Gallery.search`` does, on a gallery materialised on first use."""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        return self.to_gallery().search(query, mode)
+
+    def related(self, work: Work, count: int = RELATED_COUNT) -> list[Work]:
+        """Return works similar to ``work``, as ``Gallery.related`` does, on the materialised gallery."""
+        gallery = self.to_gallery()
+        stored = gallery.get_by_slug(work.slug)
+        if stored is None or stored != work:
+            raise ValueError(f"Work not in gallery: {work.title!r}")
+        return gallery.related(stored, count)
+
+
+def open_snapshot(path: Path) -> SnapshotGallery:
+    """Map the snapshot at ``path`` for lazy, read-only queries."""
+    return SnapshotGallery(path)
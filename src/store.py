@@ -0,0 +1,659 @@
+"""SQLite-backed gallery store for galleries too large to hold in memory.
+
+``GalleryStore`` answers the same queries as ``Gallery`` from a local
+database file: works live in one table indexed on medium, organ and featured,
+tags are normalised into their own table, and ranked search runs on an FTS5
+index. Works are materialised only for the rows a query returns, and
+``works`` is a lazy sequence that streams rows in insertion order. Each work
+gets a unique slug on insertion, assigned the way ``Gallery`` assigns them.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from .collector import (
+    REGISTRY_DESCRIPTION,
+    REGISTRY_NAME,
+    collect_iter_from_path,
+    collect_iter_from_registry,
+)
+from .defaults import RELATED_COUNT
+from .defaults import STORE_BATCH_SIZE as BATCH_SIZE
+from .facets import FacetQuery, FacetResult, sorted_counts
+from .fuzzy import FuzzyIndex
+from .gallery import SEARCH_MODES, GalleryStats, Medium, Work, slug_base, slugify, unique_slug
+from .profiling import count, phase
+from .related import RelatedIndex
+from .search import FIELD_BOOSTS, tokenize
+
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS works (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    medium TEXT NOT NULL,
+    organ TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    date_created TEXT,
+    url TEXT NOT NULL,
+    featured INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS works_medium ON works (medium);
+CREATE INDEX IF NOT EXISTS works_organ ON works (organ);
+CREATE INDEX IF NOT EXISTS works_featured ON works (featured) WHERE featured;
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS work_tags (
+    work_id INTEGER NOT NULL REFERENCES works (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL REFERENCES tags (id),
+    PRIMARY KEY (work_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS work_tags_tag ON work_tags (tag_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5 (
+    title, tags, description,
+    content = '',
+    tokenize = "unicode61 remove_diacritics 0"
+);
+"""
+
+_WORK_COLUMNS = "id, slug, title, description, medium, organ, repo, date_created, url, featured"
+
+_MEDIA = {m.value: m for m in Medium}
+
+
+class _TakenSlugs:
+    """Slugs already in use: those seen in the current batch, else looked up in the store.
+
+    Only bases that collide ever probe past ``batch``, so a bulk insert of
+    mostly distinct titles costs one ``IN`` query per batch.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.batch: set[str] = set()
+
+    def __contains__(self, slug: object) -> bool:
+        if slug in self.batch:
+            return True
+        return self.conn.execute("SELECT 1 FROM works WHERE slug = ?", (slug,)).fetchone() is not None
+
+
+def _fts_query(query: str) -> str | None:
+    """Translate a free-text query into an FTS5 prefix query with AND semantics."""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class StoredWorks(Sequence):
+    """Read-only, lazily loaded view of every work in a store, in insertion order."""
+
+    def __init__(self, store: GalleryStore) -> None:
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store._scalar("SELECT count(*) FROM works")
+
+    def __iter__(self) -> Iterator[Work]:
+        return self._store._iter_query(f"SELECT {_WORK_COLUMNS} FROM works ORDER BY id")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if stop <= start:
+                return []
+            works = self._store._query(
+                f"SELECT {_WORK_COLUMNS} FROM works ORDER BY id LIMIT ? OFFSET ?",
+                (stop - start, start),
+            )
+            return works[::step]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("work index out of range")
+        return self._store._query(
+            f"SELECT {_WORK_COLUMNS} FROM works ORDER BY id LIMIT 1 OFFSET ?", (index,)
+        )[0]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, StoredWorks)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class GalleryStore:
+    """A gallery persisted in a SQLite database at ``path``.
+
+    Offers the read API of ``Gallery`` (``name``, ``description``, ``works``,
+    ``stats``, ``featured_works``, ``by_medium``, ``by_organ``, ``search``)
+    plus ``add_work``/``add_works``/``remove_work``. Unlike ``Gallery``,
+    ``remove_work`` matches the first stored work equal to its argument,
+    since works read from the store are fresh objects. Connections are
+    opened per process and per thread, so a store may be handed to forked
+    workers and read from several threads; the indexes built on first use
+    are built under a lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+        # (pid, connection) for every connection opened, so ``close`` can reach them all.
+        self._conns: list[tuple[int, sqlite3.Connection]] = []
+        self._lock = threading.RLock()
+        self._stats: GalleryStats | None = None
+        self._slug_hints: dict[str, int] = {}
+        self._fuzzy_index: FuzzyIndex | None = None
+        self._related_index: RelatedIndex | None = None
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+    def __enter__(self) -> GalleryStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        local = self._local
+        if getattr(local, "conn", None) is None or local.pid != os.getpid():
+            # Never reuse a connection inherited across fork.
+            local.conn = self._connect()
+            local.pid = os.getpid()
+        return local.conn
+
+    def _connect(self) -> sqlite3.Connection:
+        # Each connection is only used by the thread that opened it, but ``close``
+        # may run on another thread.
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(_SCHEMA)
+        conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+        conn.commit()
+        version = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()[0]
+        if version != str(SCHEMA_VERSION):
+            conn.close()
+            raise ValueError(
+                f"{self.path} has store schema {version}, expected {SCHEMA_VERSION}; "
+                "re-import it into a new store"
+            )
+        with self._lock:
+            self._conns.append((os.getpid(), conn))
+        return conn
+
+    def close(self) -> None:
+        """Close every connection this process opened, on any thread."""
+        pid = os.getpid()
+        with self._lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for owner, conn in conns:
+            if owner == pid:
+                conn.close()
+
+    # -- metadata --------------------------------------------------------
+
+    def _meta(self, key: str, default: str) -> str:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    @property
+    def name(self) -> str:
+        return self._meta("gallery_name", "Portfolio")
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._set_meta("gallery_name", value)
+
+    @property
+    def description(self) -> str:
+        return self._meta("description", "")
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._set_meta("description", value)
+
+    # -- reading ---------------------------------------------------------
+
+    def _scalar(self, sql: str, params: tuple = ()) -> int:
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def _materialize(self, rows: list[tuple]) -> list[Work]:
+        """Build Works for ``rows`` (in ``_WORK_COLUMNS`` order), fetching their tags in one query."""
+        if not rows:
+            return []
+        tags: dict[int, list[str]] = {}
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            for work_id, name in self.conn.execute(
+                "SELECT work_tags.work_id, tags.name FROM work_tags "
+                "JOIN tags ON tags.id = work_tags.tag_id "
+                f"WHERE work_tags.work_id IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY work_tags.work_id, work_tags.position",
+                chunk,
+            ):
+                tags.setdefault(work_id, []).append(name)
+        works = []
+        for work_id, slug, title, description, medium, organ, repo, created, url, featured in rows:
+            work = Work(
+                title=title,
+                description=description,
+                medium=_MEDIA[medium],
+                organ=organ,
+                repo=repo,
+                date_created=date.fromisoformat(created) if created else None,
+                tags=tags.get(work_id, ()),
+                url=url,
+                featured=bool(featured),
+            )
+            work._slug = slug
+            works.append(work)
+        return works
+
+    def _query(self, sql: str, params: Iterable = ()) -> list[Work]:
+        return self._materialize(self.conn.execute(sql, tuple(params)).fetchall())
+
+    def _iter_query(self, sql: str, params: Iterable = ()) -> Iterator[Work]:
+        cursor = self.conn.execute(sql, tuple(params))
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            yield from self._materialize(rows)
+
+    @property
+    def works(self) -> StoredWorks:
+        return StoredWorks(self)
+
+    @property
+    def stats(self) -> GalleryStats:
+        """Aggregate counts, computed in SQL and cached until the store is modified."""
+        stats = self._stats
+        if stats is None:
+            conn = self.conn
+            by_medium = dict(conn.execute(
+                "SELECT medium, count(*) FROM works GROUP BY medium ORDER BY min(id)"
+            ))
+            stats = self._stats = GalleryStats(
+                total=sum(by_medium.values()),
+                featured=self._scalar("SELECT count(*) FROM works WHERE featured"),
+                by_medium=by_medium,
+                by_organ=dict(conn.execute(
+                    "SELECT organ, count(*) FROM works GROUP BY organ ORDER BY min(id)"
+                )),
+                by_tag=dict(conn.execute(
+                    "SELECT tags.name, count(*) FROM work_tags "
+                    "JOIN tags ON tags.id = work_tags.tag_id "
+                    "GROUP BY work_tags.tag_id ORDER BY min(work_tags.work_id)"
+                )),
+            )
+        return stats
+
+    def featured_works(self) -> list[Work]:
+        return self._query(f"SELECT {_WORK_COLUMNS} FROM works WHERE featured ORDER BY id")
+
+    def by_medium(self, medium: Medium) -> list[Work]:
+        return self._query(
+            f"SELECT {_WORK_COLUMNS} FROM works WHERE medium = ? ORDER BY id", (medium.value,)
+        )
+
+    def get_by_slug(self, slug: str) -> Work | None:
+        """Return the work whose slug is ``slug``, or ``None``."""
+        works = self._query(f"SELECT {_WORK_COLUMNS} FROM works WHERE slug = ?", (slug,))
+        return works[0] if works else None
+
+    def by_organ(self, organ: str) -> list[Work]:
+        return self._query(
+            f"SELECT {_WORK_COLUMNS} FROM works WHERE organ = ? ORDER BY id", (organ,)
+        )
+
+    def search(self, query: str, mode: str = "ranked") -> list[Work]:
+        """Find works matching ``query``, with the semantics of ``Gallery.search``.
+
+        Ranked mode runs an FTS5 prefix query over title, tags and description,
+        ordered by BM25 with the same field weights as the in-memory index.
+        Fuzzy mode builds a ``FuzzyIndex`` from one scan of the table on first
+        use and keeps it until the next write. Substring mode streams the
+        table and filters in Python.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        if mode == "fuzzy" and any(c.isalnum() for c in query):
+            return self._by_ids([work_id for work_id, _ in self._fuzzy().search(query)])
+        match = _fts_query(query) if mode == "ranked" else None
+        if match is not None:
+            weights = ", ".join(str(w) for w in FIELD_BOOSTS)
+            return self._query(
+                f"SELECT {', '.join('works.' + c for c in _WORK_COLUMNS.split(', '))} "
+                "FROM works_fts JOIN works ON works.id = works_fts.rowid "
+                f"WHERE works_fts MATCH ? ORDER BY bm25(works_fts, {weights}), works.id",
+                (match,),
+            )
+        return [work for _, work in self._substring_matches(query)]
+
+    def _substring_matches(self, query: str) -> Iterator[tuple[int, Work]]:
+        q = query.lower()
+        cursor = self.conn.execute(f"SELECT {_WORK_COLUMNS} FROM works ORDER BY id")
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            for row, w in zip(rows, self._materialize(rows)):
+                if (q in w.title.lower()
+                        or q in w.description.lower()
+                        or any(q in tag.lower() for tag in w.tags)):
+                    yield row[0], w
+
+    def _search_ids(self, query: str, mode: str) -> list[int]:
+        """Return the ids of works matching ``query``, in ``search`` order."""
+        if mode == "fuzzy" and any(c.isalnum() for c in query):
+            return [work_id for work_id, _ in self._fuzzy().search(query)]
+        match = _fts_query(query) if mode == "ranked" else None
+        if match is not None:
+            weights = ", ".join(str(w) for w in FIELD_BOOSTS)
+            return [row[0] for row in self.conn.execute(
+                "SELECT rowid FROM works_fts WHERE works_fts MATCH ? "
+                f"ORDER BY bm25(works_fts, {weights}), rowid",
+                (match,),
+            )]
+        return [work_id for work_id, _ in self._substring_matches(query)]
+
+    def query(self, query: FacetQuery, counts: bool = True) -> FacetResult:
+        """Return works matching every condition of ``query``, with the semantics of ``Gallery.query``.
+
+        Facet conditions become a SQL ``WHERE`` clause on the indexed columns;
+        the matching ids go into a temporary table that the facet counts
+        ``GROUP BY`` over, unless ``counts=False``.
+        """
+        if query.mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode {query.mode!r}; expected one of {SEARCH_MODES}"
+            )
+        where: list[str] = []
+        params: list[object] = []
+
+        def any_of(column: str, values: Iterable[str]) -> None:
+            values = list(values)
+            where.append(f"{column} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+
+        tagged = ("id IN (SELECT work_tags.work_id FROM work_tags "
+                  "JOIN tags ON tags.id = work_tags.tag_id WHERE tags.name {})")
+        if query.media:
+            any_of("medium", (m.value for m in query.media))
+        if query.organs:
+            any_of("organ", query.organs)
+        if query.tags:
+            where.append(tagged.format(f"IN ({','.join('?' * len(query.tags))})"))
+            params.extend(query.tags)
+        for tag in query.all_tags:
+            where.append(tagged.format("= ?"))
+            params.append(tag)
+        if query.featured is not None:
+            where.append("featured = ?")
+            params.append(int(query.featured))
+
+        conn = self.conn
+        with phase("facet_select"):
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM works" + (f" WHERE {' AND '.join(where)}" if where else "")
+                + " ORDER BY id",
+                params,
+            )]
+            if query.text:
+                keep = set(ids)
+                ids = [work_id for work_id in self._search_ids(query.text, query.mode)
+                       if work_id in keep]
+        if not counts:
+            return FacetResult(self._by_ids(ids))
+        with phase("facet_counts"), conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS facet_ids (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM facet_ids")
+            conn.executemany("INSERT INTO facet_ids (id) VALUES (?)", ((i,) for i in ids))
+            facets = {
+                facet: sorted_counts(dict(conn.execute(sql)))
+                for facet, sql in (
+                    ("medium", "SELECT medium, count(*) FROM works "
+                               "JOIN facet_ids USING (id) GROUP BY medium"),
+                    ("organ", "SELECT organ, count(*) FROM works "
+                              "JOIN facet_ids USING (id) GROUP BY organ"),
+                    ("tag", "SELECT tags.name, count(DISTINCT work_tags.work_id) FROM work_tags "
+                            "JOIN facet_ids ON facet_ids.id = work_tags.work_id "
+                            "JOIN tags ON tags.id = work_tags.tag_id GROUP BY tags.name"),
+                )
+            }
+            featured = self._scalar(
+                "SELECT coalesce(sum(featured), 0) FROM works JOIN facet_ids USING (id)"
+            )
+        facets["featured"] = {"true": featured, "false": len(ids) - featured}
+        return FacetResult(self._by_ids(ids), facets)
+
+    def _scan_into(self, index: FuzzyIndex | RelatedIndex) -> None:
+        cursor = self.conn.execute(f"SELECT {_WORK_COLUMNS} FROM works ORDER BY id")
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            for row, work in zip(rows, self._materialize(rows)):
+                index.add(row[0], work)
+
+    def _fuzzy(self) -> FuzzyIndex:
+        index = self._fuzzy_index
+        if index is None:
+            with self._lock:
+                index = self._fuzzy_index
+                if index is None:
+                    index = FuzzyIndex()
+                    with phase("fuzzy_index_build"):
+                        self._scan_into(index)
+                    self._fuzzy_index = index
+        return index
+
+    def _related(self) -> RelatedIndex:
+        index = self._related_index
+        if index is None:
+            with self._lock:
+                index = self._related_index
+                if index is None:
+                    index = RelatedIndex()
+                    with phase("related_index_build"):
+                        self._scan_into(index)
+                    self._related_index = index
+        return index
+
+    def related(self, work: Work, count: int = RELATED_COUNT) -> list[Work]:
+        """Return works similar to ``work``, with the semantics of ``Gallery.related``.
+
+        The index is built from one scan of the table on first use and kept
+        until the next write.
+        """
+        row = self.conn.execute("SELECT id FROM works WHERE slug = ?", (work.slug,)).fetchone()
+        if row is None or self.get_by_slug(work.slug) != work:
+            raise ValueError(f"Work not in gallery: {work.title!r}")
+        return self._by_ids([work_id for work_id, _ in self._related().related(row[0], count)])
+
+    def _by_ids(self, ids: list[int]) -> list[Work]:
+        """Return the works with ``ids``, in that order."""
+        found: dict[int, Work] = {}
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            rows = self.conn.execute(
+                f"SELECT {_WORK_COLUMNS} FROM works WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            found.update(zip((row[0] for row in rows), self._materialize(rows)))
+        return [found[work_id] for work_id in ids if work_id in found]
+
+    # -- writing ---------------------------------------------------------
+
+    def _tag_ids(self, names: Iterable[str]) -> dict[str, int]:
+        conn = self.conn
+        names = list(dict.fromkeys(names))
+        conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", ((n,) for n in names))
+        ids: dict[str, int] = {}
+        for start in range(0, len(names), 900):
+            chunk = names[start:start + 900]
+            ids.update(conn.execute(
+                f"SELECT name, id FROM tags WHERE name IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return ids
+
+    def _slugs(self, works: list[Work]) -> list[str]:
+        """Assign unique slugs to ``works``, avoiding stored slugs and each other."""
+        bases = [slugify(w.title) for w in works]
+        taken = _TakenSlugs(self.conn)
+        unique = sorted(set(bases))
+        for start in range(0, len(unique), 900):
+            chunk = unique[start:start + 900]
+            taken.batch.update(row[0] for row in self.conn.execute(
+                f"SELECT slug FROM works WHERE slug IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        slugs = []
+        for base in bases:
+            slug = unique_slug(base, taken, self._slug_hints)
+            taken.batch.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    def _insert_batch(self, works: list[Work]) -> None:
+        conn = self.conn
+        next_id = self._scalar("SELECT coalesce(max(id), 0) + 1 FROM works")
+        ids = range(next_id, next_id + len(works))
+        slugs = self._slugs(works)
+        for w, slug in zip(works, slugs):
+            w._slug = slug
+        conn.executemany(
+            f"INSERT INTO works ({_WORK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (work_id, slug, w.title, w.description, w.medium.value, w.organ, w.repo,
+                 w.date_created.isoformat() if w.date_created else None, w.url, int(w.featured))
+                for work_id, slug, w in zip(ids, slugs, works)
+            ),
+        )
+        tag_ids = self._tag_ids(tag for w in works for tag in w.tags)
+        conn.executemany(
+            "INSERT INTO work_tags (work_id, position, tag_id) VALUES (?, ?, ?)",
+            (
+                (work_id, position, tag_ids[tag])
+                for work_id, w in zip(ids, works)
+                for position, tag in enumerate(w.tags)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO works_fts (rowid, title, tags, description) VALUES (?, ?, ?, ?)",
+            (
+                (work_id, w.title, " ".join(w.tags), w.description)
+                for work_id, w in zip(ids, works)
+            ),
+        )
+
+    def add_works(self, works: Iterable[Work], batch_size: int = BATCH_SIZE) -> int:
+        """Insert ``works``, committing one transaction per ``batch_size`` works.
+
+        Returns the number of works added. ``works`` may be a lazy iterator;
+        only one batch is held in memory at a time.
+        """
+        added = 0
+        iterator = iter(works)
+        with phase("store_insert"):
+            while batch := list(islice(iterator, batch_size)):
+                with self.conn:
+                    self._insert_batch(batch)
+                added += len(batch)
+        self._stats = None
+        self._fuzzy_index = None
+        self._related_index = None
+        count("works", added)
+        return added
+
+    def add_work(self, work: Work) -> None:
+        self.add_works([work])
+
+    def remove_work(self, work: Work) -> None:
+        """Delete the first stored work equal to ``work``."""
+        candidates = self.conn.execute(
+            f"SELECT {_WORK_COLUMNS} FROM works WHERE repo = ? AND title = ? ORDER BY id",
+            (work.repo, work.title),
+        ).fetchall()
+        for row, stored in zip(candidates, self._materialize(candidates)):
+            if stored == work:
+                work_id = row[0]
+                break
+        else:
+            raise ValueError(f"Work not in gallery: {work.title!r}")
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO works_fts (works_fts, rowid, title, tags, description) "
+                "VALUES ('delete', ?, ?, ?, ?)",
+                (work_id, stored.title, " ".join(stored.tags), stored.description),
+            )
+            self.conn.execute("DELETE FROM works WHERE id = ?", (work_id,))
+        self._stats = None
+        self._fuzzy_index = None
+        self._related_index = None
+        self._slug_hints.pop(slug_base(stored.slug), None)
+
+
+def import_works_file(
+    store: GalleryStore, path: Path, batch_size: int = BATCH_SIZE, validate: bool = False
+) -> int:
+    """Stream a works.json or JSON Lines file into ``store``; return the number of works added.
+
+    The gallery name and description are taken from the file. With
+    ``validate=True`` the whole file is checked first, and nothing is
+    imported if ``validation.InvalidRecordsError`` is raised.
+    """
+    if validate:
+        from .validation import ensure_valid_path
+
+        ensure_valid_path(path, "works")
+    meta: dict = {}
+    added = store.add_works(collect_iter_from_path(path, meta), batch_size)
+    store.name = meta.get("gallery_name", "Portfolio")
+    store.description = meta.get("description", "")
+    return added
+
+
+def import_registry(
+    store: GalleryStore, path: Path, batch_size: int = BATCH_SIZE, validate: bool = False
+) -> int:
+    """Stream a registry-v2.json file into ``store``; return the number of works added.
+
+    ``validate`` checks every repository first, as in ``import_works_file``.
+    """
+    if validate:
+        from .validation import ensure_valid_path
+
+        ensure_valid_path(path, "registry")
+    added = store.add_works(collect_iter_from_registry(path), batch_size)
+    store.name = REGISTRY_NAME
+    store.description = REGISTRY_DESCRIPTION
+    return added
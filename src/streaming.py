@@ -0,0 +1,171 @@
+"""Incremental JSON reading for documents too large to load at once."""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_STRUCTURAL = re.compile(r'["\\\[\]{}]')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered cursor over a text stream that decodes one JSON value at a time."""
+
+    def __init__(self, fp: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, discarding consumed input. Return False at EOF."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, found {char!r}")
+        self._pos += 1
+        return char
+
+    def decode(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """Consume the next JSON value without building it."""
+        if self.peek() not in "[{":
+            self.decode()
+            return
+        depth = 0
+        in_string = False
+        pos = self._pos
+        while True:
+            match = _STRUCTURAL.search(self._buf, pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON stream")
+                pos = self._pos
+                continue
+            char = match.group()
+            pos = match.end()
+            if char == "\\":
+                if pos == len(self._buf):
+                    # The escaped character is in the next chunk; rescan from the backslash.
+                    self._pos = match.start()
+                    if not self._fill():
+                        raise ValueError("Unexpected end of JSON stream")
+                    pos = self._pos
+                    continue
+                # Whatever follows a backslash is escaped, even a quote or another backslash.
+                pos += 1
+            elif char == '"':
+                in_string = not in_string
+            elif in_string:
+                continue
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    self._pos = pos
+                    return
+
+
+def iter_array_items(
+    fp: TextIO,
+    keys: tuple[str, ...],
+    meta: dict[str, Any] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Any]:
+    """Yield the elements of a top-level array member one at a time.
+
+    ``fp`` must hold a JSON object. Of the members named in ``keys`` whose
+    value is an array, the one listed first is streamed element by element;
+    every other member is skipped without being materialized, except that
+    scalar members are recorded in ``meta`` when it is given. Memory use is
+    bounded by the largest single element rather than by the document.
+
+    When a lower-priority key's array comes first in the document, it is
+    skipped; if no better key follows, ``fp`` is rewound and read again for
+    that key, so ``fp`` must be seekable when ``keys`` names several members.
+    """
+    reader = _Reader(fp, chunk_size)
+    reader.expect("{")
+    streamed = False
+    fallback: str | None = None
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise ValueError("JSON object keys must be strings")
+        reader.expect(":")
+        char = reader.peek()
+        if key in keys and key != keys[0] and char == "[" and not streamed:
+            # A better key may still follow; remember this one in case none does.
+            if fallback is None or keys.index(key) < keys.index(fallback):
+                fallback = key
+            reader.skip()
+        elif key == keys[0] and char == "[" and not streamed:
+            streamed = True
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    yield reader.decode()
+                    if reader.expect(",]") == "]":
+                        break
+            else:
+                reader.expect("]")
+        elif char in "[{":
+            reader.skip()
+        else:
+            value = reader.decode()
+            if meta is not None:
+                meta[key] = value
+        if reader.expect(",}") == "}":
+            break
+    if fallback is not None and not streamed:
+        fp.seek(0)
+        yield from iter_array_items(fp, (fallback,), None, chunk_size)
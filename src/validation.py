@@ -0,0 +1,316 @@
+"""Batch validation of works files and registries against pydantic models.
+
+Records are checked by compiled ``TypeAdapter``s over ``TypedDict`` schemas,
+so pydantic-core validates them without building a model object per record.
+Every failure is reported with the index of its record rather than stopping
+at the first. Records are validated a list at a time, in ``CHUNK_SIZE``
+chunks across worker processes once an input passes ``PARALLEL_THRESHOLD``
+records. Files are streamed into those chunks, so memory stays bounded by
+the chunks in flight rather than the file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import StrictBool, StrictStr, TypeAdapter, ValidationError
+# pydantic needs typing_extensions' TypedDict before Python 3.12; it is a pydantic dependency.
+from typing_extensions import NotRequired, TypedDict
+
+from .collector import REGISTRY_REPO_KEYS, is_ndjson
+from .gallery import Medium, paused_gc
+from .pipeline import pool_context
+from .profiling import count, phase
+from .streaming import iter_array_items
+
+
+class WorkRecord(TypedDict):
+    """One entry of a works.json ``works`` array or a JSON Lines works file."""
+    title: StrictStr
+    description: NotRequired[StrictStr]
+    medium: NotRequired[Medium]
+    organ: NotRequired[StrictStr]
+    repo: NotRequired[StrictStr]
+    tags: NotRequired[list[StrictStr]]
+    featured: NotRequired[StrictBool]
+
+
+class RegistryRecord(TypedDict):
+    """One repository of a registry-v2.json file."""
+    name: StrictStr
+    description: NotRequired[StrictStr]
+    org: NotRequired[StrictStr]
+    topics: NotRequired[list[StrictStr]]
+    portfolio_relevance: NotRequired[StrictStr]
+
+
+class HeaderRecord(TypedDict):
+    """The header line of a JSON Lines works file."""
+    gallery_name: NotRequired[StrictStr]
+    description: NotRequired[StrictStr]
+
+
+RECORD_KINDS = ("works", "registry")
+
+_ADAPTERS: dict[str, TypeAdapter] = {
+    "works": TypeAdapter(list[WorkRecord]),
+    "registry": TypeAdapter(list[RegistryRecord]),
+}
+
+_HEADER_ADAPTER = TypeAdapter(HeaderRecord)
+
+# Records per worker task, and the input size below which one process is faster.
+CHUNK_SIZE = 20_000
+PARALLEL_THRESHOLD = 100_000
+
+# Per-process records to validate, set by ``_set_worker_records``.
+_worker_records: Sequence | None = None
+
+
+@dataclass(frozen=True)
+class RecordError:
+    """One validation failure: the record's index, the field path within it, and why.
+
+    In a JSON Lines file ``line`` is the 1-based line the record is on, and
+    errors in the header line have no record index.
+    """
+    index: int | None
+    field: str
+    message: str
+    line: int | None = None
+
+    def __str__(self) -> str:
+        where = "header" if self.index is None else f"record {self.index}"
+        if self.line is not None:
+            where += f" (line {self.line})"
+        if self.field:
+            where += f", {self.field}"
+        return f"{where}: {self.message}"
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating one input: how many records were checked and what failed."""
+    source: str
+    kind: str
+    records: int = 0
+    errors: list[RecordError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def invalid_records(self) -> int:
+        return len({error.index for error in self.errors if error.index is not None})
+
+
+class InvalidRecordsError(ValueError):
+    """Raised by validated ingestion when any record fails; carries every error."""
+
+    # Errors spelled out in the exception message; the rest are only counted.
+    SHOWN = 5
+
+    def __init__(self, report: ValidationReport) -> None:
+        self.report = report
+        lines = [
+            f"{report.source}: {len(report.errors)} error(s) in "
+            f"{report.invalid_records} of {report.records} {report.kind} record(s)"
+        ]
+        lines.extend(f"  {error}" for error in report.errors[:self.SHOWN])
+        if len(report.errors) > self.SHOWN:
+            lines.append(f"  ... and {len(report.errors) - self.SHOWN} more")
+        super().__init__("\n".join(lines))
+
+
+def _adapter(kind: str) -> TypeAdapter:
+    try:
+        return _ADAPTERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown record kind {kind!r}; expected one of {RECORD_KINDS}") from None
+
+
+def _validate_chunk(
+    records: Sequence, kind: str, start: int, lines: Sequence[int | None] | None = None
+) -> list[RecordError]:
+    """Validate ``records``, the chunk starting at record ``start`` on ``lines`` if known."""
+    try:
+        _adapter(kind).validate_python(records)
+    except ValidationError as exc:
+        errors = []
+        for error in exc.errors(include_url=False, include_input=False):
+            offset, *loc = error["loc"]
+            errors.append(RecordError(
+                start + offset,
+                ".".join(str(part) for part in loc),
+                error["msg"],
+                lines[offset] if lines else None,
+            ))
+        return errors
+    return []
+
+
+def _set_worker_records(records: Sequence) -> None:
+    global _worker_records
+    _worker_records = records
+
+
+def _validate_in_worker(kind: str, start: int, stop: int) -> list[RecordError]:
+    assert _worker_records is not None
+    return _validate_chunk(_worker_records[start:stop], kind, start)
+
+
+def validate_records(
+    records: Sequence, kind: str = "works", jobs: int | None = None
+) -> list[RecordError]:
+    """Validate every record of ``kind``; return all failures ordered by record index.
+
+    Inputs of at least ``PARALLEL_THRESHOLD`` records are split into
+    ``CHUNK_SIZE`` chunks validated by up to ``jobs`` worker processes
+    (default: CPU count), which inherit ``records`` when forked.
+    """
+    _adapter(kind)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    # Validation builds a copy of every record; skip GC passes over them.
+    with phase("validate"), paused_gc():
+        if jobs <= 1 or len(records) < PARALLEL_THRESHOLD:
+            errors = _validate_chunk(records, kind, 0)
+        else:
+            starts = range(0, len(records), CHUNK_SIZE)
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(starts)),
+                mp_context=pool_context(),
+                initializer=_set_worker_records,
+                initargs=(records,),
+            ) as pool:
+                futures = [
+                    pool.submit(_validate_in_worker, kind, start, start + CHUNK_SIZE)
+                    for start in starts
+                ]
+                errors = [error for future in futures for error in future.result()]
+    count("records", len(records))
+    return errors
+
+
+def iter_records(path: Path, kind: str = "works") -> Iterator[tuple[int | None, object]]:
+    """Stream the raw records of a works file (either format) or, for ``registry``, a registry.
+
+    Yields ``(line, record)``, where ``line`` is the record's 1-based line
+    in a JSON Lines file and ``None`` otherwise. A JSON Lines header is not
+    yielded; see ``validate_path``.
+    """
+    _adapter(kind)
+    if kind == "works" and is_ndjson(path):
+        with open(path, "rb") as f:
+            f.readline()
+            for line_number, line in enumerate(f, 2):
+                if line.strip():
+                    yield line_number, _decode_line(line, path, line_number)
+        return
+    keys = ("works",) if kind == "works" else REGISTRY_REPO_KEYS
+    meta: dict = {}
+    with open(path, encoding="utf-8") as f:
+        try:
+            for record in iter_array_items(f, keys, meta=meta):
+                yield None, record
+        except ValueError as exc:
+            raise ValueError(f"{path}: {exc}") from None
+    if any(key in meta for key in keys):
+        raise ValueError(f"{path}: '{keys[0]}' must be an array")
+
+
+def _decode_line(line: bytes, path: Path, line_number: int) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        raise ValueError(f"{path}: invalid JSON on line {line_number}: {exc}") from None
+
+
+def _validate_header(path: Path) -> list[RecordError]:
+    with open(path, "rb") as f:
+        header = _decode_line(f.readline(), path, 1)
+    if not isinstance(header, dict):
+        raise ValueError(f"{path}: header line must be a JSON object")
+    try:
+        _HEADER_ADAPTER.validate_python(header)
+    except ValidationError as exc:
+        return [
+            RecordError(None, ".".join(str(part) for part in error["loc"]), error["msg"], 1)
+            for error in exc.errors(include_url=False, include_input=False)
+        ]
+    return []
+
+
+def _iter_chunks(path: Path, kind: str) -> Iterator[tuple[list, list[int | None]]]:
+    """Group the records streamed from ``path`` into ``CHUNK_SIZE`` lists, with their lines."""
+    records: list = []
+    lines: list[int | None] = []
+    for line, record in iter_records(path, kind):
+        records.append(record)
+        lines.append(line)
+        if len(records) == CHUNK_SIZE:
+            yield records, lines
+            records, lines = [], []
+    if records:
+        yield records, lines
+
+
+def validate_path(path: Path, kind: str = "works", jobs: int | None = None) -> ValidationReport:
+    """Validate every record of the file at ``path``, collecting all failures.
+
+    The file is streamed in ``CHUNK_SIZE`` chunks. The first
+    ``PARALLEL_THRESHOLD`` records are validated in this process; later
+    chunks go to up to ``jobs`` worker processes (default: CPU count), at
+    most two per worker in flight. A JSON Lines header is checked against
+    ``HeaderRecord``.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    report = ValidationReport(str(path), kind)
+    if kind == "works" and is_ndjson(path):
+        report.errors.extend(_validate_header(path))
+    pool: ProcessPoolExecutor | None = None
+    pending: deque[Future] = deque()
+    try:
+        with phase("validate"), paused_gc():
+            for records, lines in _iter_chunks(path, kind):
+                start = report.records
+                report.records += len(records)
+                if pool is None and jobs > 1 and start >= PARALLEL_THRESHOLD:
+                    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=pool_context())
+                if pool is None:
+                    report.errors.extend(_validate_chunk(records, kind, start, lines))
+                    continue
+                if len(pending) >= 2 * jobs:
+                    report.errors.extend(pending.popleft().result())
+                pending.append(pool.submit(_validate_chunk, records, kind, start, lines))
+            while pending:
+                report.errors.extend(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    count("records", report.records)
+    return report
+
+
+def ensure_valid(
+    records: Sequence, kind: str = "works", source: str = "<records>", jobs: int | None = None
+) -> None:
+    """Raise ``InvalidRecordsError`` listing every failure if any record is invalid."""
+    report = ValidationReport(source, kind, len(records), validate_records(records, kind, jobs))
+    if not report.ok:
+        raise InvalidRecordsError(report)
+
+
+def ensure_valid_path(path: Path, kind: str = "works", jobs: int | None = None) -> None:
+    """Raise ``InvalidRecordsError`` if any record of the file at ``path`` is invalid."""
+    report = validate_path(path, kind, jobs)
+    if not report.ok:
+        raise InvalidRecordsError(report)
@@ -0,0 +1,49 @@
+"""Tests for the synthetic benchmark data and the regression comparison."""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.suite import compare, parse_size
+from benchmarks.synthetic import write_registry, write_works_file
+from src.collector import collect_from_registry, collect_from_works_file
+
+
+class TestSynthetic:
+    def test_deterministic(self):
+        with tempfile.TemporaryDirectory() as d:
+            a = write_works_file(Path(d) / "a.json", 50, seed=3)
+            b = write_works_file(Path(d) / "b.json", 50, seed=3)
+            c = write_works_file(Path(d) / "c.json", 50, seed=4)
+            assert a.read_bytes() == b.read_bytes()
+            assert a.read_bytes() != c.read_bytes()
+
+    def test_files_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            works = collect_from_works_file(write_works_file(Path(d) / "w.json", 200))
+            registry = collect_from_registry(write_registry(Path(d) / "r.json", 200), stream=True)
+            assert len(works.works) == len(registry.works) == 200
+            assert len({w.repo for w in works.works}) == 200
+            assert works.stats.by_tag
+            assert registry.featured_works()
+
+
+class TestSuite:
+    def test_parse_size(self):
+        assert parse_size("1000") == 1000
+        assert parse_size("100k") == 100_000
+        assert parse_size("1M") == 1_000_000
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"1000": {
+            "collect": {"seconds": 1.0, "peak_bytes": 100},
+            "tiny": {"seconds": 0.001, "peak_bytes": None},
+        }}}
+        current = {"results": {"1000": {
+            "collect": {"seconds": 1.5, "peak_bytes": 110},
+            "tiny": {"seconds": 0.01, "peak_bytes": None},
+            "new": {"seconds": 9.0, "peak_bytes": None},
+        }}}
+        regressions = compare(current, baseline, threshold=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("1000 collect:")
+        assert compare(current, baseline, threshold=0.6) == []
@@ -0,0 +1,187 @@
+"""Tests for the parsed-gallery cache."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from src.cache import _read_header, cache_path_for, clear_cache, load_gallery, read_cache
+from src.collector import (
+    append_work,
+    collect_from_ndjson,
+    collect_from_works_file,
+    extend_from_ndjson,
+)
+from src.gallery import Medium, Work
+
+
+def _write_works(directory: Path, titles: list[str]) -> Path:
+    path = directory / "works.json"
+    data = {
+        "gallery_name": "Cached",
+        "description": "",
+        "works": [{"title": t, "featured": True} for t in titles],
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+class _CountingBuilder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path, data=None):
+        self.calls += 1
+        return collect_from_works_file(path, data=data)
+
+
+class TestLoadGallery:
+    def test_second_load_hits_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A", "B"])
+            build = _CountingBuilder()
+            first = load_gallery(path, build)
+            second = load_gallery(path, build)
+            assert build.calls == 1
+            assert cache_path_for(path).exists()
+            assert [w.title for w in second.works] == ["A", "B"]
+            assert second.works == first.works
+
+    def test_indexes_survive_round_trip(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["Alpha Engine", "Beta"])
+            load_gallery(path, collect_from_works_file)
+            cached = read_cache(path)
+            assert cached is not None
+            assert cached._search_index_loader is None
+            assert [w.title for w in cached.search("engine")] == ["Alpha Engine"]
+            assert len(cached.featured_works()) == 2
+            # The first search added its index to the entry for later loads.
+            cached = read_cache(path)
+            assert cached._search_index_loader is not None
+            assert [w.title for w in cached.search("engine")] == ["Alpha Engine"]
+
+    def test_miss_does_not_build_search_index(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["Alpha Engine", "Beta"])
+            gallery = load_gallery(path, collect_from_works_file)
+            assert gallery._search_index is None
+            header, _ = _read_header(cache_path_for(path))
+            assert header["index_length"] == 0
+            assert header["size"] == path.stat().st_size
+            assert header["works"] == 2
+
+    def test_index_not_cached_after_works_change(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["Alpha Engine", "Beta"])
+            gallery = load_gallery(path, collect_from_works_file)
+            gallery.add_work(Work("Gamma", "", Medium.SOFTWARE, "", ""))
+            gallery.search("engine")
+            header, _ = _read_header(cache_path_for(path))
+            assert header["index_length"] == 0
+
+    def test_content_change_invalidates(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            build = _CountingBuilder()
+            load_gallery(path, build)
+            _write_works(Path(d), ["A", "B", "C"])
+            gallery = load_gallery(path, build)
+            assert build.calls == 2
+            assert len(gallery.works) == 3
+
+    def test_same_size_edit_detected_by_hash(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            load_gallery(path, collect_from_works_file)
+            stat = path.stat()
+            _write_works(Path(d), ["B"])
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            assert read_cache(path) is None
+
+    def test_touch_without_change_stays_valid(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            load_gallery(path, collect_from_works_file)
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            cached = read_cache(path)
+            assert cached is not None
+            assert cached.works[0].title == "A"
+
+    def test_no_cache_bypasses(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            build = _CountingBuilder()
+            load_gallery(path, build, use_cache=False)
+            load_gallery(path, build, use_cache=False)
+            assert build.calls == 2
+            assert not cache_path_for(path).exists()
+
+    def test_corrupt_cache_ignored(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            cache_path_for(path).write_bytes(b"SPGC garbage")
+            assert read_cache(path) is None
+            gallery = load_gallery(path, collect_from_works_file)
+            assert gallery.works[0].title == "A"
+
+    def test_clear_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(Path(d), ["A"])
+            load_gallery(path, collect_from_works_file)
+            assert clear_cache(path) is True
+            assert clear_cache(path) is False
+            assert not cache_path_for(path).exists()
+
+
+class TestNdjsonTail:
+    def _setup(self, directory: Path) -> Path:
+        path = directory / "works.jsonl"
+        append_work(path, {"title": "Alpha"}, header={"gallery_name": "Tail"})
+        append_work(path, {"title": "Beta", "featured": True})
+        return path
+
+    def test_appended_lines_extend_cached_gallery(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = self._setup(Path(d))
+            builds = []
+
+            def build(p, data=None):
+                builds.append(p)
+                return collect_from_ndjson(p, data=data)
+
+            load_gallery(path, build, extend=extend_from_ndjson)
+            append_work(path, {"title": "Gamma ray"})
+            gallery = load_gallery(path, build, extend=extend_from_ndjson)
+            assert len(builds) == 1
+            assert [w.title for w in gallery.works] == ["Alpha", "Beta", "Gamma ray"]
+            assert [w.title for w in gallery.search("gamma")] == ["Gamma ray"]
+            assert gallery == collect_from_ndjson(path)
+            # The extended gallery was re-cached and is now a plain hit.
+            again = load_gallery(path, build, extend=extend_from_ndjson)
+            assert len(builds) == 1
+            assert [w.title for w in again.search("gamma")] == ["Gamma ray"]
+
+    def test_rewritten_prefix_forces_rebuild(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = self._setup(Path(d))
+            builds = []
+
+            def build(p, data=None):
+                builds.append(p)
+                return collect_from_ndjson(p, data=data)
+
+            load_gallery(path, build, extend=extend_from_ndjson)
+            path.write_text(path.read_text(encoding="utf-8").replace("Alpha", "Omega")
+                            + '{"title": "Delta"}\n', encoding="utf-8")
+            gallery = load_gallery(path, build, extend=extend_from_ndjson)
+            assert len(builds) == 2
+            assert [w.title for w in gallery.works] == ["Omega", "Beta", "Delta"]
+
+    def test_growth_without_extend_rebuilds(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = self._setup(Path(d))
+            load_gallery(path, collect_from_ndjson)
+            append_work(path, {"title": "Gamma"})
+            assert read_cache(path) is None
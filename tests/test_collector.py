@@ -4,7 +4,19 @@ import json
 import tempfile
 from pathlib import Path
 
-from src.collector import collect_from_registry, collect_from_works_file
+import pytest
+
+from src.collector import (
+    append_work,
+    collect_from_ndjson,
+    collect_from_path,
+    collect_from_registry,
+    collect_from_works_file,
+    collect_iter_from_ndjson,
+    collect_iter_from_registry,
+    collect_iter_from_works_file,
+    extend_from_ndjson,
+)
 
 
 class TestCollectFromWorksFile:
@@ -239,3 +251,132 @@ class TestCollectFromRegistry:
 
         gallery = collect_from_registry(path)
         assert gallery.works[0].medium.value == "software"
+
+
+class TestStreamingRegistry:
+    def _write(self, registry) -> Path:
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump(registry, f)
+            return Path(f.name)
+
+    def test_iter_yields_works(self):
+        path = self._write({
+            "version": 2,
+            "organs": {"ignored": ["a", "b"]},
+            "repositories": [
+                {"name": "one", "org": "organvm-v-logos", "portfolio_relevance": "HIGH"},
+                {"name": "two", "topics": ["x"]},
+            ],
+        })
+        works = list(collect_iter_from_registry(path))
+        assert [w.title for w in works] == ["one", "two"]
+        assert works[0].medium.value == "literary"
+        assert works[0].featured is True
+        assert works[1].tags == ["x"]
+
+    def test_stream_mode_matches_eager(self):
+        path = self._write({
+            "repos": [
+                {"name": f"repo-{i}", "org": "organvm-vi-koinonia", "description": "d" * i}
+                for i in range(50)
+            ],
+        })
+        eager = collect_from_registry(path)
+        streamed = collect_from_registry(path, stream=True)
+        assert streamed.works == eager.works
+        assert streamed.name == eager.name
+
+    def test_iter_empty_registry(self):
+        path = self._write({"repositories": []})
+        assert list(collect_iter_from_registry(path)) == []
+
+
+class TestStreamingWorksFile:
+    def test_iter_with_meta_after_works(self):
+        text = json.dumps({
+            "works": [{"title": "A", "medium": "literary"}, {"title": "B", "featured": True}],
+            "gallery_name": "Trailing Name",
+            "description": "Declared last",
+        })
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            f.write(text)
+            path = Path(f.name)
+
+        meta = {}
+        works = list(collect_iter_from_works_file(path, meta))
+        assert [w.title for w in works] == ["A", "B"]
+        assert works[0].medium.value == "literary"
+        assert meta == {"gallery_name": "Trailing Name", "description": "Declared last"}
+
+
+class TestNdjson:
+    def _write(self, directory: Path, lines: list[dict]) -> Path:
+        path = directory / "works.jsonl"
+        path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+        return path
+
+    def test_loads_header_and_works(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = self._write(Path(d), [
+                {"gallery_name": "Lines", "description": "One per line"},
+                {"title": "A", "medium": "musical", "featured": True},
+                {"title": "B", "tags": ["x"]},
+            ])
+            gallery = collect_from_ndjson(path)
+            assert gallery.name == "Lines"
+            assert gallery.description == "One per line"
+            assert [w.title for w in gallery.works] == ["A", "B"]
+            assert gallery.works[1].tags == ["x"]
+            assert collect_from_path(path) == gallery
+
+    def test_iter_meta_and_blank_lines(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.ndjson"
+            path.write_text('{"gallery_name": "G"}\n\n{"title": "A"}\n\n', encoding="utf-8")
+            meta = {}
+            assert [w.title for w in collect_iter_from_ndjson(path, meta)] == ["A"]
+            assert meta == {"gallery_name": "G"}
+
+    def test_invalid_line_reports_offset(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.jsonl"
+            path.write_text('{}\n{"title": "A"}\n{oops\n', encoding="utf-8")
+            with pytest.raises(ValueError, match="byte 18"):
+                collect_from_ndjson(path)
+
+    def test_append_creates_and_extends(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.jsonl"
+            append_work(path, {"title": "A"}, header={"gallery_name": "New"})
+            size = path.stat().st_size
+            gallery = collect_from_ndjson(path)
+            append_work(path, {"title": "B", "featured": True})
+            append_work(path, {"title": "C"})
+            assert extend_from_ndjson(gallery, path, size) == 2
+            assert gallery.name == "New"
+            assert [w.title for w in gallery.works] == ["A", "B", "C"]
+            assert gallery.stats.featured == 1
+            assert collect_from_ndjson(path) == gallery
+
+    def test_append_repairs_missing_newline(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.jsonl"
+            path.write_text('{}\n{"title": "A"}', encoding="utf-8")
+            append_work(path, {"title": "B"})
+            assert [w.title for w in collect_from_ndjson(path).works] == ["A", "B"]
+
+    def test_append_validates_before_writing(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.jsonl"
+            append_work(path, {"title": "A"})
+            before = path.read_bytes()
+            with pytest.raises(ValueError):
+                append_work(path, {"title": "B", "medium": "opera"})
+            assert path.read_bytes() == before
+
+    def test_extend_rejects_mid_line_offset(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = self._write(Path(d), [{}, {"title": "A"}])
+            gallery = collect_from_ndjson(path)
+            with pytest.raises(ValueError, match="start of a line"):
+                extend_from_ndjson(gallery, path, 5)
@@ -0,0 +1,117 @@
+"""Tests for precompressed output siblings."""
+
+import gzip
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src import compress
+from src.compress import (
+    MANIFEST_NAME,
+    available_encodings,
+    precompress,
+    precompress_tree,
+    sibling_path,
+)
+from src.gallery import Gallery, Medium, Work
+from src.site import build_site
+
+
+def _write(root: Path, name: str, text: str) -> Path:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestPrecompress:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_writes_gzip_siblings_and_reports_sizes(self, jobs):
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            paths = [_write(root, f"page-{n}.html", "<p>gallery</p>\n" * 200) for n in range(3)]
+            report = precompress(paths, root, ("gzip",), jobs=jobs)
+            assert (report.compressed, report.skipped) == (3, 0)
+            for path in paths:
+                sibling = sibling_path(path, "gzip")
+                assert gzip.decompress(sibling.read_bytes()) == path.read_bytes()
+            original, compressed = report.totals("gzip")
+            assert original == sum(p.stat().st_size for p in paths)
+            assert compressed == sum(sibling_path(p, "gzip").stat().st_size for p in paths)
+            assert compressed < original / 10
+
+    def test_output_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write(Path(d), "a.json", '{"works": []}')
+            precompress([path], Path(d), ("gzip",))
+            first = sibling_path(path, "gzip").read_bytes()
+            sibling_path(path, "gzip").unlink()
+            precompress([path], Path(d), ("gzip",))
+            assert sibling_path(path, "gzip").read_bytes() == first
+
+    def test_siblings_get_the_source_file_mode(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write(Path(d), "a.html", "<p>gallery</p>")
+            precompress([path], Path(d), ("gzip",))
+            mode = stat.S_IMODE(path.stat().st_mode)
+            assert stat.S_IMODE(sibling_path(path, "gzip").stat().st_mode) == mode
+            assert stat.S_IMODE((Path(d) / MANIFEST_NAME).stat().st_mode) == mode
+
+    def test_unchanged_files_are_skipped(self):
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            a, b = _write(root, "a.md", "alpha"), _write(root, "b.md", "beta")
+            precompress([a, b], root, ("gzip",))
+            _write(root, "b.md", "beta, revised")
+            report = precompress([a, b], root, ("gzip",))
+            assert [(f.path.name, f.skipped) for f in report.files] == [
+                ("a.md", True), ("b.md", False),
+            ]
+            assert report.files[0].sizes["gzip"] == sibling_path(a, "gzip").stat().st_size
+            sibling_path(a, "gzip").unlink()
+            assert precompress([a], root, ("gzip",)).skipped == 0
+
+    def test_manifest_keeps_other_outputs(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            a, b = _write(root, "a.md", "alpha"), _write(root, "b.md", "beta")
+            precompress([a], root, ("gzip",))
+            precompress([b], root, ("gzip",))
+            assert precompress([a, b], root, ("gzip",)).skipped == 2
+            # A different compression level invalidates the whole manifest.
+            monkeypatch.setattr(compress, "GZIP_LEVEL", 6)
+            assert precompress([a, b], root, ("gzip",)).skipped == 0
+
+    def test_unknown_encoding(self):
+        with tempfile.TemporaryDirectory() as d:
+            with pytest.raises(ValueError):
+                precompress([], Path(d), ("zstd",))
+
+    def test_brotli_when_installed(self):
+        brotli = pytest.importorskip("brotli")
+        assert available_encodings() == ("gzip", "brotli")
+        with tempfile.TemporaryDirectory() as d:
+            path = _write(Path(d), "a.html", "<p>x</p>" * 100)
+            report = precompress([path], Path(d))
+            assert set(report.files[0].sizes) == {"gzip", "brotli"}
+            assert brotli.decompress(sibling_path(path, "brotli").read_bytes()) == path.read_bytes()
+
+
+class TestPrecompressTree:
+    def test_site_pages_and_stale_siblings(self):
+        works = [Work(title=f"Work {n}", description="d", medium=Medium.SOFTWARE,
+                      organ="organvm-iii-ergon", repo=f"w{n}") for n in range(3)]
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            build_site(Gallery(name="G", description="", works=works), root, jobs=1)
+            pages = sorted(p for p in root.rglob("*.html"))
+            report = precompress_tree(root, ("gzip",), jobs=1)
+            assert sorted(f.path for f in report.files) == pages
+            assert not any(f.path.name == MANIFEST_NAME for f in report.files)
+
+            (root / "works" / "work-2.html").unlink()
+            report = precompress_tree(root, ("gzip",), jobs=1)
+            assert (report.compressed, report.removed) == (0, 1)
+            assert not (root / "works" / "work-2.html.gz").exists()
@@ -0,0 +1,94 @@
+"""Tests for the streaming works-file diff."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.diff import FieldChange, canonical_form, diff_paths, work_key
+from src.gallery import Medium, Work
+
+
+def _write_works(path: Path, items: list) -> Path:
+    path.write_text(json.dumps({"gallery_name": "G", "works": items}), encoding="utf-8")
+    return path
+
+
+def _old() -> list:
+    return [
+        {"title": "Alpha", "repo": "alpha", "tags": ["a"]},
+        {"title": "Beta", "repo": "beta", "description": "b"},
+        {"title": "Untracked Piece"},
+        {"title": "Gone", "repo": "gone"},
+    ]
+
+
+def _new() -> list:
+    return [
+        {"title": "Alpha", "repo": "alpha", "tags": ["a", "b"], "featured": True},
+        {"title": "Beta", "repo": "beta", "description": "b"},
+        {"title": "Untracked Piece", "medium": "literary"},
+        {"title": "Fresh", "repo": "fresh"},
+    ]
+
+
+class TestCanonicalForm:
+    def test_is_json_of_the_diff_fields(self):
+        work = Work(title='Tab\t"quoted"', description="café\n", medium=Medium.MUSICAL,
+                    organ="o", repo="", tags=["x"], url="https://example.org")
+        assert json.loads(canonical_form(work)) == [
+            'Tab\t"quoted"', "café\n", "musical", "o", "", ["x"], False, None,
+            "https://example.org",
+        ]
+        assert "\t" not in canonical_form(work) and "\n" not in canonical_form(work)
+        assert work_key(work) == 'tab\t"quoted"'
+
+
+class TestDiffPaths:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_reports_adds_removes_and_field_changes(self, jobs):
+        with tempfile.TemporaryDirectory() as d:
+            old = _write_works(Path(d) / "old.json", _old())
+            new = _write_works(Path(d) / "new.json", _new())
+            report = diff_paths(old, new, jobs=jobs, partitions=3)
+            assert (report.old_count, report.new_count, report.unchanged) == (4, 4, 1)
+            assert report.added == ["fresh"]
+            assert report.removed == ["gone"]
+            assert [change.key for change in report.changed] == ["alpha", "untracked-piece"]
+            assert report.changed[0].changes == (
+                FieldChange("tags", ["a"], ["a", "b"]), FieldChange("featured", False, True),
+            )
+            assert report.changed[1].changes == (FieldChange("medium", "software", "literary"),)
+            assert not report.identical
+            assert diff_paths(old, old, jobs=jobs).identical
+
+    def test_mixed_formats_and_duplicate_keys(self):
+        with tempfile.TemporaryDirectory() as d:
+            items = [{"title": "Echo"}, {"title": "Echo", "description": "second"}]
+            old = _write_works(Path(d) / "old.json", items)
+            new = Path(d) / "new.jsonl"
+            lines = [{"gallery_name": "G"}, items[0], {"title": "Echo", "description": "2nd"},
+                     {"title": "Echo"}]
+            new.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+            report = diff_paths(old, new, jobs=1)
+            assert report.added == ["echo#3"]
+            assert [change.key for change in report.changed] == ["echo#2"]
+            assert report.changed[0].changes == (FieldChange("description", "second", "2nd"),)
+
+    def test_registries(self):
+        with tempfile.TemporaryDirectory() as d:
+            old, new = Path(d) / "old.json", Path(d) / "new.json"
+            old.write_text(json.dumps({"repositories": [{"name": "r", "org": "x"}]}))
+            new.write_text(json.dumps({"repositories": [
+                {"name": "r", "org": "x", "portfolio_relevance": "HIGH"},
+            ]}))
+            report = diff_paths(old, new, registry=True, jobs=1)
+            assert report.changed[0].changes == (FieldChange("featured", False, True),)
+            assert report.as_dict()["changed"] == {"r": {"featured": {"old": False, "new": True}}}
+
+    def test_missing_input_raises(self):
+        with tempfile.TemporaryDirectory() as d:
+            old = _write_works(Path(d) / "old.json", _old())
+            with pytest.raises(OSError):
+                diff_paths(old, Path(d) / "missing.json", jobs=1)
@@ -0,0 +1,174 @@
+"""Tests for JSON Resume, Dublin Core and grant-list exports."""
+
+import io
+import json
+import stat
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.export import (
+    DUBLIN_CORE_NAMESPACE,
+    ExportOptions,
+    cv_to_jsonresume,
+    export_sources,
+    jsonresume_lines,
+    load_cv,
+    write_export,
+)
+from src.gallery import Medium, Work
+
+
+CV_PATH = Path(__file__).parent.parent / "docs" / "source-materials" / "specs" / \
+    "Anthony_James_Padavano_CV.yaml"
+
+
+def _work(title: str, year: int | None = None, medium: Medium = Medium.SOFTWARE,
+          tags: tuple[str, ...] = ("code",)) -> Work:
+    return Work(title=title, description=f"About {title} & more", medium=medium,
+                organ="organvm-ii-poiesis", repo=title.lower(), tags=tags,
+                date_created=date(year, 1, 1) if year else None)
+
+
+def _works() -> list[Work]:
+    return [
+        _work("Old", 2019),
+        _work("Undated", medium=Medium.PERFORMANCE),
+        _work("New", 2024, Medium.PERFORMANCE),
+        _work("Mid", 2022),
+        _work("Also New", 2024),
+    ]
+
+
+def _export(works, fmt: str, options: ExportOptions | None = None) -> str:
+    stream = io.StringIO()
+    write_export(works, fmt, stream, options)
+    return stream.getvalue()
+
+
+def _write_works(d: str, name: str, items: list) -> Path:
+    path = Path(d) / name
+    path.write_text(json.dumps({"gallery_name": "G", "works": items}), encoding="utf-8")
+    return path
+
+
+class TestFormats:
+    def test_jsonresume_matches_json_dumps(self):
+        options = ExportOptions(creator="A. Artist")
+        for works in (_works(), []):
+            text = _export(works, "jsonresume", options)
+            document = json.loads(text)
+            assert text == json.dumps(document, indent=2)
+            assert document["basics"] == {"name": "A. Artist"}
+        projects = json.loads(_export(_works(), "jsonresume"))["projects"]
+        assert projects[2] == {
+            "name": "New", "description": "About New & more", "startDate": "2024-01-01",
+            "keywords": ["code"], "entity": "organvm-ii-poiesis", "type": "performance",
+        }
+
+    def test_jsonresume_extends_cv_projects(self):
+        base = load_cv(CV_PATH)
+        text = "\n".join(jsonresume_lines(_works(), ExportOptions(), base))
+        document = json.loads(text)
+        assert text == json.dumps(document, indent=2)
+        assert document["basics"]["name"] == "Anthony James Padavano"
+        assert document["projects"][:len(base["projects"])] == base["projects"]
+        assert document["projects"][-1]["name"] == "Also New"
+        assert list(document)[-1] == "meta"
+
+    def test_country_code_only_from_cv_data(self):
+        base = load_cv(CV_PATH)
+        assert "countryCode" not in base["basics"]["location"]
+        cv = {"name": "A. Artist", "location": "Paris", "country_code": "FR"}
+        assert cv_to_jsonresume({"cv": cv})["basics"]["location"] == {
+            "city": "Paris", "countryCode": "FR",
+        }
+
+    def test_dublin_core_json_and_xml_agree(self):
+        options = ExportOptions(creator="A. Artist", rights="MIT License")
+        records = json.loads(_export(_works(), "dublin-core-json", options))
+        assert records[2]["dc:type"] == "Event"
+        assert records[2]["dc:date"] == "2024-01-01"
+        assert "dc:date" not in records[1]
+        assert records[0]["dc:rights"] == "MIT License"
+        assert _export([], "dublin-core-json") == "[]"
+
+        root = ET.fromstring(_export(_works(), "dublin-core-xml", options))
+        dc = f"{{{DUBLIN_CORE_NAMESPACE}}}"
+        assert len(root) == len(records)
+        for element, record in zip(root, records):
+            assert element.findtext(f"{dc}title") == record["dc:title"]
+            assert element.findtext(f"{dc}description") == record["dc:description"]
+            assert [e.text for e in element.findall(f"{dc}subject")] == record["dc:subject"]
+
+    def test_grant_list_order_and_filters(self):
+        def titles(options):
+            text = _export(_works(), "grant", options)
+            return [block.split("**")[1] for block in text.split("\n---\n")]
+
+        assert titles(ExportOptions()) == ["New", "Also New", "Mid", "Old", "Undated"]
+        assert titles(ExportOptions(max_works=2)) == ["New", "Also New"]
+        assert titles(ExportOptions(since=2022)) == ["New", "Also New", "Mid"]
+        assert titles(ExportOptions(medium=Medium.PERFORMANCE)) == ["New", "Undated"]
+        assert "**Undated** (n.d.)" in _export(_works(), "grant")
+        assert _export([], "grant") == ""
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            _export(_works(), "bibtex")
+
+
+class TestExportSources:
+    def test_sources_in_parallel(self):
+        with tempfile.TemporaryDirectory() as d:
+            a = _write_works(d, "a.json", [{"title": "One", "tags": ["x"]}])
+            b = _write_works(d, "b.json", [{"title": "Two"}, {"title": "Three"}])
+            out = Path(d) / "out"
+            formats = ["jsonresume", "dublin-core-xml", "grant"]
+            results = export_sources([a, b, CV_PATH], formats, out, jobs=2)
+            assert [(r.path.name, r.records) for r in results] == [
+                ("a.resume.json", 1), ("a.dc.xml", 1), ("a.grant.md", 1),
+                ("b.resume.json", 2), ("b.dc.xml", 2), ("b.grant.md", 2),
+                ("Anthony_James_Padavano_CV.resume.json", 0),
+            ]
+            projects = json.loads((out / "b.resume.json").read_text())["projects"]
+            assert [p["name"] for p in projects] == ["Two", "Three"]
+            assert sorted(p.name for p in out.iterdir()) == sorted(r.path.name for r in results)
+
+    def test_registry_sources(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "registry.json"
+            path.write_text(json.dumps({"repositories": [{"name": "repo-a", "topics": ["t"]}]}))
+            [result] = export_sources([path], ["dublin-core-json"], Path(d), registry=True)
+            assert json.loads(result.path.read_text())[0]["dc:identifier"] == "repo-a"
+
+    def test_conflicting_targets_and_cv_formats(self):
+        with tempfile.TemporaryDirectory() as d:
+            a = _write_works(d, "works.json", [])
+            (Path(d) / "sub").mkdir()
+            b = _write_works(str(Path(d) / "sub"), "works.json", [])
+            with pytest.raises(ValueError):
+                export_sources([a, b], ["grant"], Path(d) / "out")
+            with pytest.raises(ValueError):
+                export_sources([CV_PATH], ["grant"], Path(d) / "out")
+
+    def test_exports_get_default_file_mode(self):
+        with tempfile.TemporaryDirectory() as d:
+            source = _write_works(d, "works.json", [{"title": "One"}])
+            [result] = export_sources([source], ["grant"], Path(d) / "out")
+            assert stat.S_IMODE(result.path.stat().st_mode) == stat.S_IMODE(
+                source.stat().st_mode
+            )
+
+    def test_failed_export_keeps_previous_output(self):
+        with tempfile.TemporaryDirectory() as d:
+            bad = _write_works(d, "bad.json", [{"title": "Ok"}, {"medium": "software"}])
+            target = Path(d) / "bad.grant.md"
+            target.write_text("previous")
+            with pytest.raises(KeyError):
+                export_sources([bad], ["grant"], Path(d))
+            assert target.read_text() == "previous"
+            assert [p.name for p in Path(d).iterdir() if p.name.startswith(".")] == []
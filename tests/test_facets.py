@@ -0,0 +1,116 @@
+"""Tests for faceted bitset queries."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.facets import FacetIndex, FacetQuery, bitset, members
+from src.gallery import Gallery, Medium, Work
+from src.snapshot import open_snapshot, write_snapshot
+from src.store import GalleryStore
+
+
+def _work(title: str, medium: Medium = Medium.SOFTWARE, organ: str = "organvm-i-theoria",
+          tags: tuple[str, ...] = (), featured: bool = False) -> Work:
+    return Work(title=title, description=f"{title} description", medium=medium,
+                organ=organ, repo=title.lower(), tags=tags, featured=featured)
+
+
+def _works() -> list[Work]:
+    return [
+        _work("Alpha", Medium.INTERACTIVE, "organvm-ii-poiesis", ("generative", "sound"), True),
+        _work("Beta", Medium.INTERACTIVE, "organvm-ii-poiesis", ("generative",)),
+        _work("Gamma", Medium.PERFORMANCE, "organvm-ii-poiesis", ("sound",), True),
+        _work("Delta", Medium.SOFTWARE, "organvm-i-theoria", ("generative", "code"), True),
+        _work("Epsilon", Medium.SOFTWARE, "organvm-i-theoria", ()),
+    ]
+
+
+def _titles(result) -> list[str]:
+    return [w.title for w in result.works]
+
+
+class TestBitsets:
+    def test_round_trip(self):
+        ids = [0, 3, 8, 9, 64, 1000]
+        assert members(bitset(ids)) == ids
+        assert bitset([]) == 0
+        assert members(0) == []
+
+    def test_range_fast_path(self):
+        assert bitset(range(3, 7)) == bitset([3, 4, 5, 6])
+        assert bitset(range(0)) == 0
+
+
+class TestGalleryQuery:
+    def test_conjunction_of_facets(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        result = gallery.query(FacetQuery(
+            media=(Medium.INTERACTIVE,), organs=("organvm-ii-poiesis",),
+            tags=("generative",), featured=True,
+        ))
+        assert _titles(result) == ["Alpha"]
+
+    def test_disjunction_within_a_facet(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        result = gallery.query(FacetQuery(media=(Medium.PERFORMANCE, Medium.SOFTWARE)))
+        assert _titles(result) == ["Gamma", "Delta", "Epsilon"]
+        assert _titles(gallery.query(FacetQuery(tags=("code", "sound")))) == ["Alpha", "Gamma", "Delta"]
+        assert _titles(gallery.query(FacetQuery(all_tags=("generative", "sound")))) == ["Alpha"]
+        assert _titles(gallery.query(FacetQuery(featured=False))) == ["Beta", "Epsilon"]
+
+    def test_facet_counts_cover_the_result(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        result = gallery.query(FacetQuery(tags=("generative",)))
+        assert result.total == 3
+        assert result.facets["medium"] == {"interactive": 2, "software": 1}
+        assert result.facets["organ"] == {"organvm-ii-poiesis": 2, "organvm-i-theoria": 1}
+        assert result.facets["tag"] == {"generative": 3, "code": 1, "sound": 1}
+        assert result.facets["featured"] == {"true": 2, "false": 1}
+
+    def test_text_condition_orders_by_search(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        result = gallery.query(FacetQuery(text="delta", media=(Medium.SOFTWARE,)))
+        assert _titles(result) == ["Delta"]
+        assert gallery.query(FacetQuery(text="delto", mode="fuzzy")).works[0].title == "Delta"
+        with pytest.raises(ValueError):
+            gallery.query(FacetQuery(text="x", mode="regex"))
+
+    def test_index_follows_adds_and_removes(self):
+        works = _works()
+        gallery = Gallery(name="G", description="", works=works)
+        assert gallery.query(FacetQuery(tags=("code",))).total == 1
+        gallery.add_work(_work("Zeta", tags=("code",)))
+        gallery.remove_work(works[3])
+        assert _titles(gallery.query(FacetQuery(tags=("code",)))) == ["Zeta"]
+        assert gallery.query(FacetQuery()).facets["featured"] == {"true": 2, "false": 3}
+
+    def test_unknown_values_match_nothing(self):
+        index = FacetIndex.from_works(enumerate(_works()))
+        assert index.select(FacetQuery(organs=("missing",))) == 0
+
+
+class TestBackendsAgree:
+    QUERIES = [
+        FacetQuery(),
+        FacetQuery(media=(Medium.INTERACTIVE, Medium.SOFTWARE), featured=True),
+        FacetQuery(tags=("sound", "code"), organs=("organvm-ii-poiesis",)),
+        FacetQuery(all_tags=("generative", "code")),
+        FacetQuery(featured=False),
+        FacetQuery(text="delta", tags=("generative",)),
+    ]
+
+    def test_store_and_snapshot_match_gallery(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        with tempfile.TemporaryDirectory() as d:
+            with GalleryStore(Path(d) / "g.db") as store:
+                store.add_works(_works())
+                write_snapshot(gallery, Path(d) / "g.snap")
+                with open_snapshot(Path(d) / "g.snap") as snapshot:
+                    for query in self.QUERIES:
+                        expected = gallery.query(query)
+                        for backend in (store, snapshot):
+                            result = backend.query(query)
+                            assert result.works == expected.works
+                            assert result.facets == expected.facets
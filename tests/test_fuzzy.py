@@ -0,0 +1,115 @@
+"""Tests for typo-tolerant fuzzy search."""
+
+import tempfile
+from pathlib import Path
+
+from src.fuzzy import FuzzyIndex, edit_distance, max_edits, trigrams
+from src.gallery import Gallery, Medium, Work
+from src.store import GalleryStore
+
+
+def _work(title: str, tags: list[str] | None = None, description: str = "") -> Work:
+    return Work(
+        title=title,
+        description=description,
+        medium=Medium.SOFTWARE,
+        organ="organvm-iii-ergon",
+        repo=title.lower().replace(" ", "-"),
+        tags=tags or [],
+    )
+
+
+def _gallery() -> Gallery:
+    return Gallery(name="G", description="", works=[
+        _work("Metasystem Master", ["performance"]),
+        _work("Generative Music", ["sound"]),
+        _work("Echo Chamber", ["generative"]),
+        _work("Lattice", description="generative description only"),
+    ])
+
+
+class TestEditDistance:
+    def test_within_limit(self):
+        assert edit_distance("kitten", "sitting", 3) == 3
+        assert edit_distance("metasytem", "metasystem", 2) == 1
+        assert edit_distance("", "ab", 2) == 2
+        assert edit_distance("same", "same", 0) == 0
+
+    def test_exceeding_limit_is_capped(self):
+        assert edit_distance("kitten", "sitting", 2) == 3
+        assert edit_distance("a", "abcdef", 2) == 3
+        assert edit_distance("abcdef", "fedcba", 1) == 2
+
+    def test_budget_and_trigrams(self):
+        assert [max_edits(t) for t in ("ab", "abc", "abcde", "abcdef")] == [0, 1, 1, 2]
+        assert trigrams("ab") == {" ab", "ab "}
+
+
+class TestFuzzyIndex:
+    def test_matches_vocabulary_terms(self):
+        index = FuzzyIndex()
+        for doc_id, work in enumerate(_gallery().works):
+            index.add(doc_id, work)
+        assert index.matches("generatve") == {"generative": 1}
+        assert index.matches("metasytem") == {"metasystem": 1}
+        assert index.matches("xyzzy") == {}
+        # Short tokens must match exactly; description words are not indexed.
+        assert index.matches("description") == {}
+
+    def test_short_tokens_match_without_shared_trigrams(self):
+        index = FuzzyIndex()
+        for doc_id, title in enumerate(["Cat", "Axcdxf", "Dog"]):
+            index.add(doc_id, _work(title))
+        assert index.matches("cut") == {"cat": 1}
+        assert index.matches("abcdef") == {"axcdxf": 2}
+        assert index.matches("dig") == {"dog": 1}
+        assert index.matches("xyz") == {}
+        index.remove(0, _work("Cat"))
+        assert index.matches("cut") == {}
+
+    def test_title_matches_rank_above_tags(self):
+        index = FuzzyIndex()
+        for doc_id, work in enumerate(_gallery().works):
+            index.add(doc_id, work)
+        assert [doc_id for doc_id, _ in index.search("generatve")] == [1, 2]
+
+    def test_every_token_must_match(self):
+        index = FuzzyIndex()
+        for doc_id, work in enumerate(_gallery().works):
+            index.add(doc_id, work)
+        assert [doc_id for doc_id, _ in index.search("generatve musik")] == [1]
+        assert index.search("generatve nothing") == []
+
+    def test_remove_drops_terms(self):
+        index = FuzzyIndex()
+        work = _work("Lattice", ["grid"])
+        index.add(0, work)
+        index.remove(0, work)
+        assert len(index) == 0
+        assert index.search("latice") == []
+
+
+class TestGalleryFuzzy:
+    def test_search_tolerates_typos(self):
+        gallery = _gallery()
+        assert [w.title for w in gallery.search("metasytem", mode="fuzzy")] == ["Metasystem Master"]
+        assert gallery.search("metasytem") == []
+
+    def test_index_follows_adds_and_removes(self):
+        gallery = _gallery()
+        assert gallery.search("latice", mode="fuzzy")[0].title == "Lattice"
+        added = _work("Lattice Two")
+        gallery.add_work(added)
+        assert [w.title for w in gallery.search("latice", mode="fuzzy")] == ["Lattice", "Lattice Two"]
+        gallery.remove_work(added)
+        assert [w.title for w in gallery.search("latice", mode="fuzzy")] == ["Lattice"]
+
+    def test_store_matches_gallery(self):
+        gallery = _gallery()
+        with tempfile.TemporaryDirectory() as d, GalleryStore(Path(d) / "g.db") as store:
+            store.add_works(gallery.works)
+            assert store.search("generatve", mode="fuzzy") == gallery.search("generatve", mode="fuzzy")
+            store.add_work(_work("Generativ"))
+            assert [w.title for w in store.search("generative", mode="fuzzy")] == [
+                "Generative Music", "Generativ", "Echo Chamber",
+            ]
@@ -1,6 +1,11 @@
 """Tests for the gallery model."""
 
-from src.gallery import Gallery, Medium, Work
+import pickle
+
+import pytest
+
+from src.gallery import Gallery, GalleryStats, Medium, Work
+from src.search import SearchIndex
 
 
 def _sample_work(**overrides) -> Work:
@@ -28,6 +33,35 @@ class TestWork:
         work = _sample_work()
         assert work.tags == []
 
+    def test_slotted_without_dict(self):
+        work = _sample_work()
+        assert not hasattr(work, "__dict__")
+        with pytest.raises(AttributeError):
+            work.unknown = 1
+
+    def test_strings_interned(self):
+        a = _sample_work(organ="".join(["organvm-", "i"]), tags=["".join(["al", "pha"])])
+        b = _sample_work(organ="".join(["organvm-", "i"]), tags=["".join(["alp", "ha"])])
+        assert a.organ is b.organ
+        assert a._tags[0] is b._tags[0]
+
+    def test_tags_stored_as_tuple_exposed_as_list(self):
+        work = _sample_work(tags=["a", "b"])
+        assert work._tags == ("a", "b")
+        assert work.tags == ["a", "b"]
+        work.tags = ["c"]
+        assert work.tags == ["c"]
+
+    def test_equality_and_unhashable(self):
+        assert _sample_work(tags=["x"]) == _sample_work(tags=["x"])
+        assert _sample_work(title="A") != _sample_work(title="B")
+        with pytest.raises(TypeError):
+            hash(_sample_work())
+
+    def test_pickle_round_trip(self):
+        work = _sample_work(tags=["x"], featured=True, url="https://example.org")
+        assert pickle.loads(pickle.dumps(work)) == work
+
 
 class TestGallery:
     def test_add_work(self):
@@ -65,3 +99,162 @@ class TestGallery:
         gallery = Gallery(name="Test", description="")
         gallery.add_work(_sample_work(title="Recursive Engine"))
         assert len(gallery.search("RECURSIVE")) == 1
+
+
+class TestGalleryIndexes:
+    def test_add_works_bulk(self):
+        gallery = Gallery(name="Test", description="")
+        gallery.add_works([
+            _sample_work(title="A", featured=True),
+            _sample_work(title="B", medium=Medium.SOFTWARE),
+        ])
+        assert [w.title for w in gallery.works] == ["A", "B"]
+        assert [w.title for w in gallery.featured_works()] == ["A"]
+        assert [w.title for w in gallery.by_medium(Medium.SOFTWARE)] == ["B"]
+
+    def test_constructor_works_indexed(self):
+        gallery = Gallery(name="Test", description="", works=[_sample_work(featured=True)])
+        assert len(gallery.featured_works()) == 1
+        assert len(gallery.by_organ("organvm-ii-poiesis")) == 1
+
+    def test_indexes_preserve_insertion_order(self):
+        gallery = Gallery(name="Test", description="")
+        for title in ["C", "A", "B"]:
+            gallery.add_work(_sample_work(title=title, featured=True))
+        assert [w.title for w in gallery.featured_works()] == ["C", "A", "B"]
+
+    def test_remove_work_updates_indexes(self):
+        gallery = Gallery(name="Test", description="")
+        keep = _sample_work(title="Keep", featured=True)
+        drop = _sample_work(title="Drop", featured=True, organ="organvm-i-theoria")
+        gallery.add_works([keep, drop])
+        gallery.remove_work(drop)
+        assert gallery.works == [keep]
+        assert gallery.featured_works() == [keep]
+        assert gallery.by_organ("organvm-i-theoria") == []
+
+    def test_remove_matches_identity_not_equality(self):
+        gallery = Gallery(name="Test", description="")
+        first, second = _sample_work(), _sample_work()
+        gallery.add_works([first, second])
+        gallery.remove_work(second)
+        assert len(gallery.works) == 1
+        assert gallery.works[0] is first
+
+    def test_removals_keep_order_and_list_identity(self):
+        works = [_sample_work(title=f"W{i}") for i in range(10)]
+        gallery = Gallery(name="Test", description="", works=works)
+        listing = gallery.works
+        for work in works[::3]:
+            gallery.remove_work(work)
+        assert [w.title for w in gallery.works] == ["W1", "W2", "W4", "W5", "W7", "W8"]
+        assert gallery.works is listing
+        gallery.add_work(works[0])
+        assert [w.title for w in gallery.works][-2:] == ["W8", "W0"]
+        assert gallery == Gallery(name="Test", description="",
+                                  works=[works[i] for i in (1, 2, 4, 5, 7, 8, 0)])
+
+    def test_assigning_works_rebuilds_indexes(self):
+        old = _sample_work(title="Old", featured=True)
+        gallery = Gallery(name="Test", description="", works=[old])
+        assert gallery.search("old") == [old]
+        new = _sample_work(title="New", organ="organvm-i-theoria")
+        gallery.works = [new]
+        assert gallery.works == [new]
+        assert gallery.featured_works() == []
+        assert gallery.by_organ("organvm-i-theoria") == [new]
+        assert gallery.get_by_slug("old") is None
+        assert gallery.search("old") == [] and gallery.search("new") == [new]
+        assert gallery.stats.total == 1
+
+    def test_remove_work_shared_with_another_gallery(self):
+        shared = _sample_work(title="Echo")
+        first = Gallery(name="A", description="", works=[shared])
+        Gallery(name="B", description="", works=[_sample_work(title="Echo"), shared])
+        assert shared.slug == "echo-2"
+        first.remove_work(shared)
+        assert first.works == []
+
+    def test_remove_missing_work_raises(self):
+        gallery = Gallery(name="Test", description="")
+        with pytest.raises(ValueError):
+            gallery.remove_work(_sample_work())
+
+    def test_deferred_index_picks_up_later_works(self):
+        source = Gallery(name="Test", description="", works=[_sample_work(title="Early bird")])
+        state = source.search_index().to_state()
+        gallery = Gallery(name="Test", description="", works=[_sample_work(title="Early bird")])
+        gallery.set_search_index_loader(lambda: SearchIndex.from_state(state))
+        gallery.add_work(_sample_work(title="Late bird"))
+        assert gallery.search_index_pending
+        assert [w.title for w in gallery.search("bird")] == ["Early bird", "Late bird"]
+        assert not gallery.search_index_pending
+
+    def test_remove_loads_deferred_index(self):
+        source = Gallery(name="Test", description="", works=[_sample_work(title="Gone")])
+        state = source.search_index().to_state()
+        gallery = Gallery(name="Test", description="", works=[_sample_work(title="Gone")])
+        gallery.set_search_index_loader(lambda: SearchIndex.from_state(state))
+        gallery.remove_work(gallery.works[0])
+        assert gallery.search("gone") == []
+
+
+class TestGallerySlugs:
+    def test_collisions_get_numbered_suffixes(self):
+        works = [_sample_work(title="Echo"), _sample_work(title="echo"), _sample_work(title="ECHO")]
+        gallery = Gallery(name="G", description="", works=works)
+        assert [w.slug for w in works] == ["echo", "echo-2", "echo-3"]
+        assert gallery.get_by_slug("echo-2") is works[1]
+        assert gallery.get_by_slug("missing") is None
+
+    def test_suffix_skips_taken_slugs(self):
+        works = [_sample_work(title="echo-2"), _sample_work(title="Echo"), _sample_work(title="Echo")]
+        Gallery(name="G", description="", works=works)
+        assert [w.slug for w in works] == ["echo-2", "echo", "echo-3"]
+
+    def test_remove_frees_slug(self):
+        first, second = _sample_work(title="Echo"), _sample_work(title="Echo")
+        gallery = Gallery(name="G", description="", works=[first, second])
+        gallery.remove_work(first)
+        assert gallery.get_by_slug("echo") is None
+        assert gallery.get_by_slug("echo-2") is second
+        third = _sample_work(title="Echo")
+        gallery.add_work(third)
+        assert gallery.get_by_slug("echo") is third
+
+    def test_slugs_survive_state_round_trip(self):
+        gallery = Gallery(name="G", description="", works=[_sample_work(title="Echo"),
+                                                           _sample_work(title="echo")])
+        restored = Gallery.from_state(gallery.to_state())
+        assert [w.slug for w in restored.works] == ["echo", "echo-2"]
+
+
+class TestGalleryStats:
+    def test_counters_track_adds(self):
+        gallery = Gallery(name="Test", description="")
+        gallery.add_work(_sample_work(featured=True, tags=["a", "b"]))
+        gallery.add_work(_sample_work(medium=Medium.SOFTWARE, organ="organvm-i-theoria", tags=["a"]))
+        stats = gallery.stats
+        assert (stats.total, stats.featured) == (2, 1)
+        assert stats.by_medium == {"generative-art": 1, "software": 1}
+        assert stats.by_organ == {"organvm-ii-poiesis": 1, "organvm-i-theoria": 1}
+        assert stats.by_tag == {"a": 2, "b": 1}
+
+    def test_counters_track_removals(self):
+        gallery = Gallery(name="Test", description="")
+        work = _sample_work(featured=True, tags=["solo"])
+        gallery.add_works([work, _sample_work()])
+        gallery.remove_work(work)
+        assert (gallery.stats.total, gallery.stats.featured) == (1, 0)
+        assert gallery.stats.by_tag == {}
+        assert gallery.stats.by_medium == {"generative-art": 1}
+
+    def test_from_works_matches_gallery(self):
+        works = [_sample_work(featured=i % 3 == 0, tags=[str(i % 2)]) for i in range(10)]
+        gallery = Gallery(name="Test", description="", works=list(works))
+        assert GalleryStats.from_works(works) == gallery.stats
+
+    def test_summary_is_a_copy(self):
+        gallery = Gallery(name="Test", description="", works=[_sample_work()])
+        gallery.stats.as_summary()["by_medium"].clear()
+        assert gallery.stats.by_medium == {"generative-art": 1}
@@ -0,0 +1,195 @@
+"""Tests for incremental regeneration."""
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from src.collector import collect_from_works_file
+from src.gallery import Gallery, Medium, Work
+from src.incremental import (
+    fragments_path_for,
+    generate_incremental,
+    manifest_path_for,
+    work_digest,
+)
+from src.renderer import render_html, render_json, render_markdown
+
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / "data" / "works.json"
+
+
+def _sample_work(**overrides) -> Work:
+    defaults = {
+        "title": "Test Work",
+        "description": "A test creative work",
+        "medium": Medium.GENERATIVE_ART,
+        "organ": "organvm-ii-poiesis",
+        "repo": "test-repo",
+    }
+    defaults.update(overrides)
+    return Work(**defaults)
+
+
+def _gallery(*works: Work) -> Gallery:
+    gallery = Gallery(name="Incremental", description="Built in pieces")
+    gallery.add_works(works)
+    return gallery
+
+
+def _cli(*args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-m", "src", *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+class TestWorkDigest:
+    def test_stable_for_equal_works(self):
+        assert work_digest(_sample_work(tags=["a"])) == work_digest(_sample_work(tags=["a"]))
+
+    def test_changes_with_content(self):
+        assert work_digest(_sample_work()) != work_digest(_sample_work(featured=True))
+
+
+class TestGenerateIncremental:
+    def test_first_build_renders_everything(self):
+        gallery = _gallery(_sample_work(title="A", featured=True), _sample_work(title="B"))
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.md"
+            stats = generate_incremental(gallery, "markdown", output)
+            assert (stats.rendered, stats.reused, stats.removed) == (2, 0, 0)
+            assert output.read_text(encoding="utf-8") == render_markdown(gallery)
+            assert manifest_path_for(output).exists()
+
+    def test_rebuild_only_renders_changes(self):
+        a, b, c = (_sample_work(title=t, featured=True) for t in "ABC")
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.json"
+            generate_incremental(_gallery(a, b, c), "json", output)
+            changed = _sample_work(title="B", description="Revised", featured=True)
+            added = _sample_work(title="D")
+            gallery = _gallery(a, changed, added)
+            stats = generate_incremental(gallery, "json", output)
+            assert (stats.rendered, stats.reused, stats.removed) == (2, 1, 2)
+            assert output.read_text(encoding="utf-8") == render_json(gallery)
+
+    def test_unchanged_rebuild_reuses_all(self):
+        gallery = _gallery(*(_sample_work(title=f"W{i}") for i in range(20)))
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.json"
+            generate_incremental(gallery, "json", output)
+            stats = generate_incremental(gallery, "json", output)
+            assert (stats.rendered, stats.reused) == (0, 20)
+            assert output.read_text(encoding="utf-8") == render_json(gallery)
+            json.loads(output.read_text(encoding="utf-8"))
+
+    def test_related_slugs_invalidate_neighbours(self):
+        a = _sample_work(title="A", tags=["tide", "sound"], description="Sonified coastal buoys")
+        b = _sample_work(title="B", tags=["tide", "sound"], description="Sonified coastal buoys")
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.json"
+            generate_incremental(_gallery(a, b), "json", output, related=3)
+            gallery = _gallery(a, b, _sample_work(title="C", tags=["tide", "sound"]))
+            stats = generate_incremental(gallery, "json", output, related=3)
+            # A and B gain C as a neighbour, so their records change too.
+            assert (stats.rendered, stats.reused) == (3, 0)
+            assert output.read_text(encoding="utf-8") == render_json(gallery, related=3)
+
+    def test_manifest_is_per_format(self):
+        gallery = _gallery(_sample_work())
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.out"
+            generate_incremental(gallery, "markdown", output)
+            stats = generate_incremental(gallery, "html", output)
+            assert stats.rendered == 1
+            assert output.read_text(encoding="utf-8") == render_html(gallery)
+
+    def test_unchanged_source_keeps_output(self):
+        with tempfile.TemporaryDirectory() as d:
+            source, output = Path(d) / "works.json", Path(d) / "portfolio.md"
+            source.write_text(DATA.read_text(encoding="utf-8"), encoding="utf-8")
+            gallery = collect_from_works_file(source)
+            assert generate_incremental(gallery, "markdown", output, source=source).rendered == 10
+            mtime = output.stat().st_mtime_ns
+            stats = generate_incremental(gallery, "markdown", output, source=source)
+            assert (stats.rendered, stats.reused) == (0, 10)
+            assert output.stat().st_mtime_ns == mtime
+
+            os.utime(source, ns=(mtime + 10**9, mtime + 10**9))
+            stats = generate_incremental(gallery, "markdown", output, source=source)
+            assert (stats.rendered, stats.reused) == (0, 10)
+
+            source.write_text(source.read_text(encoding="utf-8").replace("A ", "The "),
+                              encoding="utf-8")
+            edited = collect_from_works_file(source)
+            stats = generate_incremental(edited, "markdown", output, source=source)
+            assert (stats.rendered, stats.reused) == (10, 0)
+            assert output.read_text(encoding="utf-8") == render_markdown(edited)
+
+    def test_edited_output_is_rebuilt(self):
+        gallery = _gallery(_sample_work(title="A"), _sample_work(title="B"))
+        with tempfile.TemporaryDirectory() as d:
+            source, output = Path(d) / "works.json", Path(d) / "portfolio.json"
+            source.write_text("{}", encoding="utf-8")
+            generate_incremental(gallery, "json", output, source=source)
+            output.write_text("edited by hand", encoding="utf-8")
+            stats = generate_incremental(gallery, "json", output, source=source)
+            assert (stats.rendered, stats.reused) == (0, 2)
+            assert output.read_text(encoding="utf-8") == render_json(gallery)
+
+    def test_damaged_fragments_trigger_full_build(self):
+        gallery = _gallery(_sample_work(title="A"), _sample_work(title="B"))
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.json"
+            generate_incremental(gallery, "json", output)
+            fragments_path_for(output).write_bytes(b"truncated")
+            stats = generate_incremental(gallery, "json", output)
+            assert (stats.rendered, stats.reused) == (2, 0)
+            assert output.read_text(encoding="utf-8") == render_json(gallery)
+
+    def test_outputs_get_default_file_mode(self):
+        gallery = _gallery(_sample_work())
+        with tempfile.TemporaryDirectory() as d:
+            plain = Path(d) / "plain.txt"
+            plain.write_text("", encoding="utf-8")
+            output = Path(d) / "portfolio.json"
+            generate_incremental(gallery, "json", output)
+            for path in (output, fragments_path_for(output), manifest_path_for(output)):
+                assert stat.S_IMODE(path.stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+
+    def test_corrupt_manifest_triggers_full_build(self):
+        gallery = _gallery(_sample_work())
+        with tempfile.TemporaryDirectory() as d:
+            output = Path(d) / "portfolio.md"
+            manifest_path_for(output).write_text("{not json", encoding="utf-8")
+            stats = generate_incremental(gallery, "markdown", output)
+            assert stats.rendered == 1
+
+
+class TestBackends:
+    def test_store_generate_incremental(self):
+        expected = render_markdown(collect_from_works_file(DATA))
+        with tempfile.TemporaryDirectory() as d:
+            store, output = str(Path(d) / "g.db"), Path(d) / "portfolio.md"
+            _cli("--store", store, "import", str(DATA))
+            first = _cli("--store", store, "generate", "--incremental", "--output", str(output))
+            assert "0 reused" in first
+            assert output.read_text(encoding="utf-8") == expected
+            second = _cli("--store", store, "generate", "--incremental", "--output", str(output))
+            assert "0 rendered" in second
+            assert output.read_text(encoding="utf-8") == expected
+
+    def test_snapshot_generate_incremental(self):
+        expected = render_json(collect_from_works_file(DATA))
+        with tempfile.TemporaryDirectory() as d:
+            snapshot, output = str(Path(d) / "g.snap"), Path(d) / "portfolio.json"
+            _cli("--works", str(DATA), "--no-cache", "snapshot", snapshot)
+            for _ in range(2):
+                _cli("--snapshot", snapshot, "generate", "--incremental", "--format", "json",
+                     "--output", str(output))
+                assert output.read_text(encoding="utf-8") == expected
@@ -0,0 +1,64 @@
+"""Tests for multi-format generation."""
+
+import tempfile
+from pathlib import Path
+
+from src.gallery import Gallery, Medium, Work
+from src.pipeline import expand_formats, generate_formats, output_paths
+from src.renderer import render_html, render_json, render_markdown
+
+
+def _gallery() -> Gallery:
+    gallery = Gallery(name="Multi", description="Several formats")
+    for i in range(5):
+        gallery.add_work(Work(
+            title=f"Work {i}",
+            description="A work",
+            medium=Medium.SOFTWARE,
+            organ="organvm-i-theoria",
+            repo=f"repo-{i}",
+            featured=i % 2 == 0,
+        ))
+    return gallery
+
+
+class TestExpandFormats:
+    def test_default_markdown(self):
+        assert expand_formats(None) == ["markdown"]
+
+    def test_all(self):
+        assert expand_formats(["all"]) == ["markdown", "html", "json"]
+
+    def test_repeated_deduplicated(self):
+        assert expand_formats(["json", "html", "json"]) == ["json", "html"]
+
+
+class TestGenerateFormats:
+    def test_output_paths(self):
+        paths = output_paths(Path("out/portfolio.md"), ["markdown", "json"])
+        assert paths == {"markdown": Path("out/portfolio.md"), "json": Path("out/portfolio.json")}
+
+    def test_parallel_matches_renderers(self):
+        gallery = _gallery()
+        with tempfile.TemporaryDirectory() as d:
+            targets = output_paths(Path(d) / "portfolio", expand_formats(["all"]))
+            results = generate_formats(gallery, targets, jobs=3)
+            assert [r.fmt for r in results] == ["markdown", "html", "json"]
+            assert all(r.seconds >= 0 for r in results)
+            assert targets["markdown"].read_text(encoding="utf-8") == render_markdown(gallery)
+            assert targets["html"].read_text(encoding="utf-8") == render_html(gallery)
+            assert targets["json"].read_text(encoding="utf-8") == render_json(gallery)
+
+    def test_serial_incremental(self):
+        gallery = _gallery()
+        with tempfile.TemporaryDirectory() as d:
+            targets = output_paths(Path(d) / "portfolio", ["markdown", "json"])
+            generate_formats(gallery, targets, jobs=1, incremental=True)
+            results = generate_formats(gallery, targets, jobs=1, incremental=True)
+            # Without a source only JSON entries can be reused.
+            assert [r.stats.reused for r in results] == [0, 5]
+            source = Path(d) / "works.json"
+            source.write_text("{}", encoding="utf-8")
+            generate_formats(gallery, targets, jobs=1, incremental=True, source=source)
+            results = generate_formats(gallery, targets, jobs=1, incremental=True, source=source)
+            assert [r.stats.reused for r in results] == [5, 5]
@@ -0,0 +1,71 @@
+"""Tests for the per-phase profiling hooks."""
+
+import io
+import json
+import pstats
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from src import profiling
+from src.collector import collect_from_works_file
+from src.profiling import count, phase, profiling as profiled
+from src.renderer import write_markdown
+
+
+DATA = Path(__file__).parent.parent / "data" / "works.json"
+
+
+class TestHooks:
+    def test_disabled_hooks_are_noops(self):
+        with phase("anything"):
+            count("things", 3)
+        assert profiling._profiler is None
+
+    def test_nested_phases_and_counts(self):
+        with profiled() as profiler:
+            with phase("outer"):
+                with phase("inner"):
+                    data = [bytearray(1 << 20)]
+                del data
+                with phase("inner"):
+                    count("items", 2)
+            count("items")
+        assert profiler.phases["outer/inner"]["calls"] == 2
+        assert profiler.phases["outer"]["calls"] == 1
+        assert profiler.phases["outer"]["seconds"] >= profiler.phases["outer/inner"]["seconds"]
+        assert profiler.phases["outer"]["peak_bytes"] >= profiler.phases["outer/inner"]["peak_bytes"]
+        assert profiler.phases["outer/inner"]["peak_bytes"] >= 1 << 20
+        assert profiler.peak_bytes >= 1 << 20
+        assert profiler.counts == {"items": 3}
+        assert profiling._profiler is None
+
+    def test_collector_and_renderer_phases(self):
+        with profiled(memory=False) as profiler:
+            gallery = collect_from_works_file(DATA)
+            write_markdown(gallery, io.StringIO())
+        assert {"read", "decode", "construct", "index", "render", "render/write"} <= set(
+            profiler.phases
+        )
+        assert profiler.counts["works"] == len(gallery.works)
+        assert profiler.peak_bytes is None
+        assert "peak_bytes" not in profiler.phases["read"]
+
+
+class TestCli:
+    def test_timings_report_and_pstats(self):
+        with tempfile.TemporaryDirectory() as d:
+            report_path = Path(d) / "timings.json"
+            stats_path = Path(d) / "run.pstats"
+            subprocess.run(
+                [sys.executable, "-m", "src", "--works", str(DATA), "--no-cache",
+                 "--timings-output", str(report_path), "--pstats", str(stats_path), "summary"],
+                check=True, capture_output=True, cwd=Path(__file__).parent.parent,
+            )
+            report = json.loads(report_path.read_text(encoding="utf-8"))
+            assert report["command"] == "summary"
+            assert "summary/load/decode" in report["phases"]
+            assert report["counts"]["works"] > 0
+            assert report["peak_bytes"] > 0
+            assert pstats.Stats(str(stats_path)).total_calls > 0
@@ -0,0 +1,132 @@
+"""Tests for MinHash/LSH related-works recommendations."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.gallery import Gallery, Medium, Work
+from src.related import MAX_BUCKET, NUM_PERM, RelatedIndex
+from src.renderer import render_json
+from src.site import build_site
+from src.snapshot import open_snapshot, write_snapshot
+from src.store import GalleryStore
+
+
+def _work(title: str, tags: tuple[str, ...] = (), description: str = "") -> Work:
+    return Work(
+        title=title,
+        description=description,
+        medium=Medium.SOFTWARE,
+        organ="organvm-iii-ergon",
+        repo=title.lower().replace(" ", "-"),
+        tags=tags,
+    )
+
+
+def _works() -> list[Work]:
+    return [
+        _work("Tide Engine", ("generative", "ocean", "sound"), "Sonified tidal data from coastal buoys"),
+        _work("Harbor Drone", ("generative", "ocean", "sound"), "Sonified harbor data from coastal buoys"),
+        _work("Reef Atlas", ("ocean", "mapping"), "Coral survey maps rendered from coastal buoys"),
+        _work("Ledger", ("finance",), "Double entry bookkeeping service"),
+        _work("Blank"),
+    ]
+
+
+class TestRelatedIndex:
+    def test_identical_works_have_identical_signatures(self):
+        index = RelatedIndex()
+        a = index.signature(_work("A", ("x", "y"), "some words here"))
+        b = index.signature(_work("B", ("y", "x"), "here words some"))
+        assert a is not None and len(a) == NUM_PERM
+        assert a == b
+        assert index.signature(_work("Empty", (), "a an of")) is None
+
+    def test_ranks_by_estimated_similarity(self):
+        index = RelatedIndex()
+        for doc_id, work in enumerate(_works()):
+            index.add(doc_id, work)
+        related = index.related(0)
+        assert related[0][0] == 1
+        assert all(doc_id not in (0, 3, 4) for doc_id, _ in related)
+        assert [score for _, score in related] == sorted((s for _, s in related), reverse=True)
+        assert index.related(4) == []
+        assert index.related(0, count=0) == []
+
+    def test_large_identical_cluster(self):
+        index = RelatedIndex()
+        n = MAX_BUCKET + 10
+        for doc_id in range(n):
+            index.add(doc_id, _work(f"Copy {doc_id}", ("tide", "sound"), "Sonified coastal buoys"))
+        for doc_id in (0, n - 1):
+            related = index.related(doc_id)
+            assert len(related) == 5
+            assert all(score == 1.0 and other != doc_id for other, score in related)
+
+    def test_remove_drops_buckets(self):
+        index = RelatedIndex()
+        works = _works()
+        for doc_id, work in enumerate(works):
+            index.add(doc_id, work)
+        index.remove(1, works[1])
+        assert all(doc_id != 1 for doc_id, _ in index.related(0))
+        for doc_id, work in enumerate(works):
+            index.remove(doc_id, work)
+        assert len(index) == 0
+        assert not any(index._buckets)
+
+
+class TestGalleryRelated:
+    def test_related_follows_adds_and_removes(self):
+        works = _works()
+        gallery = Gallery(name="G", description="", works=works)
+        assert gallery.related(works[0])[0].title == "Harbor Drone"
+        gallery.remove_work(works[1])
+        assert "Harbor Drone" not in [w.title for w in gallery.related(works[0])]
+        gallery.add_work(_work("Tide Engine II", ("generative", "ocean", "sound"),
+                               "Sonified tidal data from coastal buoys"))
+        assert gallery.related(works[0], 1)[0].title == "Tide Engine II"
+
+    def test_unknown_work_raises(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        with pytest.raises(ValueError):
+            gallery.related(_work("Stranger", ("ocean",)))
+        with pytest.raises(ValueError):
+            # An equal copy is not the gallery's work.
+            gallery.related(_work("Tide Engine", ("generative", "ocean", "sound"),
+                                  "Sonified tidal data from coastal buoys"))
+
+    def test_backends_agree(self):
+        works = _works()
+        gallery = Gallery(name="G", description="", works=works)
+        with tempfile.TemporaryDirectory() as d:
+            with GalleryStore(Path(d) / "g.db") as store:
+                store.add_works(_works())
+                write_snapshot(gallery, Path(d) / "g.snap")
+                with open_snapshot(Path(d) / "g.snap") as snapshot:
+                    for work in works:
+                        expected = gallery.related(work)
+                        assert store.related(work) == expected
+                        assert snapshot.related(work) == expected
+
+
+class TestRelatedOutput:
+    def test_json_lists_related_slugs_on_request(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        assert "related" not in json.loads(render_json(gallery))["works"][0]
+        records = json.loads(render_json(gallery, related=2))["works"]
+        assert records[0]["related"][0] == "harbor-drone"
+        assert len(records[0]["related"]) <= 2
+        assert records[4]["related"] == []
+
+    def test_work_pages_link_related_works(self):
+        gallery = Gallery(name="G", description="", works=_works())
+        with tempfile.TemporaryDirectory() as d:
+            build_site(gallery, Path(d), jobs=1)
+            page = (Path(d) / "works" / "tide-engine.html").read_text()
+            assert "Related works" in page
+            assert 'href="../works/harbor-drone.html"' in page
+            build_site(gallery, Path(d), jobs=1, related=0)
+            assert "Related works" not in (Path(d) / "works" / "tide-engine.html").read_text()
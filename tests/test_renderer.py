@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import io
 import json
 
 from src.gallery import Gallery, Medium, Work
-from src.renderer import render_html, render_json, render_markdown, render_summary
+from src.renderer import (
+    render_html,
+    render_json,
+    render_markdown,
+    render_summary,
+    write_html,
+    write_json,
+    write_lines,
+    write_markdown,
+)
 
 
 def _sample_work(**overrides) -> Work:
@@ -135,6 +145,14 @@ class TestRenderSummary:
         assert summary["featured_count"] == 0
         assert summary["by_medium"] == {}
         assert summary["by_organ"] == {}
+        assert summary["by_tag"] == {}
+
+    def test_counts_by_tag(self):
+        gallery = _populated_gallery()
+        summary = render_summary(gallery)
+        assert summary["by_tag"] == {
+            "generative": 1, "art": 1, "recursion": 1, "performance": 1, "live": 1,
+        }
 
 
 class TestRenderHtml:
@@ -242,3 +260,50 @@ class TestRenderJson:
         output = render_json(gallery)
         data = json.loads(output)
         assert data["works"][0]["slug"] == "my-great-work"
+
+
+class _RecordingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+class TestStreamingWriters:
+    def test_write_matches_render(self):
+        gallery = _populated_gallery()
+        for render, write in (
+            (render_markdown, write_markdown),
+            (render_html, write_html),
+            (render_json, write_json),
+        ):
+            stream = io.StringIO()
+            write(gallery, stream, chunk_size=16)
+            assert stream.getvalue() == render(gallery)
+
+    def test_json_matches_json_dumps(self):
+        gallery = _populated_gallery()
+        gallery.add_work(_sample_work(title="Ünïcode \"quoted\"", url="https://example.org"))
+        expected = json.dumps(json.loads(render_json(gallery)), indent=2)
+        assert render_json(gallery) == expected
+
+    def test_empty_gallery_json_stream(self):
+        stream = io.StringIO()
+        write_json(Gallery(name="Empty", description=""), stream)
+        assert json.loads(stream.getvalue())["works"] == []
+
+    def test_binary_stream_gets_utf8(self):
+        gallery = _populated_gallery()
+        gallery.add_work(_sample_work(title="Café"))
+        stream = io.BytesIO()
+        write_markdown(gallery, stream)
+        assert stream.getvalue().decode("utf-8") == render_markdown(gallery)
+
+    def test_output_written_in_chunks(self):
+        stream = _RecordingStream()
+        write_lines((f"line {i}" for i in range(1000)), stream, chunk_size=256)
+        assert 1 < stream.writes < 1000
+        assert stream.getvalue() == "\n".join(f"line {i}" for i in range(1000))
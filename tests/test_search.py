@@ -0,0 +1,98 @@
+"""Tests for the inverted-index search engine."""
+
+import pytest
+
+from src.gallery import Gallery, Medium, Work
+from src.search import SearchIndex, decode_position, tokenize
+
+
+def _sample_work(**overrides) -> Work:
+    defaults = {
+        "title": "Test Work",
+        "description": "A test creative work",
+        "medium": Medium.GENERATIVE_ART,
+        "organ": "organvm-ii-poiesis",
+        "repo": "test-repo",
+    }
+    defaults.update(overrides)
+    return Work(**defaults)
+
+
+def _gallery() -> Gallery:
+    gallery = Gallery(name="Test", description="")
+    gallery.add_works([
+        _sample_work(title="Recursive Engine", description="Self-similar structures"),
+        _sample_work(title="Choir", description="A recursive vocal piece", tags=["music"]),
+        _sample_work(title="Garden", description="Plants", tags=["recursive", "generative"]),
+        _sample_work(title="Lattice", description="Generative geometry engine"),
+    ])
+    return gallery
+
+
+class TestTokenize:
+    def test_lowercases_and_splits(self):
+        assert tokenize("Self-Similar, Structures!") == ["self", "similar", "structures"]
+
+    def test_underscores_split(self):
+        assert tokenize("snake_case") == ["snake", "case"]
+
+
+class TestSearchIndex:
+    def test_positions_recorded_per_field(self):
+        index = SearchIndex()
+        index.add(0, _sample_work(title="echo echo", description="an echo"))
+        positions = [decode_position(p) for p in index._postings["echo"][0]]
+        assert positions == [("title", 0), ("title", 1), ("description", 1)]
+
+    def test_remove_drops_postings(self):
+        index = SearchIndex()
+        index.add(0, _sample_work(title="unique"))
+        index.remove(0, _sample_work(title="unique"))
+        assert "unique" not in index._postings
+        assert index.search("unique") == []
+        assert len(index) == 0
+
+    def test_expand_prefix(self):
+        index = SearchIndex()
+        index.add(0, _sample_work(title="generate generative general"))
+        assert index.expand("gener") == ["general", "generate", "generative"]
+
+
+class TestGallerySearch:
+    def test_title_match_ranks_first(self):
+        results = _gallery().search("recursive")
+        assert [w.title for w in results] == ["Recursive Engine", "Garden", "Choir"]
+
+    def test_multi_term_and(self):
+        results = _gallery().search("generative engine")
+        assert [w.title for w in results] == ["Lattice"]
+
+    def test_prefix_match(self):
+        results = _gallery().search("recur")
+        assert len(results) == 3
+
+    def test_no_match(self):
+        assert _gallery().search("nonexistent") == []
+
+    def test_substring_mode_keeps_gallery_order(self):
+        results = _gallery().search("cursiv", mode="substring")
+        assert [w.title for w in results] == ["Recursive Engine", "Choir", "Garden"]
+        assert _gallery().search("cursiv") == []
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            _gallery().search("x", mode="fuzzy-ish")
+
+    def test_index_updated_after_build(self):
+        gallery = _gallery()
+        gallery.search("engine")
+        late = _sample_work(title="Late Engine")
+        gallery.add_work(late)
+        assert late in gallery.search("engine")
+        gallery.remove_work(late)
+        assert late not in gallery.search("engine")
+
+    def test_punctuation_only_query_falls_back(self):
+        gallery = _gallery()
+        gallery.add_work(_sample_work(title="C++ & friends"))
+        assert [w.title for w in gallery.search("++")] == ["C++ & friends"]
@@ -0,0 +1,285 @@
+"""Tests for the HTTP query server, run against localhost."""
+
+import asyncio
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.collector import collect_from_works_file
+from src.server import GalleryServer
+from src.snapshot import open_snapshot, write_snapshot
+from src.store import GalleryStore, import_works_file
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _write_works(path: Path, titles: list[str], name: str = "Served") -> None:
+    works = [
+        {
+            "title": title,
+            "description": f"About {title}",
+            "medium": "software" if i % 2 else "musical",
+            "organ": "organvm-i-theoria",
+            "repo": f"repo-{i}",
+            "tags": ["sound"] if i == 0 else ["code"],
+            "featured": i == 0,
+        }
+        for i, title in enumerate(titles)
+    ]
+    path.write_text(json.dumps({"gallery_name": name, "works": works}), encoding="utf-8")
+
+
+class _RunningServer:
+    """Run a GalleryServer on an ephemeral port in a background event loop."""
+
+    def __init__(self, server: GalleryServer) -> None:
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        async def boot() -> None:
+            self._listener = await server.start("127.0.0.1", 0)
+            started.set()
+
+        self.thread = threading.Thread(
+            target=lambda: (self.loop.run_until_complete(boot()), self.loop.run_forever()),
+            daemon=True,
+        )
+        self.thread.start()
+        started.wait(5)
+        self.port = self._listener.sockets[0].getsockname()[1]
+
+    def request(self, target: str, headers: dict | None = None, method: str = "GET"):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.request(method, target, headers=headers or {})
+            response = conn.getresponse()
+            body = response.read()
+            return response.status, dict(response.getheaders()), body
+        finally:
+            conn.close()
+
+    def reload(self) -> bool:
+        future = asyncio.run_coroutine_threadsafe(self.server.reload_if_changed(), self.loop)
+        return future.result(5)
+
+    def close(self) -> None:
+        async def shutdown() -> None:
+            self._listener.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+class TestServer:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "works.json"
+        _write_works(self.path, ["Alpha Song", "Beta Code", "Gamma Code"])
+        self.running = _RunningServer(GalleryServer(self.path, collect_from_works_file, 60))
+
+    def teardown_method(self):
+        self.running.close()
+        self._tmp.cleanup()
+
+    def _json(self, target: str):
+        status, _, body = self.running.request(target)
+        return status, json.loads(body)
+
+    def test_summary(self):
+        status, payload = self._json("/summary")
+        assert status == 200
+        assert payload["name"] == "Served"
+        assert payload["total_works"] == 3
+        assert payload["featured_count"] == 1
+
+    def test_search_and_featured(self):
+        status, payload = self._json("/search?q=code")
+        assert status == 200
+        assert payload["total"] == 2
+        assert {w["title"] for w in payload["works"]} == {"Beta Code", "Gamma Code"}
+        _, featured = self._json("/featured")
+        assert [w["title"] for w in featured["works"]] == ["Alpha Song"]
+
+    def test_work_by_slug(self):
+        status, payload = self._json("/works/beta-code")
+        assert status == 200
+        assert payload["repo"] == "repo-1"
+        status, payload = self._json("/works/missing")
+        assert status == 404
+        assert "error" in payload
+
+    def test_filtered_listing(self):
+        _, payload = self._json("/works?medium=software")
+        assert [w["title"] for w in payload["works"]] == ["Beta Code"]
+        _, payload = self._json("/works?tag=code&limit=1&offset=1")
+        assert payload["total"] == 2
+        assert [w["title"] for w in payload["works"]] == ["Gamma Code"]
+        _, payload = self._json("/works?featured=false")
+        assert payload["total"] == 2
+
+    def test_bad_requests(self):
+        assert self._json("/search")[0] == 400
+        assert self._json("/works?medium=opera")[0] == 400
+        assert self._json("/works?limit=x")[0] == 400
+        assert self._json("/nope")[0] == 404
+        assert self.running.request("/summary", method="POST")[0] == 405
+
+    def test_rejected_body_is_drained_on_keep_alive(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.running.port, timeout=5)
+        try:
+            conn.request("POST", "/summary", body=b'{"title": "x"}')
+            response = conn.getresponse()
+            response.read()
+            assert response.status == 405
+            assert response.getheader("Connection") == "keep-alive"
+            conn.request("GET", "/summary")
+            response = conn.getresponse()
+            assert response.status == 200
+            assert json.loads(response.read())["total_works"] == 3
+        finally:
+            conn.close()
+        status, headers, _ = self.running.request(
+            "/summary", {"Transfer-Encoding": "chunked"}, method="POST"
+        )
+        assert (status, headers["Connection"]) == (405, "close")
+
+    def test_responses_built_off_the_event_loop(self):
+        server = self.running.server
+        assert server.gallery._search_index is not None
+        assert server.gallery._facet_index is not None
+        threads = []
+        route = server.route
+
+        def recording_route(*args):
+            threads.append(threading.current_thread())
+            return route(*args)
+
+        server.route = recording_route
+        assert self._json("/works?tag=code")[1]["total"] == 2
+        assert threads and self.running.thread not in threads
+
+    def test_etag_not_modified(self):
+        status, headers, body = self.running.request("/summary")
+        etag = headers["ETag"]
+        status, _, body = self.running.request("/summary", {"If-None-Match": etag})
+        assert status == 304
+        assert body == b""
+        status, _, _ = self.running.request("/summary", {"If-None-Match": '"other"'})
+        assert status == 200
+
+    def test_reload_on_change(self):
+        _, headers, _ = self.running.request("/summary")
+        assert not self.running.reload()
+        _write_works(self.path, ["Alpha Song", "Beta Code", "Gamma Code", "Delta Code"])
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert self.running.reload()
+        status, _, body = self.running.request("/summary", {"If-None-Match": headers["ETag"]})
+        assert status == 200
+        assert json.loads(body)["total_works"] == 4
+
+    def test_failed_reload_keeps_gallery(self):
+        self.path.write_text("{not json", encoding="utf-8")
+        assert not self.running.reload()
+        assert self._json("/summary")[1]["total_works"] == 3
+
+    def test_concurrent_clients(self):
+        results = []
+
+        def fetch():
+            results.append(self.running.request("/search?q=code")[0])
+
+        threads = [threading.Thread(target=fetch) for _ in range(10)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        assert results == [200] * 10
+        assert time.perf_counter() - start < 5
+
+
+def _backend_source(directory: Path, backend: str) -> tuple[Path, object]:
+    works = directory / "works.json"
+    _write_works(works, ["Alpha Song", "Beta Code", "Gamma Code"])
+    if backend == "store":
+        path = directory / "gallery.db"
+        with GalleryStore(path) as store:
+            import_works_file(store, works)
+        return path, GalleryStore
+    path = directory / "gallery.snap"
+    write_snapshot(collect_from_works_file(works), path)
+    return path, open_snapshot
+
+
+@pytest.mark.parametrize("backend", ["store", "snapshot"])
+class TestBackends:
+    def test_queries_from_worker_threads(self, backend):
+        with tempfile.TemporaryDirectory() as d:
+            path, load = _backend_source(Path(d), backend)
+            running = _RunningServer(GalleryServer(path, load, 60))
+            try:
+                results = {}
+
+                def fetch(target):
+                    status, _, body = running.request(target)
+                    results[target] = status, json.loads(body)
+
+                targets = ["/summary", "/works?tag=code", "/works?medium=musical&featured=1",
+                           "/search?q=code", "/search?q=gama&mode=fuzzy", "/works/beta-code"]
+                threads = [threading.Thread(target=fetch, args=(t,)) for t in targets * 3]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join(5)
+                assert {status for status, _ in results.values()} == {200}
+                assert results["/summary"][1]["total_works"] == 3
+                assert [w["title"] for w in results["/works?tag=code"][1]["works"]] == [
+                    "Beta Code", "Gamma Code",
+                ]
+                assert results["/works?medium=musical&featured=1"][1]["total"] == 1
+                assert results["/search?q=code"][1]["total"] == 2
+                assert [w["title"] for w in results["/search?q=gama&mode=fuzzy"][1]["works"]] == [
+                    "Gamma Code",
+                ]
+                assert results["/works/beta-code"][1]["repo"] == "repo-1"
+            finally:
+                running.close()
+
+    def test_serve_command(self, backend):
+        with tempfile.TemporaryDirectory() as d:
+            path, _ = _backend_source(Path(d), backend)
+            process = subprocess.Popen(
+                [sys.executable, "-u", "-m", "src", f"--{backend}", str(path),
+                 "serve", "--port", "0"],
+                cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            )
+            try:
+                line = process.stdout.readline()
+                assert line.startswith("Serving "), process.stderr.read()
+                port = int(line.rstrip().rsplit(":", 1)[1])
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                conn.request("GET", "/works?tag=code")
+                response = conn.getresponse()
+                assert response.status == 200
+                assert json.loads(response.read())["total"] == 2
+                conn.close()
+            finally:
+                process.kill()
+                process.communicate()
+
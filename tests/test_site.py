@@ -0,0 +1,143 @@
+"""Tests for static-site generation."""
+
+import tempfile
+from pathlib import Path
+
+from src.gallery import Gallery, Medium, Work
+from src.site import build_site, listing_href, path_segment, unique_segments, work_href
+
+
+def _sample_work(**overrides) -> Work:
+    defaults = {
+        "title": "Test Work",
+        "description": "A test creative work",
+        "medium": Medium.GENERATIVE_ART,
+        "organ": "organvm-ii-poiesis",
+        "repo": "test-repo",
+    }
+    defaults.update(overrides)
+    return Work(**defaults)
+
+
+def _gallery(n: int = 7) -> Gallery:
+    gallery = Gallery(name="Site", description="A static site")
+    for i in range(n):
+        gallery.add_work(_sample_work(
+            title=f"Work {i}",
+            medium=Medium.SOFTWARE if i % 2 else Medium.MUSICAL,
+            featured=i == 0,
+        ))
+    return gallery
+
+
+class TestPaths:
+    def test_path_segment_sanitizes(self):
+        assert path_segment("A/B <c>") == "a-b-c"
+        assert path_segment("../..") == "unassigned"
+        assert path_segment("") == "unassigned"
+
+    def test_hrefs(self):
+        assert work_href(_sample_work(title="My Work")) == "works/my-work.html"
+        assert listing_href("medium", "software", 1) == "medium/software/index.html"
+        assert listing_href("organ", "organvm-i-theoria", 3) == "organ/organvm-i-theoria/page-3.html"
+
+
+    def test_unique_segments(self):
+        assert unique_segments(["C++", "C#", "c", "c-2", "C++"]) == {
+            "C++": "c", "C#": "c-2", "c": "c-3", "c-2": "c-2-2",
+        }
+
+
+class TestBuildSite:
+    def test_pages_written(self):
+        with tempfile.TemporaryDirectory() as d:
+            out = Path(d)
+            stats = build_site(_gallery(), out, jobs=1, page_size=3)
+            assert stats.work_pages == 7
+            # musical: 4 works -> 2 pages, software: 3 -> 1, organ: 7 -> 3
+            assert stats.listing_pages == 6
+            assert (out / "index.html").exists()
+            assert (out / "works" / "work-3.html").exists()
+            assert (out / "medium" / "musical" / "page-2.html").exists()
+            assert (out / "organ" / "organvm-ii-poiesis" / "page-3.html").exists()
+
+    def test_parallel_matches_serial(self):
+        gallery = _gallery(20)
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            build_site(gallery, Path(a), jobs=1, page_size=4)
+            stats = build_site(gallery, Path(b), jobs=3, page_size=4)
+            assert stats.work_pages == 20
+            files_a = sorted(p.relative_to(a) for p in Path(a).rglob("*.html"))
+            files_b = sorted(p.relative_to(b) for p in Path(b).rglob("*.html"))
+            assert files_a == files_b
+            for rel in files_a:
+                assert (Path(a) / rel).read_text() == (Path(b) / rel).read_text()
+
+    def test_work_page_content_escaped(self):
+        gallery = Gallery(name="Site", description="")
+        gallery.add_work(_sample_work(title="Echo", description="<script>x</script>", tags=["a"]))
+        with tempfile.TemporaryDirectory() as d:
+            build_site(gallery, Path(d), jobs=1)
+            html = (Path(d) / "works" / "echo.html").read_text()
+            assert "<h1>Echo</h1>" in html
+            assert "&lt;script&gt;" in html
+            assert 'href="../medium/generative-art/index.html"' in html
+            assert "Tags: a" in html
+
+    def test_only_http_urls_are_linked(self):
+        gallery = Gallery(name="Site", description="")
+        gallery.add_work(_sample_work(title="Safe", url="https://example.org/a"))
+        gallery.add_work(_sample_work(title="Script", url="javascript:alert(1)"))
+        gallery.add_work(_sample_work(title="Tabbed", url="java\tscript:alert(1)"))
+        with tempfile.TemporaryDirectory() as d:
+            build_site(gallery, Path(d), jobs=1)
+            html = (Path(d) / "works" / "safe.html").read_text()
+            assert '<a href="https://example.org/a">' in html
+            for name in ("script", "tabbed"):
+                html = (Path(d) / "works" / f"{name}.html").read_text()
+                assert "script:alert(1)</p>" in html
+                assert 'href="java' not in html
+
+    def test_rebuild_removes_stale_pages(self):
+        with tempfile.TemporaryDirectory() as d:
+            out = Path(d)
+            build_site(_gallery(7), out, jobs=1, page_size=3)
+            (out / "style.css").write_text("body {}")
+            gallery = Gallery(name="Site", description="")
+            gallery.add_works(_sample_work(title=f"Work {i}", medium=Medium.SOFTWARE,
+                                           organ="organvm-i-theoria") for i in range(2))
+            stats = build_site(gallery, out, jobs=1, page_size=3)
+            assert stats.removed_pages == 5 + 2 + 3
+            assert sorted(p.relative_to(out).as_posix() for p in out.rglob("*.html")) == [
+                "index.html",
+                "medium/software/index.html",
+                "organ/organvm-i-theoria/index.html",
+                "works/work-0.html",
+                "works/work-1.html",
+            ]
+            assert not (out / "medium" / "musical").exists()
+            assert (out / "style.css").exists()
+
+    def test_empty_gallery(self):
+        with tempfile.TemporaryDirectory() as d:
+            stats = build_site(Gallery(name="Empty", description=""), Path(d), jobs=4)
+            assert stats.work_pages == 0
+            assert "Total: 0 works" in (Path(d) / "index.html").read_text()
+
+    def test_colliding_paths_get_one_file_each(self):
+        gallery = Gallery(name="Site", description="A static site")
+        titles = ["C++", "C#", "雨", "風"]
+        for title, organ in zip(titles, ["Org A", "org-a", "org a", "organ"]):
+            gallery.add_work(_sample_work(title=title, organ=organ))
+        with tempfile.TemporaryDirectory() as d:
+            out = Path(d)
+            stats = build_site(gallery, out, jobs=2)
+            pages = sorted((out / "works").iterdir())
+            assert len(pages) == stats.work_pages == 4
+            assert sorted(p.read_text(encoding="utf-8").split("<h1>")[1].split("<")[0]
+                          for p in pages) == sorted(titles)
+            assert len(list((out / "organ").iterdir())) == 4
+            for work in gallery.works:
+                assert work.title in (out / work_href(work)).read_text(encoding="utf-8")
+                listing = out / listing_href("organ", work.organ, 1)
+                assert f"Organ: {work.organ}" in listing.read_text(encoding="utf-8")
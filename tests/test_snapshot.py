@@ -0,0 +1,116 @@
+"""Tests for memory-mapped gallery snapshots."""
+
+import pickle
+import stat
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.collector import collect_from_works_file
+from src.gallery import Gallery, Medium, Work
+from src.renderer import render_html, render_json, render_markdown
+from src.snapshot import open_snapshot, write_snapshot
+
+
+DATA = Path(__file__).parent.parent / "data" / "works.json"
+
+
+def _work(**overrides) -> Work:
+    defaults = {
+        "title": "Test Work",
+        "description": "A test creative work",
+        "medium": Medium.GENERATIVE_ART,
+        "organ": "organvm-ii-poiesis",
+        "repo": "test-repo",
+    }
+    defaults.update(overrides)
+    return Work(**defaults)
+
+
+class TestSnapshot:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "gallery.snap"
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _snapshot(self, gallery: Gallery):
+        write_snapshot(gallery, self.path)
+        return open_snapshot(self.path)
+
+    def test_round_trip_preserves_fields(self):
+        work = _work(title="Ünïcode ✓", tags=["b", "a", "b"], url="https://example.org",
+                     featured=True, date_created=date(2025, 1, 2))
+        gallery = Gallery(name="G", description="D", works=[work, _work(tags=[])])
+        with self._snapshot(gallery) as snapshot:
+            assert (snapshot.name, snapshot.description) == ("G", "D")
+            assert list(snapshot.works) == gallery.works
+            assert snapshot.works[0] == work
+            assert snapshot.works[-1].date_created is None
+            assert snapshot.works[0:1] == [work]
+            with pytest.raises(IndexError):
+                snapshot.works[2]
+
+    def test_queries_match_gallery(self):
+        works = [
+            _work(title="Alpha", featured=True, tags=["sound"]),
+            _work(title="Beta", medium=Medium.SOFTWARE, organ="organvm-i-theoria"),
+            _work(title="Gamma", medium=Medium.SOFTWARE, featured=True, tags=["sound", "code"]),
+        ]
+        gallery = Gallery(name="G", description="", works=works)
+        with self._snapshot(gallery) as snapshot:
+            assert snapshot.featured_works() == gallery.featured_works()
+            assert snapshot.by_medium(Medium.SOFTWARE) == gallery.by_medium(Medium.SOFTWARE)
+            assert snapshot.by_medium(Medium.LITERARY) == []
+            assert snapshot.by_organ("organvm-i-theoria") == gallery.by_organ("organvm-i-theoria")
+            assert snapshot.by_organ("missing") == []
+            assert snapshot.stats == gallery.stats
+            assert [w.title for w in snapshot.search("gam")] == ["Gamma"]
+            assert [w.title for w in snapshot.search("sound", mode="substring")] == ["Alpha", "Gamma"]
+            with pytest.raises(ValueError):
+                snapshot.search("x", mode="regex")
+
+    def test_get_by_slug(self):
+        works = [_work(title=t) for t in ("Zeta", "Echo", "echo", "Alpha")]
+        gallery = Gallery(name="G", description="", works=works)
+        with self._snapshot(gallery) as snapshot:
+            for work in works:
+                assert snapshot.get_by_slug(work.slug) == work
+                assert snapshot.get_by_slug(work.slug).slug == work.slug
+            assert snapshot.get_by_slug("echo-2").title == "echo"
+            assert snapshot.get_by_slug("beta") is None
+            assert snapshot.get_by_slug("zz") is None
+
+    def test_empty_gallery(self):
+        with self._snapshot(Gallery(name="Empty", description="")) as snapshot:
+            assert len(snapshot.works) == 0
+            assert snapshot.featured_works() == []
+            assert snapshot.stats.total == 0
+
+    def test_works_file_renders_identically(self):
+        gallery = collect_from_works_file(DATA)
+        with self._snapshot(gallery) as snapshot:
+            assert render_markdown(snapshot) == render_markdown(gallery)
+            assert render_html(snapshot) == render_html(gallery)
+            assert render_json(snapshot) == render_json(gallery)
+
+    def test_pickle_reopens(self):
+        gallery = Gallery(name="G", description="", works=[_work()])
+        with self._snapshot(gallery) as snapshot:
+            reopened = pickle.loads(pickle.dumps(snapshot))
+            assert list(reopened.works) == gallery.works
+            reopened.close()
+
+    def test_snapshot_gets_default_file_mode(self):
+        plain = self.path.with_name("plain.txt")
+        plain.write_text("", encoding="utf-8")
+        write_snapshot(Gallery(name="G", description="", works=[_work()]), self.path)
+        assert stat.S_IMODE(self.path.stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+
+    def test_rejects_other_files(self):
+        self.path.write_bytes(b"not a snapshot at all")
+        with pytest.raises(ValueError):
+            open_snapshot(self.path)
@@ -0,0 +1,82 @@
+"""Cold-start import budget for the CLI."""
+
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+from src import defaults
+
+
+ROOT = Path(__file__).parent.parent
+
+# Cumulative import time of src.__main__, in microseconds, as reported by -X importtime.
+# Lazy loading keeps it around 30-40ms; eager imports of every subcommand cost ~200ms.
+STARTUP_BUDGET_US = 100_000
+
+# Loaded only by the subcommands that use them.
+LAZY_MODULES = {
+    "asyncio",
+    "concurrent.futures",
+    "jinja2",
+    "json",
+    "pydantic",
+    "yaml",
+    "tracemalloc",
+    "cProfile",
+    "src.cache",
+    "src.collector",
+    "src.gallery",
+    "src.pipeline",
+    "src.related",
+    "src.validation",
+    "src.export",
+    "src.diff",
+    "src.compress",
+    "src.renderer",
+    "src.server",
+    "src.site",
+    "src.snapshot",
+    "mmap",
+    "src.store",
+    "sqlite3",
+}
+
+
+def _import_times() -> dict[str, int]:
+    """Return module -> cumulative microseconds for a fresh ``import src.__main__``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.__main__"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    def test_heavy_modules_not_imported(self):
+        assert LAZY_MODULES.isdisjoint(_import_times())
+
+    def test_import_time_budget(self):
+        best = min(_import_times()["src.__main__"] for _ in range(3))
+        assert best < STARTUP_BUDGET_US, f"CLI import took {best / 1000:.1f}ms"
+
+    def test_defaults_defined_once(self):
+        # The CLI and the feature modules import these; a module-level copy could drift.
+        names = {name for name in vars(defaults) if name.isupper()}
+        for path in (ROOT / "src").glob("*.py"):
+            if path.name == "defaults.py":
+                continue
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+            assigned = {
+                target.id
+                for node in tree.body if isinstance(node, ast.Assign)
+                for target in node.targets if isinstance(target, ast.Name)
+            }
+            assert not assigned & names, f"{path.name} redefines {sorted(assigned & names)}"
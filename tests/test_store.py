@@ -0,0 +1,135 @@
+"""Tests for the SQLite gallery store."""
+
+import json
+import pickle
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.collector import collect_from_registry, collect_from_works_file
+from src.gallery import Gallery, Medium, Work
+from src.renderer import render_html, render_json, render_markdown
+from src.store import GalleryStore, import_registry, import_works_file
+
+
+DATA = Path(__file__).parent.parent / "data" / "works.json"
+
+
+def _work(**overrides) -> Work:
+    defaults = {
+        "title": "Test Work",
+        "description": "A test creative work",
+        "medium": Medium.GENERATIVE_ART,
+        "organ": "organvm-ii-poiesis",
+        "repo": "test-repo",
+    }
+    defaults.update(overrides)
+    return Work(**defaults)
+
+
+class TestGalleryStore:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = GalleryStore(Path(self._tmp.name) / "gallery.db")
+
+    def teardown_method(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_round_trip_preserves_fields(self):
+        work = _work(tags=["b", "a", "b"], url="https://example.org", featured=True,
+                     date_created=date(2025, 1, 2))
+        self.store.add_work(work)
+        assert list(self.store.works) == [work]
+        assert self.store.works[0] == work
+        assert len(self.store.works) == 1
+
+    def test_queries_match_gallery(self):
+        works = [
+            _work(title="Alpha", featured=True, tags=["sound"]),
+            _work(title="Beta", medium=Medium.SOFTWARE, organ="organvm-i-theoria"),
+            _work(title="Gamma", medium=Medium.SOFTWARE, featured=True, tags=["sound", "code"]),
+        ]
+        gallery = Gallery(name="G", description="", works=works)
+        self.store.add_works(works, batch_size=2)
+        assert self.store.featured_works() == gallery.featured_works()
+        assert self.store.by_medium(Medium.SOFTWARE) == gallery.by_medium(Medium.SOFTWARE)
+        assert self.store.by_organ("organvm-i-theoria") == gallery.by_organ("organvm-i-theoria")
+        assert self.store.stats == gallery.stats
+        assert self.store.works[1:3] == works[1:3]
+        assert self.store.works[-1] == works[-1]
+
+    def test_search_prefix_and(self):
+        self.store.add_works([
+            _work(title="Generative Music", description="sound system"),
+            _work(title="Generative Art", tags=["visual"]),
+            _work(title="Performance", description="live art"),
+        ])
+        assert {w.title for w in self.store.search("gen")} == {"Generative Music", "Generative Art"}
+        assert [w.title for w in self.store.search("generative visual")] == ["Generative Art"]
+        assert self.store.search("nothing here") == []
+        assert [w.title for w in self.store.search("live art", mode="substring")] == ["Performance"]
+        assert len(self.store.search("---")) == 0
+        with pytest.raises(ValueError):
+            self.store.search("x", mode="regex")
+
+    def test_title_match_ranks_first(self):
+        self.store.add_works([
+            _work(title="Other", description="mentions lattice once"),
+            _work(title="Lattice", description="something else"),
+        ])
+        assert [w.title for w in self.store.search("lattice")] == ["Lattice", "Other"]
+
+    def test_remove_work(self):
+        keep, drop = _work(title="Keep", tags=["t"]), _work(title="Drop", tags=["t"])
+        self.store.add_works([keep, drop])
+        self.store.remove_work(_work(title="Drop", tags=["t"]))
+        assert list(self.store.works) == [keep]
+        assert self.store.search("drop") == []
+        assert self.store.stats.by_tag == {"t": 1}
+        with pytest.raises(ValueError):
+            self.store.remove_work(drop)
+
+    def test_slugs_unique_across_batches(self):
+        self.store.add_works([_work(title="Echo"), _work(title="echo"), _work(title="x")],
+                             batch_size=2)
+        self.store.add_work(_work(title="ECHO"))
+        assert [w.slug for w in self.store.works] == ["echo", "echo-2", "x", "echo-3"]
+        assert self.store.get_by_slug("echo-3").title == "ECHO"
+        assert self.store.get_by_slug("missing") is None
+
+    def test_metadata_persists(self):
+        self.store.name = "Stored"
+        self.store.description = "On disk"
+        self.store.close()
+        reopened = pickle.loads(pickle.dumps(self.store))
+        assert (reopened.name, reopened.description) == ("Stored", "On disk")
+        reopened.close()
+
+
+class TestImport:
+    def test_works_file_renders_identically(self):
+        with tempfile.TemporaryDirectory() as d:
+            with GalleryStore(Path(d) / "g.db") as store:
+                assert import_works_file(store, DATA, batch_size=3) == 10
+                gallery = collect_from_works_file(DATA)
+                assert store.name == gallery.name
+                assert render_markdown(store) == render_markdown(gallery)
+                assert render_html(store) == render_html(gallery)
+                assert render_json(store) == render_json(gallery)
+
+    def test_registry(self):
+        with tempfile.TemporaryDirectory() as d:
+            registry = Path(d) / "registry.json"
+            registry.write_text(json.dumps({"repositories": [
+                {"name": "a", "org": "organvm-v-logos", "topics": ["x"],
+                 "portfolio_relevance": "HIGH"},
+                {"name": "b", "org": "organvm-i-theoria"},
+            ]}), encoding="utf-8")
+            with GalleryStore(Path(d) / "g.db") as store:
+                assert import_registry(store, registry) == 2
+                gallery = collect_from_registry(registry)
+                assert list(store.works) == gallery.works
+                assert store.name == gallery.name
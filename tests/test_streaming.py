@@ -0,0 +1,73 @@
+"""Tests for incremental JSON reading."""
+
+import io
+import json
+
+import pytest
+
+from src.streaming import iter_array_items
+
+
+def _items(doc, keys=("items",), meta=None, chunk_size=7):
+    return list(iter_array_items(io.StringIO(doc), keys, meta=meta, chunk_size=chunk_size))
+
+
+class TestIterArrayItems:
+    def test_yields_elements(self):
+        doc = json.dumps({"items": [{"a": 1}, {"b": [2, 3]}, "s", 12345, None]})
+        assert _items(doc) == [{"a": 1}, {"b": [2, 3]}, "s", 12345, None]
+
+    def test_numbers_split_across_chunks(self):
+        doc = json.dumps({"items": [1234567890123, 98765]})
+        for size in range(1, 12):
+            assert _items(doc, chunk_size=size) == [1234567890123, 98765]
+
+    def test_skips_other_containers(self):
+        doc = json.dumps({
+            "other": {"nested": ["]", "}", "\\\"", {"x": [1]}]},
+            "items": [1, 2],
+            "after": [3],
+        })
+        assert _items(doc) == [1, 2]
+
+    def test_escapes_in_skipped_values(self):
+        docs = [
+            r'{"meta": {"note": "line\nbreak", "x": [1]}, "repositories": [{"name": "a"}]}',
+            r'{"meta": {"note": "caf\u00e9", "x": [1]}, "repositories": [{"name": "a"}]}',
+            r'{"meta": {"q": "\\", "e": "\"]", "x": [1]}, "repositories": [{"name": "a"}]}',
+        ]
+        for doc in docs:
+            for size in range(1, 12):
+                assert _items(doc, keys=("repositories",), chunk_size=size) == [{"name": "a"}]
+
+    def test_earlier_key_preferred_regardless_of_order(self):
+        keys = ("repositories", "repos")
+        assert _items(json.dumps({"repos": [1], "repositories": [2]}), keys) == [2]
+        assert _items(json.dumps({"repositories": [2], "repos": [1]}), keys) == [2]
+        meta = {}
+        doc = json.dumps({"repos": [1, {"a": "]"}], "name": "G", "repositories": 3})
+        assert _items(doc, keys, meta=meta) == [1, {"a": "]"}]
+        assert meta == {"name": "G", "repositories": 3}
+
+    def test_records_scalar_meta(self):
+        meta = {}
+        doc = json.dumps({"name": "Gallery", "items": [1], "count": 3, "flag": True})
+        assert _items(doc, meta=meta) == [1]
+        assert meta == {"name": "Gallery", "count": 3, "flag": True}
+
+    def test_empty_array_and_object(self):
+        assert _items('{"items": []}') == []
+        assert _items("{}") == []
+        assert _items('{"other": 1}') == []
+
+    def test_whitespace_and_unicode(self):
+        doc = '\n {\n "items" :\n [ "caf\\u00e9" ,\n "ñ" ] \n}\n'
+        assert _items(doc) == ["café", "ñ"]
+
+    def test_not_an_object(self):
+        with pytest.raises(ValueError):
+            _items("[1, 2]")
+
+    def test_truncated_document(self):
+        with pytest.raises(ValueError):
+            _items('{"items": [1, {"a": ')
@@ -0,0 +1,169 @@
+"""Tests for batch pydantic validation of works files and registries."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src import validation
+from src.collector import collect_from_ndjson, collect_from_registry, collect_from_works_file
+from src.store import GalleryStore, import_works_file
+from src.validation import (
+    InvalidRecordsError,
+    RecordError,
+    ensure_valid,
+    validate_path,
+    validate_records,
+)
+
+
+def _item(title: str = "Work", **overrides) -> dict:
+    item = {"title": title, "description": "d", "medium": "software", "tags": ["a"]}
+    item.update(overrides)
+    return item
+
+
+def _bad_items() -> list:
+    return [
+        _item("Fine"),
+        _item("Bad medium", medium="sculpture"),
+        {"description": "no title", "tags": ["x", 3]},
+        "not an object",
+        _item("Bad flag", featured="yes"),
+    ]
+
+
+def _write_works(d: str, items: list) -> Path:
+    path = Path(d) / "works.json"
+    path.write_text(json.dumps({"gallery_name": "G", "works": items}), encoding="utf-8")
+    return path
+
+
+class TestValidateRecords:
+    def test_valid_records_pass(self):
+        assert validate_records([_item(), _item(featured=True, organ="o", repo="r")]) == []
+        assert validate_records([{"name": "repo", "topics": ["t"]}], "registry") == []
+
+    def test_every_error_is_reported_with_its_index(self):
+        errors = validate_records(_bad_items())
+        assert [(e.index, e.field) for e in errors] == [
+            (1, "medium"), (2, "title"), (2, "tags.1"), (3, ""), (4, "featured"),
+        ]
+        assert str(errors[1]) == "record 2, title: Field required"
+
+    def test_registry_records(self):
+        errors = validate_records([{"name": "ok"}, {"org": "x"}, {"name": "n", "description": None}],
+                                  "registry")
+        assert [(e.index, e.field) for e in errors] == [(1, "name"), (2, "description")]
+
+    def test_parallel_chunks_match_serial(self, monkeypatch):
+        records = _bad_items() * 7
+        serial = validate_records(records, jobs=1)
+        monkeypatch.setattr(validation, "PARALLEL_THRESHOLD", 10)
+        monkeypatch.setattr(validation, "CHUNK_SIZE", 4)
+        assert validate_records(records, jobs=2) == serial
+        assert serial[-1] == RecordError(34, "featured", serial[-1].message)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            validate_records([], "catalogue")
+
+    def test_ensure_valid_summarises(self):
+        with pytest.raises(InvalidRecordsError) as info:
+            ensure_valid(_bad_items() * 2, source="input")
+        assert len(info.value.report.errors) == 10
+        assert info.value.report.invalid_records == 8
+        assert "... and 5 more" in str(info.value)
+
+
+class TestValidatedIngestion:
+    def test_validate_path_reads_both_formats(self):
+        with tempfile.TemporaryDirectory() as d:
+            report = validate_path(_write_works(d, _bad_items()))
+            assert (report.records, report.ok, report.invalid_records) == (5, False, 4)
+            ndjson = Path(d) / "works.jsonl"
+            ndjson.write_text('{"gallery_name": "G"}\n' + json.dumps(_item()) + "\n\n"
+                              + json.dumps(_item(medium="clay")) + "\n", encoding="utf-8")
+            report = validate_path(ndjson)
+            assert [(e.index, e.field, e.line) for e in report.errors] == [(1, "medium", 4)]
+            assert str(report.errors[0]).startswith("record 1 (line 4), medium: ")
+
+    def test_ndjson_header_is_validated(self):
+        with tempfile.TemporaryDirectory() as d:
+            ndjson = Path(d) / "works.jsonl"
+            ndjson.write_text('{"gallery_name": 7}\n' + json.dumps(_item()) + "\n",
+                              encoding="utf-8")
+            report = validate_path(ndjson)
+            assert (report.records, report.invalid_records) == (1, 0)
+            assert [(e.index, e.field, e.line) for e in report.errors] == [
+                (None, "gallery_name", 1),
+            ]
+            assert str(report.errors[0]).startswith("header (line 1), gallery_name: ")
+            ndjson.write_text("[]\n", encoding="utf-8")
+            with pytest.raises(ValueError, match="header line"):
+                validate_path(ndjson)
+            ndjson.write_text("{}\n\n{oops\n", encoding="utf-8")
+            with pytest.raises(ValueError, match="line 3"):
+                validate_path(ndjson)
+
+    def test_validate_path_chunks_match_serial(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as d:
+            ndjson = Path(d) / "works.jsonl"
+            ndjson.write_text('{"gallery_name": "G"}\n\n'
+                              + "".join(json.dumps(item) + "\n" for item in _bad_items() * 3),
+                              encoding="utf-8")
+            for path in (_write_works(d, _bad_items() * 3), ndjson):
+                serial = validate_path(path, jobs=1)
+                assert serial.records == 15 and len(serial.errors) == 15
+                # Chunks of two, the first two records in-process and the rest in workers.
+                monkeypatch.setattr(validation, "CHUNK_SIZE", 2)
+                monkeypatch.setattr(validation, "PARALLEL_THRESHOLD", 2)
+                chunked = validate_path(path, jobs=2)
+                monkeypatch.undo()
+                assert chunked == serial
+            assert serial.errors[-1] == RecordError(14, "featured", serial.errors[-1].message, 17)
+            path = Path(d) / "registry.json"
+            path.write_text(json.dumps({"repos": [{"org": "x"}], "repositories": [{"name": "a"}]}),
+                            encoding="utf-8")
+            report = validate_path(path, "registry")
+            assert (report.records, report.ok) == (1, True)
+
+    def test_works_member_must_be_an_array(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "works.json"
+            path.write_text(json.dumps({"works": "none"}), encoding="utf-8")
+            with pytest.raises(ValueError, match="must be an array"):
+                validate_path(path)
+
+    def test_collectors_raise_with_all_errors(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(d, _bad_items())
+            with pytest.raises(InvalidRecordsError) as info:
+                collect_from_works_file(path, validate=True)
+            assert len(info.value.report.errors) == 5
+            good = _write_works(d, [_item("A"), _item("B")])
+            assert len(collect_from_works_file(good, validate=True).works) == 2
+
+            ndjson = Path(d) / "works.jsonl"
+            ndjson.write_text('{}\n{"medium": "software"}\n', encoding="utf-8")
+            with pytest.raises(InvalidRecordsError):
+                collect_from_ndjson(ndjson, validate=True)
+
+    def test_registry_validation_streaming_or_not(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "registry.json"
+            path.write_text(json.dumps({"repositories": [{"name": "a"}, {"topics": "x"}]}),
+                            encoding="utf-8")
+            for stream in (False, True):
+                with pytest.raises(InvalidRecordsError):
+                    collect_from_registry(path, stream=stream, validate=True)
+            assert len(collect_from_registry(path).works) == 2
+
+    def test_store_import_is_all_or_nothing(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_works(d, _bad_items())
+            with GalleryStore(Path(d) / "g.db") as store:
+                with pytest.raises(InvalidRecordsError):
+                    import_works_file(store, path, validate=True)
+                assert len(store.works) == 0